@@ -6,6 +6,7 @@ from flask_cors import CORS
 from flask_migrate import Migrate
 from apscheduler.schedulers.background import BackgroundScheduler
 import os
+import atexit
 from datetime import datetime, timedelta
 import logging
 from .config.logging_config import setup_logging
@@ -61,11 +62,17 @@ def create_app():
     from .routes import bp as routes_bp
     app.register_blueprint(routes_bp)
     
+    # Register CLI commands
+    from .preload import preload_schedule_command
+    from .scoring import rebuild_scores_command
+    app.cli.add_command(preload_schedule_command)
+    app.cli.add_command(rebuild_scores_command)
+    
     # Initialize scheduler
     scheduler = BackgroundScheduler()
     
     def update_games():
-        """Update game scores periodically"""
+        """Update game scores"""
         with app.app_context():
             try:
                 from .game_updater import update_game_scores
@@ -73,8 +80,72 @@ def create_app():
             except Exception as e:
                 logger.error(f"Error in scheduled update_games: {str(e)}")
     
-    scheduler.add_job(update_games, 'interval', minutes=5, id='update_games')
-    scheduler.start()
+    def preload_schedule():
+        """Refresh the current season's schedule"""
+        with app.app_context():
+            try:
+                from .preload import preload_season
+                from .ingest import current_season
+                preload_season(current_season(), refresh=True)
+            except Exception as e:
+                logger.error(f"Error in scheduled preload_schedule: {str(e)}")
+    
+    def prune_events():
+        """Trim the live update change log"""
+        with app.app_context():
+            try:
+                from .events import prune_events
+                prune_events()
+            except Exception as e:
+                logger.error(f"Error in scheduled prune_events: {str(e)}")
+    
+    def prune_idempotency_keys():
+        """Drop expired Idempotency-Key records"""
+        with app.app_context():
+            try:
+                from .idempotency import prune_idempotency_keys
+                prune_idempotency_keys()
+            except Exception as e:
+                logger.error(f"Error in scheduled prune_idempotency_keys: {str(e)}")
+    
+    # Poll on a schedule that follows the game slate instead of a fixed interval.
+    # Only the elected leader among the worker processes runs the poller.
+    from .scheduler import GamePoller, LeaderElection
+    poller = GamePoller(scheduler, app, update_games)
+    
+    def on_elected():
+        poller.start()
+        if os.environ.get('PRELOAD_SCHEDULE', 'false').lower() == 'true':
+            scheduler.add_job(preload_schedule, 'interval', hours=24, id='preload_schedule',
+                              next_run_time=datetime.now(), replace_existing=True,
+                              max_instances=1, coalesce=True)
+        scheduler.add_job(prune_events, 'interval', minutes=10, id='prune_events',
+                          replace_existing=True, max_instances=1, coalesce=True)
+        scheduler.add_job(prune_idempotency_keys, 'interval', hours=1, id='prune_idempotency_keys',
+                          replace_existing=True, max_instances=1, coalesce=True)
+    
+    def on_demoted():
+        poller.stop()
+        for job_id in ('preload_schedule', 'prune_events', 'prune_idempotency_keys'):
+            if scheduler.get_job(job_id):
+                scheduler.remove_job(job_id)
+    
+    election = LeaderElection(scheduler, app, on_elected=on_elected, on_demoted=on_demoted)
+    app.extensions['game_poller'] = poller
+    app.extensions['leader_election'] = election
+    
+    # Every worker streams the shared change log to its own SSE clients
+    from .events import EventBroadcaster
+    app.extensions['event_broadcaster'] = EventBroadcaster(app)
+    
+    # Optionally batch pick writes into group commits for deadline surges
+    from .write_queue import group_commit_enabled, create_write_queue
+    if group_commit_enabled():
+        app.extensions['write_queue'] = create_write_queue(app)
+    if os.environ.get('TESTING') != 'true':
+        scheduler.start()
+        election.start()
+        atexit.register(election.resign)
     
     # Create database tables
     with app.app_context():
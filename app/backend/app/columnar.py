@@ -0,0 +1,349 @@
+import os
+import copy
+import logging
+import threading
+from datetime import datetime
+import numpy as np
+from . import db, scoring
+from .models import User, Game, Pick
+from .result_cache import data_versions, GAMES_VERSION, PICKS_VERSION, USERS_VERSION
+
+logger = logging.getLogger(__name__)
+
+NO_PICK = 0
+UNKNOWN_TEAM = -1   # A picked team that is in neither side of the game
+NO_GUESS = -1
+
+ENGINE_VERSIONS = (GAMES_VERSION, PICKS_VERSION, USERS_VERSION)
+
+def _game_rows(season):
+    return db.session.query(
+        Game.id, Game.week, Game.status, Game.winner, Game.is_mnf, Game.start_time,
+        Game.final_score_home, Game.final_score_away, Game.home_team, Game.away_team
+    ).filter(Game.season == season).order_by(Game.start_time, Game.id).all()
+
+class SeasonMatrix:
+    """
+    One season's picks and results as arrays: an int8 users x games matrix
+    of picked team codes and a games vector of winner codes, with games
+    ordered by kickoff. Every view is computed from these with vectorized
+    operations.
+    """
+
+    def __init__(self, season):
+        self.season = season
+        self.versions = {}
+
+    def load(self):
+        """Read the season's games, picks and usernames from the database"""
+        self._load_games(_game_rows(self.season))
+        self._load_picks()
+        return self
+
+    def with_results(self):
+        """
+        Copy of this matrix with fresh game results. Only the game vectors are
+        re-read unless the season's schedule changed shape.
+        """
+        rows = _game_rows(self.season)
+        teams = {row.home_team for row in rows} | {row.away_team for row in rows}
+        if [row.id for row in rows] != self.game_ids.tolist() or not teams <= self.team_codes.keys():
+            return SeasonMatrix(self.season).load()
+        refreshed = copy.copy(self)
+        refreshed._set_results(rows)
+        return refreshed
+
+    def _load_games(self, rows):
+        self.game_ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.game_index = {game_id: i for i, game_id in enumerate(self.game_ids.tolist())}
+        teams = sorted({row.home_team for row in rows} | {row.away_team for row in rows})
+        self.team_codes = {team: code for code, team in enumerate(teams, start=1)}
+        self.weeks = np.array([row.week for row in rows], dtype=np.int16)
+        self.week_numbers = np.unique(self.weeks)
+        # games x weeks membership, used to fold game columns into week columns
+        self.week_onehot = (self.weeks[:, None] == self.week_numbers[None, :]).astype(np.int32)
+        self._set_results(rows)
+
+    def _set_results(self, rows):
+        self.completed = np.array([row.status == 'completed' for row in rows], dtype=bool)
+        self.scheduled = np.array([row.status == 'scheduled' for row in rows], dtype=bool)
+        self.start_times = np.array([row.start_time for row in rows], dtype='datetime64[us]')
+        self.winners = np.array([self.team_codes.get(row.winner, NO_PICK) for row in rows], dtype=np.int8)
+        self.mnf = np.array([bool(row.is_mnf) for row in rows], dtype=bool)
+        self.home_codes = np.array([self.team_codes[row.home_team] for row in rows], dtype=np.int8)
+        self.away_codes = np.array([self.team_codes[row.away_team] for row in rows], dtype=np.int8)
+        scored = [row.final_score_home is not None and row.final_score_away is not None for row in rows]
+        self.points = np.array([
+            row.final_score_home + row.final_score_away if has_score else 0
+            for row, has_score in zip(rows, scored)
+        ], dtype=np.int32)
+        self.scored = np.array(scored, dtype=bool)
+
+    def _load_picks(self):
+        rows = db.session.query(
+            Pick.user_id, User.username, Pick.game_id, Pick.picked_team, Pick.mnf_total_points
+        ).join(Game, Pick.game_id == Game.id).join(User, Pick.user_id == User.id).filter(
+            Game.season == self.season
+        ).all()
+
+        usernames = {row.user_id: row.username for row in rows}
+        self.user_ids = np.array(sorted(usernames), dtype=np.int64)
+        self.user_index = {user_id: i for i, user_id in enumerate(self.user_ids.tolist())}
+        self.usernames = [usernames[user_id] for user_id in self.user_ids.tolist()]
+        # Position of each user in username order, the final tie-break everywhere
+        self.name_rank = np.empty(len(self.usernames), dtype=np.int64)
+        self.name_rank[np.argsort(np.array(self.usernames, dtype=object), kind='stable')] = np.arange(len(self.usernames))
+
+        shape = (len(self.user_ids), len(self.game_ids))
+        self.picks = np.full(shape, NO_PICK, dtype=np.int8)
+        self.guesses = np.full(shape, NO_GUESS, dtype=np.int32)
+        if rows:
+            users = np.array([self.user_index[row.user_id] for row in rows])
+            games = np.array([self.game_index[row.game_id] for row in rows])
+            self.picks[users, games] = [self.team_codes.get(row.picked_team, UNKNOWN_TEAM) for row in rows]
+            self.guesses[users, games] = [
+                NO_GUESS if row.mnf_total_points is None else row.mnf_total_points for row in rows
+            ]
+
+    def picked(self):
+        return self.picks != NO_PICK
+
+    def correct(self):
+        return (self.picks == self.winners[None, :]) & (self.winners != NO_PICK)[None, :]
+
+    def week_totals(self):
+        """(correct, total) users x weeks count matrices"""
+        return (
+            self.correct().astype(np.int32) @ self.week_onehot,
+            self.picked().astype(np.int32) @ self.week_onehot
+        )
+
+    def tiebreak_deltas(self):
+        """
+        users x weeks distance from each week's deciding MNF total, NaN where
+        there is no finished MNF game or no guess.
+        """
+        deltas = np.full((len(self.user_ids), len(self.week_numbers)), np.nan)
+        deciding = self.mnf & self.completed & self.scored
+        for column, week in enumerate(self.week_numbers):
+            candidates = np.flatnonzero(deciding & (self.weeks == week))
+            if not len(candidates):
+                continue
+            game = candidates[-1]  # The latest kickoff decides
+            guesses = self.guesses[:, game]
+            guessed = (guesses != NO_GUESS) & (self.picks[:, game] != NO_PICK)
+            deltas[guessed, column] = np.abs(guesses[guessed] - self.points[game])
+        return deltas
+
+    def weekly_wins(self):
+        """Weeks won per user, counting only weeks whose games are all completed"""
+        correct, total = self.week_totals()
+        deltas = self.tiebreak_deltas()
+        finished = (self.week_onehot.T @ (~self.completed).astype(np.int32)) == 0
+
+        playing = total > 0
+        score = np.where(playing, correct, -1)
+        top = playing & (score == score.max(axis=0, initial=-1)[None, :])
+        # Missing guesses sort last; if nobody guessed, the top scorers all tie
+        delta_key = np.where(np.isnan(deltas), np.inf, deltas)
+        best_delta = np.where(top, delta_key, np.inf).min(axis=0, initial=np.inf)
+        top &= delta_key == best_delta[None, :]
+        return (top & finished[None, :]).sum(axis=1)
+
+    def streaks(self):
+        """Consecutive correct picks counting back from each user's latest completed game"""
+        order = np.flatnonzero(self.completed)[::-1]
+        picked = self.picked()[:, order]
+        missed = picked & ~self.correct()[:, order]
+        # A sentinel miss after the oldest game ends streaks that never broke
+        sentinel = np.ones((len(self.user_ids), 1), dtype=bool)
+        first_miss = np.concatenate([missed, sentinel], axis=1).argmax(axis=1)
+        picked_before = np.concatenate(
+            [np.zeros((len(self.user_ids), 1), dtype=np.int64), np.cumsum(picked, axis=1)], axis=1
+        )
+        return picked_before[np.arange(len(self.user_ids)), first_miss]
+
+    def kicked_off(self, now):
+        """Games whose picks are locked, by the same rule as the schedule index"""
+        return ~self.scheduled | (self.start_times <= np.datetime64(now, 'us'))
+
+    def head_to_head(self, through_week=None, now=None):
+        """
+        users x users pair statistics from matrix products over the pick
+        matrix: games both picked, games picked the same way, and for the
+        completed games where they split, how many the row user got right.
+        Only games that have kicked off count, so open picks stay private.
+        """
+        games = self.kicked_off(now or datetime.utcnow())
+        if through_week is not None:
+            games &= self.weeks <= through_week
+        picks = self.picks[:, games]
+        home = (picks == self.home_codes[games][None, :]).astype(np.int32)
+        away = (picks == self.away_codes[games][None, :]).astype(np.int32)
+        picked = home + away
+        correct = self.correct()[:, games].astype(np.int32)
+
+        shared = picked @ picked.T
+        agreed = home @ home.T + away @ away.T
+        # Row user right while the column user picked: either both right (same
+        # side) or only the row user right (they split)
+        wins = correct @ picked.T - correct @ correct.T
+        return {'shared': shared, 'agreed': agreed, 'wins': wins}
+
+    def season_standings(self):
+        correct = self.correct().sum(axis=1)
+        total = self.picked().sum(axis=1)
+        wins = self.weekly_wins()
+        streaks = self.streaks()
+        rows = np.flatnonzero(total > 0)
+        rows = rows[np.lexsort((self.name_rank[rows], -correct[rows]))]
+        return [{
+            'id': int(self.user_ids[i]),
+            'username': self.usernames[i],
+            'correct': int(correct[i]),
+            'total': int(total[i]),
+            'weekly_wins': int(wins[i]),
+            'streak': int(streaks[i]),
+            'accuracy': round(int(correct[i]) / int(total[i]) * 100, 2)
+        } for i in rows]
+
+    def week_standings(self, week):
+        columns = np.flatnonzero(self.week_numbers == week)
+        if not len(columns):
+            return []
+        column = columns[0]
+        correct, total = self.week_totals()
+        correct, total = correct[:, column], total[:, column]
+        deltas = self.tiebreak_deltas()[:, column]
+        missing = np.isnan(deltas)
+        rows = np.flatnonzero(total > 0)
+        rows = rows[np.lexsort((
+            self.name_rank[rows],
+            np.where(missing, 0, deltas)[rows],
+            missing[rows],
+            -correct[rows]
+        ))]
+        return [{
+            'id': int(self.user_ids[i]),
+            'username': self.usernames[i],
+            'correct': int(correct[i]),
+            'total': int(total[i]),
+            'tiebreak_delta': None if missing[i] else int(deltas[i]),
+            'accuracy': round(int(correct[i]) / int(total[i]) * 100, 2)
+        } for i in rows]
+
+    def user_stats(self, user_ids):
+        correct, total = self.week_totals()
+        streaks = self.streaks()
+        stats = {}
+        for user_id in user_ids:
+            entry = {
+                'total_correct': 0,
+                'total_picks': 0,
+                'accuracy': 0,
+                'best_week': None,
+                'current_streak': 0,
+                'weekly_stats': []
+            }
+            stats[user_id] = entry
+            row = self.user_index.get(user_id)
+            if row is None:
+                continue
+            for column in np.flatnonzero(total[row] > 0):
+                week, week_correct, week_total = int(self.week_numbers[column]), int(correct[row, column]), int(total[row, column])
+                entry['weekly_stats'].append({
+                    'week': week,
+                    'correct': week_correct,
+                    'total': week_total,
+                    'accuracy': week_correct / week_total * 100
+                })
+                if entry['best_week'] is None or week_correct > entry['best_week']['correct']:
+                    entry['best_week'] = {'week': week, 'correct': week_correct}
+            entry['total_correct'] = int(correct[row].sum())
+            entry['total_picks'] = int(total[row].sum())
+            entry['current_streak'] = int(streaks[row])
+            if entry['total_picks']:
+                entry['accuracy'] = entry['total_correct'] / entry['total_picks'] * 100
+        return stats
+
+HEAD_TO_HEAD_MAGIC = b'H2H1'
+
+def encode_head_to_head(matrix, pairs):
+    """
+    Compact little-endian payload: b'H2H1', uint32 user count n, int32[n]
+    user ids, then the shared, agreed and wins matrices as uint16[n*n] each,
+    row-major in user id order.
+    """
+    n = len(matrix.user_ids)
+    parts = [HEAD_TO_HEAD_MAGIC, np.uint32(n).astype('<u4').tobytes(), matrix.user_ids.astype('<i4').tobytes()]
+    for name in ('shared', 'agreed', 'wins'):
+        parts.append(np.clip(pairs[name], 0, np.iinfo(np.uint16).max).astype('<u2').tobytes())
+    return b''.join(parts)
+
+def head_to_head_json(matrix, pairs, through_week=None):
+    """Head-to-head matrices as JSON-ready nested lists in user id order"""
+    return {
+        'season': matrix.season,
+        'week': through_week,
+        'users': [{'id': int(user_id), 'username': username}
+                  for user_id, username in zip(matrix.user_ids, matrix.usernames)],
+        'shared': pairs['shared'].tolist(),
+        'agreed': pairs['agreed'].tolist(),
+        'wins': pairs['wins'].tolist()
+    }
+
+class ColumnarEngine:
+    """
+    Per-process cache of SeasonMatrix objects. A matrix is rebuilt when picks
+    or users change and only has its result vectors refreshed when games do.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seasons = {}
+
+    def matrix(self, season):
+        current = {name: version for name, (version, _) in data_versions(ENGINE_VERSIONS).items()}
+        with self._lock:
+            matrix = self._seasons.get(season)
+            if matrix is None or any(
+                matrix.versions[name] != current[name] for name in (PICKS_VERSION, USERS_VERSION)
+            ):
+                matrix = SeasonMatrix(season).load()
+                logger.info(f"Loaded {season} scoring matrix: {matrix.picks.shape[0]} users x {matrix.picks.shape[1]} games")
+            elif matrix.versions[GAMES_VERSION] != current[GAMES_VERSION]:
+                matrix = matrix.with_results()
+            matrix.versions = current
+            self._seasons[season] = matrix
+            return matrix
+
+    def season_standings(self, season):
+        return self.matrix(season).season_standings()
+
+    def week_standings(self, season, week):
+        return self.matrix(season).week_standings(week)
+
+    def user_stats(self, user_ids, season):
+        return self.matrix(season).user_stats(list(user_ids))
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_columnar_engine():
+    """Return the process-wide columnar engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ColumnarEngine()
+    return _engine
+
+def get_scoring_engine():
+    """
+    Return what serves leaderboards and stats: the columnar engine, or the
+    SQL summary tables in app.scoring when SCORING_ENGINE=sql.
+    Both expose season_standings, week_standings and user_stats.
+    """
+    if os.environ.get('SCORING_ENGINE', 'columnar').lower() == 'sql':
+        return scoring
+    return get_columnar_engine()
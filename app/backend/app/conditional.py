@@ -0,0 +1,61 @@
+import hashlib
+from functools import wraps
+from flask import request, current_app, g
+from .result_cache import data_versions
+
+# Lifetime advertised for responses that can no longer change
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+def make_etag(versions, key):
+    """Strong validator for `key` as computed from the given data versions"""
+    digest = hashlib.blake2b(digest_size=12)
+    for name in sorted(versions):
+        digest.update(f'{name}={versions[name][0]};'.encode('utf-8'))
+    digest.update(repr(key).encode('utf-8'))
+    return digest.hexdigest()
+
+def _not_modified(etag):
+    """
+    Only the ETag decides: every response here has one, and HTTP dates are
+    whole seconds, so If-Modified-Since would miss a change made within the
+    second of the client's copy (RFC 9110 13.1.3 prefers the entity tag)
+    """
+    return bool(request.if_none_match) and etag in request.if_none_match
+
+def conditional_get(versions, key):
+    """
+    Answer GET requests with ETag/Last-Modified validators derived from the
+    named data versions, returning 304 before the view runs when the client's
+    copy is current. `key` receives the view's arguments and returns whatever
+    else the body depends on, or None to skip validation.
+    Views may mark a response immutable by setting its Cache-Control max_age.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            response_key = key(*args, **kwargs) if request.method == 'GET' else None
+            if response_key is None:
+                return view(*args, **kwargs)
+
+            current = data_versions(versions)
+            g.data_versions = current  # Reused by cached_json within this request
+            etag = make_etag(current, response_key)
+            modified = [updated_at for _, updated_at in current.values() if updated_at]
+            last_modified = max(modified) if modified else None
+
+            if _not_modified(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.private = True
+            if response.cache_control.max_age is None:
+                response.cache_control.no_cache = True
+            return response
+        return wrapped
+    return decorator
@@ -1,7 +1,9 @@
 import requests
 from datetime import datetime, timedelta
 import pytz
-import time
+from .fetch_engine import get_fetch_engine
+from .http_client import get_http_client
+from .response_cache import TTL_LIVE, TTL_TEAM_STATS, scoreboard_ttl
 
 class ESPNAPIError(Exception):
     """Custom exception for ESPN API errors"""
@@ -9,34 +11,27 @@ class ESPNAPIError(Exception):
 
 class ESPNAPI:
     BASE_URL = 'https://site.api.espn.com/apis/site/v2/sports/football/nfl'
-    RATE_LIMIT_DELAY = 1.0  # Delay between requests in seconds
 
-    def __init__(self):
-        self.last_request_time = 0
+    def __init__(self, engine=None, client=None):
+        self.engine = engine or get_fetch_engine()
+        self.client = client or get_http_client()
         self.headers = {
             'X-RateLimit-Limit': '100',
             'X-RateLimit-Remaining': '99'
         }
 
-    def _make_request(self, url, params=None):
-        """Make a rate-limited request to the ESPN API"""
-        # Implement rate limiting
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.RATE_LIMIT_DELAY:
-            time.sleep(self.RATE_LIMIT_DELAY - time_since_last_request)
-        
-        response = requests.get(url, params=params, headers=self.headers)
-        if response.status_code != 200:
-            raise ESPNAPIError(f"ESPN API request failed with status code {response.status_code}")
-        
-        self.last_request_time = time.time()
-        return response.json()
+    def _make_request(self, url, params=None, ttl=None):
+        """Make a rate-limited, optionally cached request to the ESPN API"""
+        # Rate limiting, timeouts, retries and caching are shared with every other ESPN caller
+        try:
+            return self.client.get_json(url, params=params, headers=self.headers, ttl=ttl)
+        except requests.HTTPError as e:
+            raise ESPNAPIError(f"ESPN API request failed with status code {e.response.status_code}")
 
     def get_current_week(self):
         """Get the current NFL week number"""
         try:
-            data = self._make_request(f"{self.BASE_URL}/scoreboard")
+            data = self._make_request(f"{self.BASE_URL}/scoreboard", ttl=TTL_LIVE)
             return data.get('week', {}).get('number', 1)
         except Exception as e:
             raise ESPNAPIError(f"Failed to get current week: {str(e)}")
@@ -84,22 +79,25 @@ class ESPNAPI:
     def get_games(self, week):
         """Get all games for a specific week"""
         try:
-            data = self._make_request(f"{self.BASE_URL}/scoreboard", params={'week': week})
+            data = self._make_request(f"{self.BASE_URL}/scoreboard", params={'week': week}, ttl=scoreboard_ttl)
             if not data:
                 raise ESPNAPIError("Failed to fetch games: Empty response")
             return self._parse_game_data(data)
         except Exception as e:
             raise ESPNAPIError(f"Failed to fetch games: {str(e)}")
 
+    def iter_games(self, weeks):
+        """
+        Fetch several weeks concurrently.
+        Yields (week, games, error) as each week finishes.
+        """
+        yield from self.engine.map_unordered(self.get_games, weeks)
+
     def get_team_stats(self, team_abbr):
         """Get statistics for a specific team"""
         try:
             url = f"{self.BASE_URL}/teams/{team_abbr}/statistics"
-            response = requests.get(url, headers=self.headers)
-            if response.status_code != 200:
-                raise ESPNAPIError(f"Failed to fetch team stats: Status code {response.status_code}")
-            
-            data = response.json()
+            data = self._make_request(url, ttl=TTL_TEAM_STATS)
             if not data or 'stats' not in data:
                 raise ESPNAPIError("Failed to fetch team stats: Invalid response format")
             
@@ -107,6 +105,13 @@ class ESPNAPI:
         except Exception as e:
             raise ESPNAPIError(f"Failed to fetch team stats: {str(e)}")
 
+    def iter_team_stats(self, team_abbrs):
+        """
+        Fetch statistics for several teams concurrently.
+        Yields (team_abbr, stats, error) as each team finishes.
+        """
+        yield from self.engine.map_unordered(self.get_team_stats, team_abbrs)
+
     def update_game_scores(self, week):
         """Update scores for games in a specific week"""
         try:
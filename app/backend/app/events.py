@@ -0,0 +1,141 @@
+import json
+import time
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta
+from . import db
+from .models import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0         # How often each worker checks the change log
+HEARTBEAT_INTERVAL = 15.0   # Keeps idle connections open through proxies
+RETENTION = timedelta(hours=1)
+REPLAY_LIMIT = 500
+QUEUE_SIZE = 256
+
+def publish(kind, payload):
+    """Append an event to the change log inside the caller's transaction"""
+    db.session.add(ChangeEvent(kind=kind, payload=json.dumps(payload), created_at=datetime.utcnow()))
+
+def events_after(event_id, limit=REPLAY_LIMIT):
+    """Events newer than `event_id`, oldest first"""
+    return ChangeEvent.query.filter(ChangeEvent.id > event_id).order_by(ChangeEvent.id).limit(limit).all()
+
+def prune_events(now=None):
+    """Drop change log entries older than the retention window"""
+    cutoff = (now or datetime.utcnow()) - RETENTION
+    deleted = ChangeEvent.query.filter(ChangeEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+def format_event(event):
+    """Render a change log row as a Server-Sent Events frame"""
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {event.payload}\n\n"
+
+class Subscription:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = False
+
+class EventBroadcaster:
+    """
+    Fans the shared change log out to this worker's SSE connections. One
+    background poller per process reads new rows and copies them to every
+    subscriber, so the database sees one query per interval however many
+    clients are connected. Subscribers that fall too far behind are dropped
+    and reconnect with Last-Event-ID.
+    """
+
+    def __init__(self, app, poll_interval=POLL_INTERVAL):
+        self.app = app
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self.last_id = None
+
+    def subscribe(self):
+        if self.last_id is None:
+            # Anything already in the log is only sent on replay
+            self.last_id = db.session.query(db.func.max(ChangeEvent.id)).scalar() or 0
+        subscription = Subscription()
+        with self._lock:
+            self._subscribers.add(subscription)
+        self._ensure_started()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='event-broadcaster', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    logger.error(f"Error polling change log: {str(e)}")
+                finally:
+                    db.session.remove()
+            time.sleep(self.poll_interval)
+
+    def poll_once(self):
+        """Deliver change log rows written since the last poll"""
+        events = events_after(self.last_id)
+        if not events:
+            return 0
+        self.last_id = events[-1].id
+        frames = [(event.id, format_event(event)) for event in events]
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            for frame in frames:
+                try:
+                    subscription.queue.put_nowait(frame)
+                except queue.Full:
+                    subscription.dropped = True
+                    self.unsubscribe(subscription)
+                    break
+        return len(frames)
+
+def stream(broadcaster, subscription, last_event_id=None):
+    """
+    Generate the SSE body for one client: a replay of anything missed since
+    `last_event_id`, then live events and periodic heartbeats.
+    """
+    try:
+        yield f"retry: {int(POLL_INTERVAL * 3000)}\n\n"
+        sent = last_event_id or 0
+        if last_event_id is not None:
+            for event in events_after(last_event_id):
+                sent = event.id
+                yield format_event(event)
+        # Hand back the connection the login loader and subscribe() used; an
+        # idle stream must not hold a pool slot for its whole life
+        db.session.remove()
+
+        while not subscription.dropped:
+            try:
+                event_id, frame = subscription.queue.get(timeout=HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if event_id <= sent:
+                continue  # Already delivered by the replay
+            sent = event_id
+            yield frame
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,72 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+class HostRateLimiter:
+    """Space out requests to each host without blocking requests to other hosts"""
+
+    def __init__(self, requests_per_second):
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until the host of `url` may be called again"""
+        if not self.min_interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class FetchEngine:
+    """
+    Shared thread pool for upstream HTTP calls.
+    Concurrency is bounded by the pool size and each host is rate limited.
+    Jobs must not submit further jobs to the same engine.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_CONCURRENCY, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+        self.max_workers = max_workers
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+
+    def map_unordered(self, fn, items):
+        """
+        Run fn(item) for every item concurrently.
+        Yields (item, result, error) tuples in completion order.
+        """
+        futures = {self._executor.submit(fn, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                logger.error(f"Fetch job for {item} failed: {str(e)}")
+                yield item, None, e
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_fetch_engine():
+    """Return the process-wide fetch engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = FetchEngine(
+                    max_workers=int(os.environ.get('ESPN_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)),
+                    requests_per_second=float(os.environ.get('ESPN_REQUESTS_PER_SECOND', DEFAULT_REQUESTS_PER_SECOND))
+                )
+    return _engine
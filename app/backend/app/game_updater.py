@@ -1,29 +1,70 @@
 import requests
+import hashlib
 import logging
+import threading
+from collections import defaultdict
 from datetime import datetime
 from .models import Game
 from . import db
-from sqlalchemy import text
+from .fetch_engine import get_fetch_engine
+from .http_client import get_http_client
+from .response_cache import scoreboard_ttl
+from .ingest import to_espn_week
+from .scoring import apply_game_changes
+from .result_cache import bump_version, GAMES_VERSION
+from .events import publish
 
 logger = logging.getLogger(__name__)
 
-def get_espn_game_data(game_id):
+# Keeps a manual update from overlapping a scheduled one in the same process
+_update_lock = threading.Lock()
+
+SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
+
+def get_espn_week_data(season, week):
     """
-    Fetch game data from ESPN's API for a specific game.
+    Fetch the scoreboard for a whole week from ESPN's API.
+    One request covers every game of the week; weeks after the regular
+    season are fetched from the postseason scoreboard.
     """
     try:
-        url = f"https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard/{game_id}"
-        logger.info(f"Fetching game data from ESPN API: {url}")
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        logger.info(f"Successfully fetched data for game {game_id}")
+        season_type, espn_week = to_espn_week(week)
+        params = {
+            'limit': 100,
+            'dates': season,
+            'week': str(espn_week),
+            'seasontype': season_type
+        }
+        logger.info(f"Fetching scoreboard from ESPN API: {SCOREBOARD_URL} with params {params}")
+        data = get_http_client().get_json(SCOREBOARD_URL, params=params, ttl=scoreboard_ttl)
+        logger.info(f"Successfully fetched scoreboard for week {week} of {season}")
         return data
     except requests.RequestException as e:
-        logger.error(f"Error fetching ESPN data for game {game_id}: {str(e)}")
+        logger.error(f"Error fetching ESPN scoreboard for week {week} of {season}: {str(e)}")
         logger.exception(e)
         return None
 
+def index_events(espn_data):
+    """
+    Map a scoreboard payload's events by their ESPN id.
+    """
+    if not espn_data:
+        return {}
+    return {event['id']: event for event in espn_data.get('events', [])}
+
+def event_fingerprint(espn_data):
+    """
+    Compact digest of the upstream state we care about for a game:
+    status, scores, winner and game clock.
+    """
+    status = espn_data.get('status', {})
+    state = (
+        parse_game_status(espn_data),
+        status.get('period'),
+        status.get('displayClock')
+    )
+    return hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
+
 def parse_game_status(espn_data):
     """
     Parse game status from ESPN data.
@@ -49,16 +90,21 @@ def parse_game_status(espn_data):
         if 'competitions' in espn_data and espn_data['competitions']:
             competition = espn_data['competitions'][0]
             if 'competitors' in competition:
+                teams = {}
                 for team in competition['competitors']:
                     score = int(team.get('score', 0))
+                    teams[team['homeAway']] = team['team']['abbreviation']
                     if team['homeAway'] == 'home':
                         home_score = score
                     else:
                         away_score = score
 
-                # Determine winner if game is completed
+                # Determine winner if game is completed; a tie has no winner
                 if game_status == 'completed' and home_score is not None and away_score is not None:
-                    winner = competition['competitors'][0]['team']['abbreviation'] if home_score > away_score else competition['competitors'][1]['team']['abbreviation']
+                    if home_score > away_score:
+                        winner = teams.get('home')
+                    elif away_score > home_score:
+                        winner = teams.get('away')
 
         return game_status, home_score, away_score, winner
     except Exception as e:
@@ -68,61 +114,119 @@ def parse_game_status(espn_data):
 def update_game_scores():
     """
     Update game scores for all games that are in progress or completed.
-    This function is called every 5 minutes by the scheduler.
+    Active games are grouped by (season, week) and each week's scoreboard
+    is fetched once. Games whose upstream fingerprint is unchanged are
+    skipped without loading them. This function is called by the
+    GamePoller on the leader process and must not run twice at once
+    within a process.
+    Returns a list of changes: {'game_id', 'espn_id', 'changes': {field: [old, new]}}.
     """
+    if not _update_lock.acquire(blocking=False):
+        logger.info("Game update already running, skipping")
+        return []
+    try:
+        return _update_game_scores()
+    finally:
+        _update_lock.release()
+
+def _diff_game(game, espn_data, current_time):
+    """Compare upstream state with a Game row and return {field: [old, new]}"""
+    if espn_data is None:
+        # Not on the scoreboard; fall back to the kickoff time
+        if game.status == 'scheduled' and current_time >= game.start_time:
+            return {'status': [game.status, 'in_progress']}
+        return {}
+
+    status, home_score, away_score, winner = parse_game_status(espn_data)
+    changes = {}
+    if status and status != game.status:
+        changes['status'] = [game.status, status]
+    if home_score is not None and away_score is not None:
+        if game.final_score_home != home_score:
+            changes['final_score_home'] = [game.final_score_home, home_score]
+        if game.final_score_away != away_score:
+            changes['final_score_away'] = [game.final_score_away, away_score]
+    if winner and game.winner != winner:
+        changes['winner'] = [game.winner, winner]
+    return changes
+
+def _game_event(game, changes):
+    """Change log payload for a game whose state moved"""
+    return {
+        'game_id': game.id,
+        'espn_id': game.espn_id,
+        'season': game.season,
+        'week': game.week,
+        'status': game.status,
+        'final_score_home': game.final_score_home,
+        'final_score_away': game.final_score_away,
+        'winner': game.winner,
+        'changes': changes
+    }
+
+def _update_game_scores():
     try:
-        # Get all games that haven't been completed yet using db.text for the filter
+        # Only games that have kicked off can have new data upstream
         active_statuses = ['scheduled', 'in_progress']
-        games = db.session.query(Game).filter(text("status in ('scheduled', 'in_progress')")).all()
+        current_time = datetime.utcnow()
+        active = db.session.query(
+            Game.id, Game.espn_id, Game.season, Game.week, Game.upstream_fingerprint
+        ).filter(
+            Game.status.in_(active_statuses),
+            Game.start_time <= current_time
+        ).all()
         
-        if not games:
+        if not active:
             logger.info("No active games to update")
-            return
+            return []
 
-        logger.info(f"Checking scores for {len(games)} games")
-        current_time = datetime.utcnow()
-        updates_made = False
-        
-        for game in games:
-            logger.info(f"Processing game: {game.home_team} vs {game.away_team} (ESPN ID: {game.espn_id})")
-            
-            # Update game status based on start time
-            if game.status == 'scheduled' and current_time >= game.start_time:
-                game.status = 'in_progress'
-                updates_made = True
-                logger.info(f"Game {game.home_team} vs {game.away_team} is now in progress")
-            
-            # Fetch and update game data from ESPN
-            espn_data = get_espn_game_data(game.espn_id)
-            if espn_data:
-                status, home_score, away_score, winner = parse_game_status(espn_data)
-                logger.info(f"Parsed game data - Status: {status}, Score: {home_score}-{away_score}, Winner: {winner}")
-                
-                if status and status != game.status:
-                    logger.info(f"Updating game status from {game.status} to {status}")
-                    game.status = status
-                    updates_made = True
-                
-                if home_score is not None and away_score is not None:
-                    if game.final_score_home != home_score or game.final_score_away != away_score:
-                        logger.info(f"Updating scores from {game.final_score_home}-{game.final_score_away} to {home_score}-{away_score}")
-                        game.final_score_home = home_score
-                        game.final_score_away = away_score
-                        updates_made = True
-                
-                if winner and game.winner != winner:
-                    logger.info(f"Setting winner to {winner}")
-                    game.winner = winner
-                    updates_made = True
-
-        # Only commit if we made changes
-        if updates_made:
+        # Group games by week so each week's scoreboard is fetched once
+        games_by_week = defaultdict(list)
+        for row in active:
+            games_by_week[(row.season, row.week)].append(row)
+
+        # Fetch every week concurrently and keep only games whose upstream state moved
+        changed = {}
+        weeks = get_fetch_engine().map_unordered(lambda key: get_espn_week_data(*key), list(games_by_week))
+        for (season, week), espn_week_data, _ in weeks:
+            events = index_events(espn_week_data)
+            for row in games_by_week[(season, week)]:
+                espn_data = events.get(row.espn_id)
+                fingerprint = event_fingerprint(espn_data) if espn_data else None
+                if espn_data is None or fingerprint != row.upstream_fingerprint:
+                    changed[row.id] = (espn_data, fingerprint)
+
+        change_list = []
+        changed_ids = {}
+        if changed:
+            games = Game.query.filter(Game.id.in_(list(changed))).all()
+            for game in games:
+                espn_data, fingerprint = changed[game.id]
+                changes = _diff_game(game, espn_data, current_time)
+                for field, (_, new) in changes.items():
+                    setattr(game, field, new)
+                if fingerprint:
+                    game.upstream_fingerprint = fingerprint
+                if changes:
+                    change_list.append({'game_id': game.id, 'espn_id': game.espn_id, 'changes': changes})
+                    changed_ids[game.id] = changes
+                    logger.debug(f"Game {game.espn_id} ({game.away_team} at {game.home_team}) changed: {changes}")
+            # Keep the leaderboard tables and the change log in the same transaction as the results
+            leaderboard_deltas = apply_game_changes(change_list)
+            if change_list:
+                bump_version(GAMES_VERSION)
+                for game in games:
+                    if game.id in changed_ids:
+                        publish('game', _game_event(game, changed_ids[game.id]))
+            if leaderboard_deltas:
+                publish('leaderboard', {'changes': leaderboard_deltas})
             db.session.commit()
-            logger.info("Game updates committed successfully")
-        else:
-            logger.info("No updates needed for active games")
+
+        logger.info(f"Checked {len(active)} games: {len(changed)} with new upstream state, {len(change_list)} changed")
+        return change_list
 
     except Exception as e:
         logger.error(f"Error updating game scores: {str(e)}")
         logger.exception(e)
         db.session.rollback()
+        return []
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from .fetch_engine import get_fetch_engine
+from .response_cache import get_response_cache, cache_key
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class LatencyStats:
+    """Thread-safe per-endpoint call counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, endpoint, elapsed, error=False, retried=False):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {
+                'calls': 0,
+                'errors': 0,
+                'retries': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0
+            })
+            stats['calls'] += 1
+            stats['errors'] += int(error)
+            stats['retries'] += int(retried)
+            stats['total_seconds'] += elapsed
+            stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+    def snapshot(self):
+        """Return a copy of the counters with average latency filled in"""
+        with self._lock:
+            return {
+                endpoint: dict(
+                    stats,
+                    avg_seconds=round(stats['total_seconds'] / stats['calls'], 4) if stats['calls'] else 0.0
+                )
+                for endpoint, stats in self._stats.items()
+            }
+
+class HTTPClient:
+    """
+    Pooled keep-alive HTTP client for upstream APIs.
+    Every call has connect/read timeouts and is retried with jittered
+    exponential backoff on connection errors, 5xx and 429 responses.
+    JSON responses can be kept in a ResponseCache and revalidated with
+    conditional requests.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10.0, max_retries=3,
+                 backoff_base=0.5, backoff_max=8.0, pool_size=10, rate_limiter=None, cache=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.stats = LatencyStats()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Sleep before the next attempt, honouring Retry-After when given"""
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        time.sleep(min(delay, self.backoff_max))
+
+    def get(self, url, params=None, headers=None):
+        """GET `url`, retrying transient failures. Returns the final response."""
+        parsed = urlparse(url)
+        endpoint = parsed.netloc + parsed.path
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.wait(url)
+
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.stats.record(endpoint, time.monotonic() - start, error=True, retried=attempt > 0)
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Request to {endpoint} failed ({str(e)}), retrying")
+                self._backoff(attempt)
+                continue
+
+            failed = response.status_code in RETRY_STATUSES
+            self.stats.record(endpoint, time.monotonic() - start, error=failed, retried=attempt > 0)
+            if failed and attempt < self.max_retries:
+                logger.warning(f"Request to {endpoint} returned {response.status_code}, retrying")
+                self._backoff(attempt, response.headers.get('Retry-After'))
+                continue
+            return response
+
+    def get_json(self, url, params=None, headers=None, ttl=None):
+        """
+        GET `url` and decode its JSON body, raising HTTPError on failure.
+        When `ttl` is given (seconds, or a callable taking the decoded body)
+        the response is cached and revalidated with If-None-Match /
+        If-Modified-Since once it expires.
+        """
+        if self.cache is None or ttl is None:
+            return self._decode(self.get(url, params=params, headers=headers))
+
+        key = cache_key(url, params)
+        cached = self.cache.get(key)
+        if cached and cached.fresh:
+            return json.loads(cached.body)
+
+        request_headers = dict(headers or {})
+        if cached and cached.etag:
+            request_headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            request_headers['If-Modified-Since'] = cached.last_modified
+
+        try:
+            response = self.get(url, params=params, headers=request_headers)
+            if response.status_code == 304 and cached:
+                data = json.loads(cached.body)
+                self.cache.touch(key, ttl(data) if callable(ttl) else ttl)
+                return data
+            data = self._decode(response)
+        except requests.RequestException as e:
+            if cached:
+                logger.warning(f"Serving stale cached response for {key}: {str(e)}")
+                return json.loads(cached.body)
+            raise
+
+        self.cache.put(
+            key,
+            response.content,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            ttl=ttl(data) if callable(ttl) else ttl
+        )
+        return data
+
+    @staticmethod
+    def _decode(response):
+        if response.status_code >= 400:
+            raise requests.HTTPError(f"Request failed with status code {response.status_code}", response=response)
+        return response.json()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Return the process-wide HTTP client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                engine = get_fetch_engine()
+                _client = HTTPClient(
+                    connect_timeout=float(os.environ.get('ESPN_CONNECT_TIMEOUT', 3.05)),
+                    read_timeout=float(os.environ.get('ESPN_READ_TIMEOUT', 10)),
+                    max_retries=int(os.environ.get('ESPN_MAX_RETRIES', 3)),
+                    pool_size=engine.max_workers,
+                    rate_limiter=engine.rate_limiter,
+                    cache=get_response_cache()
+                )
+    return _client
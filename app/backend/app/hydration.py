@@ -0,0 +1,144 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import deque
+from datetime import timedelta
+from . import db
+from .models import Game
+from .leases import try_acquire, release
+from .game_updater import get_espn_week_data
+from .ingest import parse_scoreboard, upsert_games
+
+logger = logging.getLogger(__name__)
+
+HYDRATION_LEASE_TTL = timedelta(seconds=30)
+WAIT_TIMEOUT = 5.0      # How long a caller waits on another process's fetch
+POLL_INTERVAL = 0.25
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.callers = 1
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, timeout=None):
+        """
+        Run fn() once for all concurrent callers of `key`.
+        Returns (result, callers, shared): callers counts everyone served by
+        the execution and shared is False only for the caller that ran it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.callers += 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for {key}")
+            if call.error:
+                raise call.error
+            return call.result, call.callers, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, call.callers, False
+
+class HydrationStats:
+    """Per-process record of week fetches and how many callers each served"""
+
+    def __init__(self, history=50):
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.callers_served = 0
+        self.recent = deque(maxlen=history)
+
+    def record(self, season, week, state, callers):
+        with self._lock:
+            self.fetches += 1
+            self.callers_served += callers
+            self.recent.append({'season': season, 'week': week, 'state': state, 'callers': callers})
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'fetches': self.fetches,
+                'callers_served': self.callers_served,
+                'recent': list(self.recent)
+            }
+
+_flight = SingleFlight()
+stats = HydrationStats()
+
+def _week_loaded(season, week):
+    return db.session.query(Game.id).filter_by(season=season, week=week).first() is not None
+
+def _hydrate_across_processes(season, week):
+    """
+    Fetch and store a week unless another process is already doing it.
+    Returns 'ready', 'hydrating' or 'failed'.
+    """
+    name = f'hydrate:{season}:{week}'
+    holder = f'{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+    if try_acquire(name, holder, HYDRATION_LEASE_TTL):
+        try:
+            # Another process may have finished between our check and the lease
+            if _week_loaded(season, week):
+                return 'ready'
+            data = get_espn_week_data(season, week)
+            if not data or 'events' not in data:
+                logger.warning(f"No events found in ESPN API response for week {week} of {season}")
+                return 'failed'
+            counts = upsert_games(parse_scoreboard(data, season, week))
+            logger.info(f"Hydrated week {week} of {season}: {counts}")
+            return 'ready'
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            release(name, holder)
+
+    # Another process holds the lease; wait briefly for its rows to appear
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        db.session.rollback()  # Start a fresh read so the other process's commit is visible
+        if _week_loaded(season, week):
+            return 'ready'
+    return 'hydrating'
+
+def hydrate_week(season, week):
+    """
+    Make sure a week's games are in the database, fetching them at most once
+    across concurrent requests in this process and across worker processes.
+    Returns 'ready', 'hydrating' (another process is still fetching) or 'failed'.
+    """
+    state, callers, shared = _flight.do(
+        (season, week),
+        lambda: _hydrate_across_processes(season, week),
+        timeout=HYDRATION_LEASE_TTL.total_seconds()
+    )
+    if not shared:
+        stats.record(season, week, state, callers)
+        logger.info(f"Hydration of week {week} of {season} served {callers} callers ({state})")
+    return state
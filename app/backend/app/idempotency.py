@@ -0,0 +1,65 @@
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from . import db
+from .models import IdempotencyKey
+from .utils import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 100
+TTL = timedelta(hours=24)
+
+def request_digest(payload):
+    """Stable digest of a JSON request body, used to spot a key reused for a different request"""
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+def lookup_key(user_id, key, now=None):
+    """The unexpired record for a key, or None"""
+    now = now or datetime.utcnow()
+    return IdempotencyKey.query.filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at > now
+    ).first()
+
+def claim_key(user_id, key, digest, now=None):
+    """
+    Reserve a key inside the caller's transaction. Returns False when another
+    request already holds it, in which case nothing should be written.
+    An expired record for the same key is taken over.
+    """
+    now = now or datetime.utcnow()
+    table = IdempotencyKey.__table__
+    statement = dialect_insert(table).values(
+        user_id=user_id, key=key, request_digest=digest, expires_at=now + TTL
+    )
+    result = db.session.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.key],
+        set_={
+            'request_digest': statement.excluded.request_digest,
+            'status_code': None,
+            'response_body': None,
+            'expires_at': statement.excluded.expires_at
+        },
+        where=table.c.expires_at <= now
+    ))
+    return result.rowcount > 0
+
+def record_response(user_id, key, status_code, body):
+    """Store the response for a claimed key; commits with the caller's writes"""
+    IdempotencyKey.query.filter_by(user_id=user_id, key=key).update(
+        {'status_code': status_code, 'response_body': json.dumps(body)},
+        synchronize_session=False
+    )
+
+def prune_idempotency_keys(now=None):
+    """Drop expired keys"""
+    deleted = IdempotencyKey.query.filter(
+        IdempotencyKey.expires_at <= (now or datetime.utcnow())
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,122 @@
+import logging
+from datetime import datetime
+import pytz
+from sqlalchemy import or_
+from . import db
+from .models import Game
+from .utils import dialect_insert
+from .result_cache import bump_version, GAMES_VERSION
+
+logger = logging.getLogger(__name__)
+
+EASTERN = pytz.timezone('US/Eastern')
+
+REGULAR_SEASON_WEEKS = 18
+# ESPN numbers postseason weeks 1-5 under seasontype 3; week 4 is the Pro Bowl.
+# They are stored after the regular season, e.g. the wild card round is week 19.
+POSTSEASON_WEEKS = (1, 2, 3, 5)
+
+# Columns owned by the schedule; scores and status belong to the game updater
+SCHEDULE_COLUMNS = ('week', 'season', 'home_team', 'away_team', 'start_time', 'is_mnf')
+
+def current_season(now=None):
+    """NFL season year; January to July still belongs to the previous season"""
+    now = now or datetime.now()
+    return now.year - 1 if now.month < 8 else now.year
+
+def season_weeks(include_postseason=True):
+    """Every stored week number of a season"""
+    weeks = list(range(1, REGULAR_SEASON_WEEKS + 1))
+    if include_postseason:
+        weeks += [REGULAR_SEASON_WEEKS + week for week in POSTSEASON_WEEKS]
+    return weeks
+
+def to_espn_week(week):
+    """Map a stored week number to ESPN's (seasontype, week) pair"""
+    if week <= REGULAR_SEASON_WEEKS:
+        return 2, week
+    return 3, week - REGULAR_SEASON_WEEKS
+
+def parse_espn_datetime(value):
+    """Parse ESPN's UTC timestamps, which may or may not include seconds"""
+    for fmt in ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%MZ"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised ESPN date: {value}")
+
+def parse_scoreboard(data, season, week):
+    """
+    Turn a scoreboard payload into Game row dicts.
+    Events without both a home and an away team are skipped.
+    """
+    rows = []
+    for event in (data or {}).get('events', []):
+        competition = event['competitions'][0]
+        home_team = None
+        away_team = None
+
+        for team in competition['competitors']:
+            if team['homeAway'] == 'home':
+                home_team = team['team']['abbreviation']
+            else:
+                away_team = team['team']['abbreviation']
+
+        if not (home_team and away_team):
+            continue
+
+        start_time = parse_espn_datetime(competition.get('date') or event['date'])
+        kickoff_eastern = pytz.utc.localize(start_time).astimezone(EASTERN)
+        rows.append({
+            'espn_id': event['id'],
+            'week': week,
+            'season': season,
+            'home_team': home_team,
+            'away_team': away_team,
+            'start_time': start_time,
+            'is_mnf': kickoff_eastern.weekday() == 0
+        })
+    return rows
+
+def upsert_games(rows):
+    """
+    Write schedule rows with a single INSERT ... ON CONFLICT(espn_id) DO UPDATE.
+    Existing rows are only rewritten when a schedule column changed.
+    Returns counts of inserted, updated and unchanged rows.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    if not rows:
+        return counts
+
+    # Deduplicate on espn_id so one statement never touches a row twice
+    rows = list({row['espn_id']: row for row in rows}.values())
+
+    existing = {
+        row.espn_id: row
+        for row in db.session.query(Game.espn_id, *[getattr(Game, col) for col in SCHEDULE_COLUMNS])
+        .filter(Game.espn_id.in_([row['espn_id'] for row in rows]))
+    }
+    for row in rows:
+        current = existing.get(row['espn_id'])
+        if current is None:
+            counts['inserted'] += 1
+        elif any(getattr(current, col) != row[col] for col in SCHEDULE_COLUMNS):
+            counts['updated'] += 1
+        else:
+            counts['unchanged'] += 1
+
+    table = Game.__table__
+    statement = dialect_insert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.espn_id],
+        set_={col: statement.excluded[col] for col in SCHEDULE_COLUMNS},
+        where=or_(*[table.c[col].is_distinct_from(statement.excluded[col]) for col in SCHEDULE_COLUMNS])
+    )
+    db.session.execute(statement)
+    if counts['inserted'] or counts['updated']:
+        bump_version(GAMES_VERSION)
+    db.session.commit()
+
+    logger.info(f"Upserted {len(rows)} games: {counts}")
+    return counts
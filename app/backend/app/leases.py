@@ -0,0 +1,36 @@
+import logging
+from datetime import datetime
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .models import Lease
+
+logger = logging.getLogger(__name__)
+
+def try_acquire(name, holder, ttl):
+    """
+    Take or renew the lease `name` for `holder` for `ttl` (a timedelta).
+    Succeeds when the lease is free, expired or already held by `holder`.
+    Returns True when `holder` owns the lease afterwards.
+    """
+    now = datetime.utcnow()
+    try:
+        if db.session.get(Lease, name) is None:
+            db.session.add(Lease(name=name, holder=holder, expires_at=now + ttl))
+            db.session.commit()
+            return True
+    except IntegrityError:
+        # Another process created the row first
+        db.session.rollback()
+
+    acquired = Lease.query.filter(
+        Lease.name == name,
+        or_(Lease.holder == holder, Lease.expires_at < now)
+    ).update({'holder': holder, 'expires_at': now + ttl}, synchronize_session=False)
+    db.session.commit()
+    return acquired == 1
+
+def release(name, holder):
+    """Give up the lease `name` if `holder` owns it"""
+    Lease.query.filter_by(name=name, holder=holder).delete(synchronize_session=False)
+    db.session.commit()
@@ -36,8 +36,13 @@ class Game(db.Model):
     final_score_away = db.Column(db.Integer)
     winner = db.Column(db.String(3))
     status = db.Column(db.String(20), server_default='scheduled', nullable=False)
+    upstream_fingerprint = db.Column(db.String(16))
     picks = db.relationship('Pick', backref='game', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_game_status_start_time', 'status', 'start_time'),
+    )
+
     @property
     def is_finished(self):
         return self.status == 'completed'
@@ -55,6 +60,68 @@ class Pick(db.Model):
     mnf_total_points = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('uq_pick_user_id_game_id', 'user_id', 'game_id', unique=True),
+        db.Index('ix_pick_user_id_week_game_id', 'user_id', 'week', 'game_id'),
+    )
+
     @property
     def is_correct(self):
         return self.game.winner == self.picked_team if self.game.winner else None
+
+class Lease(db.Model):
+    """A named, expiring lock shared by every worker process"""
+    name = db.Column(db.String(100), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class DataVersion(db.Model):
+    """A named counter bumped whenever the data behind cached responses changes"""
+    __tablename__ = 'data_version'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime)
+
+class UserWeekScore(db.Model):
+    """Per-user weekly totals, kept in step with picks and game results"""
+    __tablename__ = 'user_week_score'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    season = db.Column(db.Integer, primary_key=True)
+    week = db.Column(db.Integer, primary_key=True)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    tiebreak_delta = db.Column(db.Integer)  # |MNF total points guess - actual|
+
+class UserSeasonScore(db.Model):
+    """Per-user season totals, derived from UserWeekScore"""
+    __tablename__ = 'user_season_score'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    season = db.Column(db.Integer, primary_key=True)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    weeks_played = db.Column(db.Integer, nullable=False, default=0)
+
+class GamePickCount(db.Model):
+    """How many users picked each side of a game, kept in step with pick submissions"""
+    __tablename__ = 'game_pick_count'
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), primary_key=True)
+    home_picks = db.Column(db.Integer, nullable=False, default=0)
+    away_picks = db.Column(db.Integer, nullable=False, default=0)
+
+class ChangeEvent(db.Model):
+    """Append-only log of changes pushed to clients over Server-Sent Events"""
+    __tablename__ = 'change_event'
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class IdempotencyKey(db.Model):
+    """Stored outcome of a request sent with an Idempotency-Key header"""
+    __tablename__ = 'idempotency_key'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    key = db.Column(db.String(100), primary_key=True)
+    request_digest = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
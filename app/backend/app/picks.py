@@ -0,0 +1,172 @@
+import logging
+from sqlalchemy import or_, tuple_
+from . import db
+from .models import User, Game, Pick
+from .utils import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Columns a resubmitted pick can change
+PICK_COLUMNS = ('picked_team', 'week', 'mnf_total_points')
+
+def _validate(entry, schedule, week, seen, now):
+    """Reason a submitted pick cannot be saved, or None"""
+    if not isinstance(entry, dict) or not isinstance(entry.get('game_id'), int):
+        return 'Invalid pick'
+    game = schedule.get(entry['game_id'])
+    if game is None:
+        return 'Game not found'
+    if game.week != week:
+        return f'Game is not in week {week}'
+    if entry['game_id'] in seen:
+        return 'Duplicate pick for game'
+    if schedule.is_locked(game, now):
+        return 'Game is locked'
+    if entry.get('picked_team') not in (game.home_team, game.away_team):
+        return 'Team is not playing in this game'
+    points = entry.get('mnf_total_points')
+    if points is not None and (not isinstance(points, int) or isinstance(points, bool) or points < 0):
+        return 'Invalid MNF total points'
+    return None
+
+def save_week_picks(user_id, week, submitted, schedule, now):
+    """
+    Make the user's saved picks for `week` of the schedule's season match
+    `submitted` with one INSERT ... ON CONFLICT(user_id, game_id) DO UPDATE
+    covering only the picks that changed, plus one DELETE for open week
+    picks left out of the submission. Games are validated against the
+    in-memory schedule; locked games and rejected entries keep their saved
+    pick. Runs in the caller's transaction and returns:
+      results  per-game outcome: unchanged, updated, inserted, removed or rejected
+      removed  (game_id, picked_team) pairs that no longer count
+      added    (game_id, picked_team) pairs that now count
+    """
+    week_games = {game.id: game for game in schedule.week(week)}
+    existing = {
+        pick.game_id: pick
+        for pick in db.session.query(Pick.game_id, *[getattr(Pick, col) for col in PICK_COLUMNS]).filter(
+            Pick.user_id == user_id,
+            Pick.game_id.in_(list(week_games))
+        )
+    } if week_games else {}
+
+    results, rows, removed, added = [], [], [], []
+    seen = set()
+    for entry in submitted:
+        reason = _validate(entry, schedule, week, seen, now)
+        if reason:
+            results.append({'game_id': entry.get('game_id') if isinstance(entry, dict) else None,
+                            'outcome': 'rejected', 'reason': reason})
+            continue
+        game_id = entry['game_id']
+        seen.add(game_id)
+        row = {
+            'user_id': user_id,
+            'game_id': game_id,
+            'picked_team': entry['picked_team'],
+            'week': week,
+            'mnf_total_points': entry.get('mnf_total_points')
+        }
+        current = existing.get(game_id)
+        if current is None:
+            outcome = 'inserted'
+            added.append((game_id, row['picked_team']))
+        elif any(getattr(current, col) != row[col] for col in PICK_COLUMNS):
+            outcome = 'updated'
+            if current.picked_team != row['picked_team']:
+                removed.append((game_id, current.picked_team))
+                added.append((game_id, row['picked_team']))
+        else:
+            results.append({'game_id': game_id, 'outcome': 'unchanged'})
+            continue
+        rows.append(row)
+        results.append({'game_id': game_id, 'outcome': outcome})
+
+    # Open week picks missing from the submission are withdrawn
+    attempted = {entry.get('game_id') for entry in submitted if isinstance(entry, dict)}
+    dropped = [
+        pick for game_id, pick in existing.items()
+        if game_id not in attempted and not schedule.is_locked(week_games[game_id], now)
+    ]
+    for pick in dropped:
+        removed.append((pick.game_id, pick.picked_team))
+        results.append({'game_id': pick.game_id, 'outcome': 'removed'})
+
+    if rows:
+        table = Pick.__table__
+        statement = dialect_insert(table).values(rows)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.game_id],
+            set_={col: statement.excluded[col] for col in PICK_COLUMNS}
+        ))
+    if dropped:
+        Pick.query.filter(
+            Pick.user_id == user_id,
+            Pick.game_id.in_([pick.game_id for pick in dropped])
+        ).delete(synchronize_session=False)
+
+    return {'results': results, 'removed': removed, 'added': added}
+
+HISTORY_PAGE_SIZE = 500
+MAX_HISTORY_PAGE_SIZE = 2000
+
+def parse_weeks(value):
+    """'3' or '1-18' as an inclusive (first, last) pair; None when malformed"""
+    try:
+        first, _, last = value.partition('-')
+        first, last = int(first), int(last or first)
+    except (AttributeError, ValueError):
+        return None
+    return (first, last) if 1 <= first <= last else None
+
+def format_cursor(week, game_id, user_id):
+    return f'{week}.{game_id}.{user_id}'
+
+def parse_cursor(value):
+    """Keyset position after which the next page starts; None when malformed"""
+    try:
+        week, game_id, user_id = (int(part) for part in value.split('.'))
+    except (AttributeError, ValueError):
+        return None
+    return week, game_id, user_id
+
+def pick_history(season, weeks, user_id=None, after=None, limit=HISTORY_PAGE_SIZE, viewer_id=None, now=None):
+    """
+    Picks of a season's week range ordered by (week, game_id, user_id), one
+    page per query: each page starts strictly after the `after` cursor, so
+    paging costs the same at any depth. For one user the filter and order
+    follow ix_pick_user_id_week_game_id. When `now` is given, picks other
+    than the viewer's own are hidden until their game kicks off.
+    Returns a query of limit + 1 rows so callers can tell if there is more.
+    """
+    first_week, last_week = weeks
+    query = db.session.query(
+        Pick.id, Pick.user_id, User.username, Pick.week, Pick.game_id, Pick.picked_team,
+        Pick.mnf_total_points, Game.home_team, Game.away_team, Game.start_time, Game.winner
+    ).join(Game, Game.id == Pick.game_id).join(User, User.id == Pick.user_id).filter(
+        Game.season == season,
+        Pick.week.between(first_week, last_week)
+    )
+    if user_id is not None:
+        query = query.filter(Pick.user_id == user_id)
+    if now is not None:
+        query = query.filter(or_(Pick.user_id == viewer_id, Game.start_time <= now))
+    if after is not None:
+        query = query.filter(tuple_(Pick.week, Pick.game_id, Pick.user_id) > tuple_(*after))
+    return query.order_by(Pick.week, Pick.game_id, Pick.user_id).limit(limit + 1)
+
+def history_row(row):
+    """JSON form of a pick_history row"""
+    return {
+        'id': row.id,
+        'user_id': row.user_id,
+        'username': row.username,
+        'week': row.week,
+        'game_id': row.game_id,
+        'home_team': row.home_team,
+        'away_team': row.away_team,
+        'start_time': row.start_time.isoformat(),
+        'picked_team': row.picked_team,
+        'mnf_total_points': row.mnf_total_points,
+        'is_correct': row.winner == row.picked_team if row.winner else None
+    }
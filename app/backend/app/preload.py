@@ -0,0 +1,75 @@
+import logging
+import click
+from flask.cli import with_appcontext
+from . import db
+from .models import Game
+from .fetch_engine import get_fetch_engine
+from .game_updater import get_espn_week_data
+from .ingest import current_season, season_weeks, parse_scoreboard, upsert_games
+
+logger = logging.getLogger(__name__)
+
+def loaded_weeks(season):
+    """Weeks of `season` that already have games in the database"""
+    return {week for (week,) in db.session.query(Game.week).filter(Game.season == season).distinct()}
+
+def preload_season(season, include_postseason=True, refresh=False, progress=None):
+    """
+    Fetch every week of `season` concurrently and bulk-load the games.
+    Weeks already in the database are skipped unless `refresh` is set, so an
+    interrupted load resumes where it stopped. `progress` is called with
+    (week, counts, error) as each week finishes.
+    Returns total inserted/updated/unchanged counts plus failed weeks.
+    """
+    weeks = season_weeks(include_postseason)
+    if not refresh:
+        done = loaded_weeks(season)
+        weeks = [week for week in weeks if week not in done]
+
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': []}
+    results = get_fetch_engine().map_unordered(lambda week: get_espn_week_data(season, week), weeks)
+    for week, data, error in results:
+        counts = None
+        if data is None:
+            error = error or RuntimeError('no scoreboard returned')
+        else:
+            try:
+                counts = upsert_games(parse_scoreboard(data, season, week))
+                for key in ('inserted', 'updated', 'unchanged'):
+                    totals[key] += counts[key]
+            except Exception as e:
+                db.session.rollback()
+                error = e
+
+        if error:
+            totals['failed'].append(week)
+            logger.error(f"Failed to preload week {week} of {season}: {str(error)}")
+        if progress:
+            progress(week, counts, error)
+
+    totals['failed'].sort()
+    logger.info(f"Preloaded {season} schedule: {totals}")
+    return totals
+
+@click.command('preload-schedule')
+@click.option('--season', type=int, default=None, help='Season year, defaults to the current season.')
+@click.option('--postseason/--no-postseason', default=True, help='Include postseason weeks.')
+@click.option('--refresh', is_flag=True, help='Re-fetch weeks that are already loaded.')
+@with_appcontext
+def preload_schedule_command(season, postseason, refresh):
+    """Load a full season schedule from ESPN into the database."""
+    season = season or current_season()
+    click.echo(f"Preloading {season} schedule...")
+
+    def report(week, counts, error):
+        if error:
+            click.echo(f"  week {week}: failed ({error})")
+        else:
+            click.echo(f"  week {week}: {counts['inserted']} inserted, "
+                       f"{counts['updated']} updated, {counts['unchanged']} unchanged")
+
+    totals = preload_season(season, include_postseason=postseason, refresh=refresh, progress=report)
+    click.echo(f"Done: {totals['inserted']} inserted, {totals['updated']} updated, "
+               f"{totals['unchanged']} unchanged")
+    if totals['failed']:
+        click.echo(f"Failed weeks (re-run to resume): {', '.join(map(str, totals['failed']))}")
@@ -0,0 +1,152 @@
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMULATIONS = 100000
+MAX_SIMULATIONS = 500000
+CHUNK_SIZE = 10000
+# Home wins are drawn as 16-bit integers below the game's threshold
+OUTCOME_RESOLUTION = 65535
+# Unplayed MNF totals are drawn from a normal distribution around the
+# season's average total; this is the spread of NFL game totals
+MNF_TOTAL_SD = 13.5
+DEFAULT_MNF_TOTAL = 44.0
+# Guesses and totals are capped so every real distance sorts ahead of a
+# missing guess, and score * 2 * penalty stays exact in float32
+MAX_MNF_TOTAL = 500
+NO_GUESS_PENALTY = 1000
+
+def default_week(matrix):
+    """The first week that still has unplayed games, else the last week"""
+    open_weeks = np.unique(matrix.weeks[~matrix.completed])
+    if len(open_weeks):
+        return int(open_weeks[0])
+    return int(matrix.week_numbers[-1]) if len(matrix.week_numbers) else None
+
+def _shared_wins(scores):
+    """Per-user win credit summed over simulations; ties split the win"""
+    top = (scores == scores.max(axis=1, keepdims=True)).astype(np.float32)
+    return (1 / top.sum(axis=1)) @ top
+
+def _contenders(known, reachable, playing):
+    """Users who can still reach the score the leader already has for certain"""
+    if not playing.any():
+        return np.flatnonzero(playing)
+    return np.flatnonzero(playing & (known + reachable >= known[playing].max()))
+
+def simulate(matrix, week, simulations=DEFAULT_SIMULATIONS, home_win_probability=None, seed=None):
+    """
+    Play out every unfinished game of the season `simulations` times and
+    return each user's probability of winning `week` and the season.
+    `home_win_probability` maps game ids to the home team's chance of
+    winning; unlisted games are coin flips. Week ties go to the closest MNF
+    total guess, remaining ties share the win.
+    Each simulation's scores come from a single product of the home-win
+    outcomes with every contender's pick swing, and users who can no longer
+    catch the leader are left out of the simulation entirely.
+    """
+    rng = np.random.default_rng(seed)
+    home_win_probability = home_win_probability or {}
+    users = len(matrix.user_ids)
+
+    # This week's open games first, so they are a leading slice of the outcomes
+    open_games = ~matrix.completed
+    week_games = matrix.weeks == week
+    remaining = np.concatenate([np.flatnonzero(open_games & week_games), np.flatnonzero(open_games & ~week_games)])
+    week_remaining = int((open_games & week_games).sum())
+    probabilities = np.array([
+        home_win_probability.get(int(matrix.game_ids[game]), 0.5) for game in remaining
+    ], dtype=np.float64).clip(0, 1)
+    thresholds = (probabilities * OUTCOME_RESOLUTION).round().astype(np.uint16)
+
+    picks = matrix.picks[:, remaining]
+    picked_home = picks == matrix.home_codes[remaining][None, :]
+    picked_away = picks == matrix.away_codes[remaining][None, :]
+    picked_open = picked_home | picked_away
+
+    correct = matrix.correct() & matrix.completed[None, :]
+    week_correct = (correct & week_games[None, :]).sum(axis=1)
+    season_correct = correct.sum(axis=1)
+    season_users = _contenders(season_correct, picked_open.sum(axis=1), matrix.picked().any(axis=1))
+    week_users = _contenders(
+        week_correct, picked_open[:, :week_remaining].sum(axis=1),
+        (matrix.picked() & week_games[None, :]).any(axis=1)
+    )
+
+    # A user's correct picks are their settled ones plus every open away
+    # pick, moved by +1 for each home win they picked and -1 for each home
+    # win they picked against. The counts are small integers, exact in float32.
+    swing = (picked_home.astype(np.float32) - picked_away).T
+    season_swing = np.ascontiguousarray(swing[:, season_users])
+    week_swing = np.ascontiguousarray(swing[:week_remaining, week_users])
+    season_base = (season_correct + picked_away.sum(axis=1))[season_users].astype(np.float32)
+    week_base = (week_correct + picked_away[:, :week_remaining].sum(axis=1))[week_users].astype(np.float32)
+
+    # MNF tiebreak: fixed once the game is final, otherwise drawn per
+    # simulation. Week scores are ranked as score * 2 * penalty - distance
+    # from the total, with a missing guess costing the penalty plus the total.
+    mnf_games = np.flatnonzero(week_games & matrix.mnf)
+    mnf_game = mnf_games[-1] if len(mnf_games) else None
+    guesses = None
+    if mnf_game is not None and len(week_users):
+        guessed = (matrix.guesses[week_users, mnf_game] >= 0) & (matrix.picks[week_users, mnf_game] != 0)
+        guesses = np.where(guessed, np.minimum(matrix.guesses[week_users, mnf_game], MAX_MNF_TOTAL), 0).astype(np.float32)
+        week_swing *= NO_GUESS_PENALTY * 2
+        week_base = (week_base * (NO_GUESS_PENALTY * 2) - np.where(guessed, 0, NO_GUESS_PENALTY)).astype(np.float32)
+        scored_totals = matrix.points[matrix.completed & matrix.scored]
+        mnf_mean = scored_totals.mean() if len(scored_totals) else DEFAULT_MNF_TOTAL
+        mnf_final = matrix.completed[mnf_game] and matrix.scored[mnf_game]
+
+    week_wins = np.zeros(users)
+    season_wins = np.zeros(users)
+    for start in range(0, simulations, CHUNK_SIZE):
+        if start:
+            # Let other greenlets (SSE streams) run between chunks
+            time.sleep(0)
+        size = min(CHUNK_SIZE, simulations - start)
+        draws = rng.integers(0, OUTCOME_RESOLUTION, (size, len(remaining)), dtype=np.uint16)
+        home_wins = (draws < thresholds).astype(np.float32)
+
+        if len(season_users):
+            season_wins[season_users] += _shared_wins(home_wins @ season_swing + season_base)
+        if len(week_users):
+            week_scores = home_wins[:, :week_remaining] @ week_swing + week_base
+            if guesses is not None:
+                if mnf_final:
+                    totals = np.full((size, 1), min(float(matrix.points[mnf_game]), MAX_MNF_TOTAL), dtype=np.float32)
+                else:
+                    totals = rng.normal(mnf_mean, MNF_TOTAL_SD, (size, 1)).round().clip(0, MAX_MNF_TOTAL).astype(np.float32)
+                week_scores -= np.abs(guesses - totals)
+            week_wins[week_users] += _shared_wins(week_scores)
+
+    return {
+        'remaining_games': {'week': week_remaining, 'season': len(remaining)},
+        'week': week_wins / simulations,
+        'season': season_wins / simulations
+    }
+
+def project(matrix, week=None, simulations=DEFAULT_SIMULATIONS, home_win_probability=None, seed=None):
+    """JSON-ready projections for every user in the matrix"""
+    week = week or default_week(matrix)
+    if week is None:
+        return {'season': matrix.season, 'week': None, 'simulations': 0, 'remaining_games': {}, 'users': []}
+
+    result = simulate(matrix, week, simulations, home_win_probability, seed)
+    users = [{
+        'id': int(user_id),
+        'username': username,
+        'week_win_probability': round(float(week_probability), 4),
+        'season_win_probability': round(float(season_probability), 4)
+    } for user_id, username, week_probability, season_probability in zip(
+        matrix.user_ids, matrix.usernames, result['week'], result['season']
+    )]
+    users.sort(key=lambda user: (-user['week_win_probability'], -user['season_win_probability'], user['username']))
+    return {
+        'season': matrix.season,
+        'week': week,
+        'simulations': simulations,
+        'remaining_games': result['remaining_games'],
+        'users': users
+    }
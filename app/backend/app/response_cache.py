@@ -0,0 +1,141 @@
+import os
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
+
+# Time-to-live per endpoint class, in seconds
+TTL_LIVE = 20
+TTL_FINAL = 7 * 24 * 60 * 60
+TTL_TEAM_STATS = 6 * 60 * 60
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'etag', 'last_modified', 'fresh'])
+
+def scoreboard_ttl(data):
+    """Weeks where every game is final never change; anything else is live"""
+    events = data.get('events', []) if data else []
+    if events and all(
+        event.get('status', {}).get('type', {}).get('completed', False)
+        for event in events
+    ):
+        return TTL_FINAL
+    return TTL_LIVE
+
+def cache_key(url, params=None):
+    """Build a stable key from a URL and its query parameters"""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted((str(k), str(v)) for k, v in params.items()))}"
+
+class ResponseCache:
+    """
+    Persistent store of upstream response bodies and their validators.
+    Bodies are zlib-compressed and the least recently used entries are
+    evicted once the total stored size exceeds `max_bytes`.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # Connections must not be shared across forked workers
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS cached_response (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS ix_cached_response_last_access ON cached_response (last_access)')
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key):
+        """Return the cached entry for `key`, or None"""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT etag, last_modified, body, expires_at FROM cached_response WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            conn.execute('UPDATE cached_response SET last_access = ? WHERE key = ?', (now, key))
+        etag, last_modified, body, expires_at = row
+        return CachedResponse(zlib.decompress(body), etag, last_modified, expires_at > now)
+
+    def put(self, key, body, etag=None, last_modified=None, ttl=TTL_LIVE):
+        """Store a response body with its validators"""
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO cached_response '
+                '(key, etag, last_modified, body, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, etag, last_modified, compressed, len(compressed), now + ttl, now)
+            )
+            self._evict(conn)
+
+    def touch(self, key, ttl):
+        """Extend the lifetime of an entry that upstream revalidated"""
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                'UPDATE cached_response SET expires_at = ?, last_access = ? WHERE key = ?',
+                (now + ttl, now, key)
+            )
+
+    def total_size(self):
+        with self._lock:
+            return self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM cached_response').fetchone()[0]
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cached_response').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute('SELECT key, size FROM cached_response ORDER BY last_access').fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM cached_response WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} cached responses, {total} bytes remain")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """Return the process-wide response cache, or None when disabled"""
+    global _cache
+    if os.environ.get('ESPN_CACHE_ENABLED', 'true').lower() == 'false':
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    os.environ.get('ESPN_CACHE_PATH', os.path.join(DATA_DIR, 'espn_cache.db')),
+                    max_bytes=int(os.environ.get('ESPN_CACHE_MAX_MB', 64)) * 1024 * 1024
+                )
+    return _cache
@@ -0,0 +1,144 @@
+import os
+import logging
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from flask import current_app, g
+from sqlalchemy import case
+from . import db
+from .models import DataVersion
+from .utils import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Version of everything the leaderboards and stats are computed from
+SCORES_VERSION = 'scores'
+# Versions of the schedule and results, and of submitted picks
+GAMES_VERSION = 'games'
+PICKS_VERSION = 'picks'
+USERS_VERSION = 'users'
+
+def data_version(name=SCORES_VERSION):
+    """Current value of a shared data version, 0 before its first bump"""
+    version = db.session.query(DataVersion.version).filter_by(name=name).scalar()
+    return version or 0
+
+def bump_version(name=SCORES_VERSION, minimum=None):
+    """
+    Increment a shared data version inside the caller's transaction, so every
+    worker sees the new version exactly when the data change commits.
+    `minimum` forces the version past a known value, e.g. after a restore.
+    """
+    table = DataVersion.__table__
+    now = datetime.utcnow()
+    start = max(1, minimum or 0)
+    statement = dialect_insert(table).values(name=name, version=start, updated_at=now)
+    next_version = table.c.version + 1
+    if minimum is not None:
+        next_version = case((next_version < minimum, minimum), else_=next_version)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={'version': next_version, 'updated_at': now}
+    ))
+
+def data_versions(names):
+    """{name: (version, updated_at)} for several versions in one query"""
+    rows = db.session.query(DataVersion.name, DataVersion.version, DataVersion.updated_at).filter(
+        DataVersion.name.in_(names)
+    )
+    versions = {name: (0, None) for name in names}
+    versions.update({name: (version, updated_at) for name, version, updated_at in rows})
+    return versions
+
+class ResultCache:
+    """
+    In-process LRU of serialized JSON responses. Keys carry the data version
+    they were computed from, so a bump makes old entries unreachable and they
+    age out once the total size passes `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """Return the process-wide result cache, or None when disabled"""
+    global _cache
+    if os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'false':
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(max_bytes=int(os.environ.get('RESULT_CACHE_MAX_MB', 8)) * 1024 * 1024)
+    return _cache
+
+def cached_body(key, compute, mimetype, versions=(SCORES_VERSION,)):
+    """
+    Serve the bytes returned by `compute()`, reusing the body computed for
+    the same key at the current values of `versions`. Exceptions are not cached.
+    """
+    cache = get_result_cache()
+    known = g.get('data_versions') or {}
+    if not all(name in known for name in versions):
+        known = data_versions(versions)
+    versioned_key = tuple(known[name][0] for name in versions) + tuple(key)
+    body = cache.get(versioned_key) if cache else None
+    if body is None:
+        body = compute()
+        if cache:
+            cache.put(versioned_key, body)
+    return current_app.response_class(body, mimetype=mimetype)
+
+def cached_json(key, compute, versions=(SCORES_VERSION,)):
+    """Serve `compute()` as JSON through cached_body"""
+    return cached_body(
+        ('json',) + tuple(key),
+        lambda: current_app.json.dumps(compute()).encode('utf-8'),
+        'application/json',
+        versions
+    )
@@ -1,13 +1,25 @@
-from flask import Blueprint, jsonify, request, send_file, current_app
+from flask import Blueprint, jsonify, request, send_file, current_app, g, Response, stream_with_context
 from flask_login import current_user, login_user, logout_user, login_required
 from . import db, bcrypt, User, Game, Pick, login_manager
 from datetime import datetime, timedelta
 import json
-from sqlalchemy import case, func, distinct
+from sqlalchemy import func, or_
 from .utils import require_admin, DatabaseManager
+from .ingest import current_season, season_weeks
+from .hydration import hydrate_week, stats as hydration_stats
+from .scoring import refresh_week_scores, apply_pick_changes, week_consensus
+from .columnar import get_scoring_engine, get_columnar_engine, encode_head_to_head, head_to_head_json
+from .events import stream
+from .picks import save_week_picks, pick_history, history_row, parse_weeks, parse_cursor, format_cursor, HISTORY_PAGE_SIZE, MAX_HISTORY_PAGE_SIZE
+from .schedule_index import get_schedule_index
+from .write_queue import run_write
+from .idempotency import IDEMPOTENCY_HEADER, MAX_KEY_LENGTH, request_digest, lookup_key, claim_key, record_response
+from .projections import project, DEFAULT_SIMULATIONS, MAX_SIMULATIONS
+from .result_cache import cached_json, cached_body, bump_version, data_versions, get_result_cache, SCORES_VERSION, GAMES_VERSION, PICKS_VERSION, USERS_VERSION
+from .conditional import conditional_get, IMMUTABLE_MAX_AGE
+from .http_client import get_http_client
 from functools import wraps
 import logging
-import requests
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -91,8 +103,22 @@ def change_password():
     logger.info(f'Password changed for user: {current_user.username}')
     return jsonify({'success': True})
 
+def _int_arg(name):
+    return request.args.get(name, type=int)
+
+def _replay_response(stored, digest):
+    """The stored response for an Idempotency-Key, if it was used for this same request"""
+    if stored is None or stored.response_body is None:
+        return jsonify({'success': False, 'message': 'A request with this Idempotency-Key is in progress'}), 409
+    if stored.request_digest != digest:
+        return jsonify({'success': False, 'message': 'Idempotency-Key was used for a different request'}), 422
+    response = current_app.response_class(stored.response_body, status=stored.status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
 @bp.route('/api/picks', methods=['GET', 'POST'])
 @auth_required
+@conditional_get((PICKS_VERSION,), lambda: ('picks', current_user.id, _int_arg('week')) if _int_arg('week') else None)
 def picks():
     """Handle picks for the current user."""
     if request.method == 'POST':
@@ -110,24 +136,51 @@ def picks():
             logger.warning(f'Picks submission with invalid week: {week}')
             return jsonify({'success': False, 'message': 'Invalid week'}), 400
         
-        # Delete existing picks for this week
-        Pick.query.filter_by(user_id=current_user.id, week=week).delete()
-        
-        # Add new picks
-        for pick in picks_data:
-            new_pick = Pick(
-                user_id=current_user.id,
-                week=week,
-                game_id=pick['game_id'],
-                picked_team=pick['picked_team'],
-                mnf_total_points=pick.get('mnf_total_points')
-            )
-            db.session.add(new_pick)
-        
+        if not isinstance(picks_data, list):
+            return jsonify({'success': False, 'message': 'Picks must be a list'}), 400
+        season = data.get('season') or current_season()
+        if not isinstance(season, int):
+            logger.warning(f'Picks submission with invalid season: {season}')
+            return jsonify({'success': False, 'message': 'Invalid season'}), 400
+
+        user_id = current_user.id
+
+        # Retried requests with a known Idempotency-Key get the stored response without rewriting picks
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is not None:
+            if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+                return jsonify({'success': False, 'message': 'Invalid Idempotency-Key'}), 400
+            digest = request_digest(data)
+            stored = lookup_key(user_id, idempotency_key)
+            if stored:
+                return _replay_response(stored, digest)
+
+        def write():
+            # May run on the group-commit writer, so it only uses the session it is given
+            if idempotency_key and not claim_key(user_id, idempotency_key, digest):
+                return None  # A concurrent request with the same key got there first
+            saved = save_week_picks(user_id, week, picks_data, schedule, datetime.utcnow())
+            changed_ids = [
+                result['game_id'] for result in saved['results']
+                if result['outcome'] in ('updated', 'inserted', 'removed')
+            ]
+            if changed_ids:
+                # Only the weeks holding a changed pick need rescoring
+                for game_week in sorted({schedule.get(game_id).week for game_id in changed_ids}):
+                    refresh_week_scores(season, game_week, user_ids=[user_id])
+                apply_pick_changes(saved['removed'], saved['added'])
+                bump_version(PICKS_VERSION)
+            if idempotency_key:
+                record_response(user_id, idempotency_key, 200, {'success': True, 'results': saved['results']})
+            return saved
+
         try:
-            db.session.commit()
+            schedule = get_schedule_index().season(season)
+            saved = run_write(write)
+            if saved is None:
+                return _replay_response(lookup_key(user_id, idempotency_key), digest)
             logger.info(f'Picks submitted for user: {current_user.username}, week: {week}')
-            return jsonify({'success': True})
+            return jsonify({'success': True, 'results': saved['results']})
         except Exception as e:
             db.session.rollback()
             logger.error(f'Error submitting picks for user: {current_user.username}, week: {week}, error: {str(e)}')
@@ -202,6 +255,8 @@ def manage_users():
             user.password_hash = bcrypt.generate_password_hash(data['password'])
             user.first_login = True
         
+        bump_version()
+        bump_version(USERS_VERSION)
         db.session.commit()
         logger.info(f'User updated by admin: {current_user.username}, user: {user.username}')
         return jsonify({'success': True})
@@ -213,6 +268,8 @@ def manage_users():
             return jsonify({'success': False, 'message': 'User not found'}), 404
         
         db.session.delete(user)
+        bump_version()
+        bump_version(USERS_VERSION)
         db.session.commit()
         logger.info(f'User deleted by admin: {current_user.username}, user: {user.username}')
         return jsonify({'success': True})
@@ -250,7 +307,13 @@ def restore_backup():
         }), 400
     
     try:
+        # The restored database may carry an older version than cached results
+        previous = data_versions((SCORES_VERSION, GAMES_VERSION, PICKS_VERSION, USERS_VERSION))
+        db.session.commit()
         DatabaseManager.restore_backup(backup_path)
+        for name, (version, _) in previous.items():
+            bump_version(name, minimum=version + 1)
+        db.session.commit()
         logger.info(f'Backup restored by admin: {current_user.username}, path: {backup_path}')
         return jsonify({'success': True})
     except Exception as e:
@@ -278,6 +341,30 @@ def list_backups():
             'message': str(e)
         }), 500
 
+@bp.route('/api/admin/metrics', methods=['GET'])
+@auth_required
+@require_admin
+def metrics():
+    """Operational counters for upstream calls and week hydration"""
+    write_queue = current_app.extensions.get('write_queue')
+    return jsonify({
+        'success': True,
+        'upstream': get_http_client().stats.snapshot(),
+        'hydration': hydration_stats.snapshot(),
+        'result_cache': get_result_cache().snapshot() if get_result_cache() else None,
+        'write_queue': write_queue.stats.snapshot() if write_queue else None
+    })
+
+@bp.route('/api/admin/scheduler', methods=['GET'])
+@auth_required
+@require_admin
+def scheduler_status():
+    """Report when the game updater will run next"""
+    poller = current_app.extensions.get('game_poller')
+    if not poller:
+        return jsonify({'success': False, 'message': 'Scheduler not running'}), 503
+    return jsonify({'success': True, **poller.status()})
+
 @bp.route('/api/leaderboard', methods=['GET'])
 @auth_required
 def leaderboard():
@@ -286,164 +373,129 @@ def leaderboard():
 
 @bp.route('/api/leaderboard/season', methods=['GET'])
 @auth_required
+@conditional_get((SCORES_VERSION,), lambda: ('leaderboard', 'season', _int_arg('season') or current_season()))
 def season_leaderboard():
     try:
-        # Get all picks for the season
-        picks_query = db.session.query(
-            Pick.user_id,
-            func.count(case([(Pick.picked_team == Game.winner, 1)])).label('correct_picks'),
-            func.count(Pick.id).label('total_picks'),
-            func.count(distinct(Pick.week)).label('weeks_played')
-        ).join(Game)
-        
-        picks_query = picks_query.group_by(Pick.user_id)
-        picks_results = picks_query.all()
-        
-        # Calculate accuracy and create leaderboard
-        leaderboard = []
-        for user_id, correct_picks, total_picks, weeks_played in picks_results:
-            user = User.query.get(user_id)
-            accuracy = (correct_picks / total_picks * 100) if total_picks > 0 else 0
-            leaderboard.append({
-                'id': user.id,
-                'username': user.username,
-                'correct': correct_picks,
-                'total': total_picks,
-                'weekly_wins': 0,  # TODO: Implement weekly wins calculation
-                'streak': 0,  # TODO: Implement streak calculation
-                'accuracy': round(accuracy, 2)
-            })
-        
-        # Sort by correct picks (descending) and username (ascending)
-        leaderboard.sort(key=lambda x: (-x['correct'], x['username']))
-        
+        season = request.args.get('season', type=int) or current_season()
+        response = cached_json(('leaderboard', 'season', season), lambda: get_scoring_engine().season_standings(season))
         logger.info(f'Season leaderboard retrieved for user: {current_user.username}')
-        return jsonify(leaderboard)
+        return response
     except Exception as e:
+        db.session.rollback()
         logger.error(f'Error retrieving season leaderboard: {str(e)}')
         return jsonify([])
 
 @bp.route('/api/leaderboard/weekly', methods=['GET'])
 @auth_required
+@conditional_get((SCORES_VERSION,), lambda: (
+    'leaderboard', 'weekly', _int_arg('season') or current_season(), _int_arg('week')
+) if _int_arg('week') is not None else None)
 def weekly_leaderboard():
     try:
         week = request.args.get('week', type=int)
         if week is None:
             return jsonify([])
-        
-        # Get all picks for the specified week
-        picks_query = db.session.query(
-            Pick.user_id,
-            func.count(case([(Pick.picked_team == Game.winner, 1)])).label('correct_picks'),
-            func.count(Pick.id).label('total_picks')
-        ).join(Game).filter(Pick.week == week)
-        
-        picks_query = picks_query.group_by(Pick.user_id)
-        picks_results = picks_query.all()
-        
-        # Calculate accuracy and create leaderboard
-        leaderboard = []
-        for user_id, correct_picks, total_picks in picks_results:
-            user = User.query.get(user_id)
-            accuracy = (correct_picks / total_picks * 100) if total_picks > 0 else 0
-            leaderboard.append({
-                'id': user.id,
-                'username': user.username,
-                'correct': correct_picks,
-                'total': total_picks,
-                'accuracy': round(accuracy, 2)
-            })
-        
-        # Sort by correct picks (descending) and username (ascending)
-        leaderboard.sort(key=lambda x: (-x['correct'], x['username']))
-        
+        season = request.args.get('season', type=int) or current_season()
+        response = cached_json(('leaderboard', 'weekly', season, week), lambda: get_scoring_engine().week_standings(season, week))
         logger.info(f'Weekly leaderboard retrieved for week {week} by user: {current_user.username}')
-        return jsonify(leaderboard)
+        return response
     except Exception as e:
+        db.session.rollback()
         logger.error(f'Error retrieving weekly leaderboard: {str(e)}')
         return jsonify([])
 
 @bp.route('/api/stats', methods=['GET'])
 @auth_required
+@conditional_get((SCORES_VERSION,), lambda: (
+    'stats', current_user.id, request.args.get('user_id'), request.args.get('user_ids'),
+    _int_arg('season') or current_season()
+))
 def get_user_stats():
     if not current_user.is_authenticated:
         return jsonify({'error': 'Not authenticated'}), 401
 
-    # Get all picks for the current user
-    picks = Pick.query.filter_by(user_id=current_user.id).all()
-    
-    if not picks:
-        return jsonify({
-            'total_correct': 0,
-            'accuracy': 0,
-            'best_week': None,
-            'current_streak': 0,
-            'weekly_stats': []
-        })
+    season = request.args.get('season', type=int) or current_season()
 
-    # Group picks by week
-    picks_by_week = {}
-    for pick in picks:
-        week = pick.week
-        if week not in picks_by_week:
-            picks_by_week[week] = {'correct': 0, 'total': 0}
-        
-        picks_by_week[week]['total'] += 1
-        if pick.picked_team == Game.winner:
-            picks_by_week[week]['correct'] += 1
-
-    # Calculate weekly stats
-    weekly_stats = []
-    total_correct = 0
-    total_picks = 0
-    best_week = {'week': None, 'correct': 0}
-    
-    for week, stats in picks_by_week.items():
-        correct = stats['correct']
-        total = stats['total']
-        accuracy = (correct / total * 100) if total > 0 else 0
-        
-        weekly_stats.append({
-            'week': week,
-            'correct': correct,
-            'total': total,
-            'accuracy': accuracy
+    # Batch mode: stats for several users in the same queries
+    user_ids_arg = request.args.get('user_ids')
+    if user_ids_arg:
+        if not current_user.is_admin:
+            return jsonify({'success': False, 'message': 'Admin access required'}), 403
+        try:
+            user_ids = sorted({int(user_id) for user_id in user_ids_arg.split(',') if user_id.strip()})
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Invalid user_ids'}), 400
+        return cached_json(('stats', season, *user_ids), lambda: {
+            'users': {str(user_id): entry for user_id, entry in get_scoring_engine().user_stats(user_ids, season).items()}
         })
-        
-        total_correct += correct
-        total_picks += total
-        
-        if correct > best_week['correct']:
-            best_week = {'week': week, 'correct': correct}
-
-    # Calculate current streak
-    current_streak = 0
-    recent_picks = Pick.query.join(Game).filter(
-        Pick.user_id == current_user.id,
-        Game.has_ended == True
-    ).order_by(Game.start_time.desc()).all()
-
-    for pick in recent_picks:
-        if pick.picked_team == Game.winner:
-            current_streak += 1
+
+    user_id = request.args.get('user_id', type=int) or current_user.id
+    if user_id != current_user.id and not current_user.is_admin:
+        return jsonify({'success': False, 'message': 'Admin access required'}), 403
+
+    return cached_json(('stats', season, user_id), lambda: get_scoring_engine().user_stats([user_id], season)[user_id])
+
+def _pick_history_response(season, weeks, user_id):
+    """
+    Stream one keyset page of pick history as JSON. Other users' picks are
+    only listed for games that have kicked off unless the caller is an admin.
+    """
+    limit = max(1, min(_int_arg('limit') or HISTORY_PAGE_SIZE, MAX_HISTORY_PAGE_SIZE))
+    after = None
+    if request.args.get('cursor'):
+        after = parse_cursor(request.args['cursor'])
+        if after is None:
+            return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    rows = pick_history(
+        season, weeks, user_id, after, limit,
+        viewer_id=current_user.id, now=None if current_user.is_admin else datetime.utcnow()
+    )
+
+    def generate():
+        yield '{"success": true, "season": %d, "picks": [' % season
+        last = None
+        count = 0
+        for row in rows.yield_per(200):
+            if count == limit:
+                break
+            yield (',' if count else '') + json.dumps(history_row(row))
+            last = row
+            count += 1
         else:
-            break
+            last = None  # Fewer than limit + 1 rows: this is the final page
+        next_cursor = format_cursor(last.week, last.game_id, last.user_id) if last else None
+        yield '], "next_cursor": %s}' % json.dumps(next_cursor)
 
-    # Sort weekly stats by week number
-    weekly_stats.sort(key=lambda x: x['week'])
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
 
-    return jsonify({
-        'total_correct': total_correct,
-        'accuracy': (total_correct / total_picks * 100) if total_picks > 0 else 0,
-        'best_week': best_week,
-        'current_streak': current_streak,
-        'weekly_stats': weekly_stats
-    })
+@bp.route('/api/picks/history')
+@auth_required
+def pick_history_range():
+    """
+    Picks across a range of weeks, e.g. ?weeks=1-18&season=2024&user=2.
+    `user` defaults to the caller; pass user=all for every user. Pages hold
+    up to `limit` picks; pass the returned next_cursor as `cursor` for the
+    next page. A single user's full season fits in one page.
+    """
+    season = _int_arg('season') or current_season()
+    weeks = parse_weeks(request.args.get('weeks') or f'1-{max(season_weeks())}')
+    if weeks is None:
+        return jsonify({'success': False, 'message': 'weeks must look like 3 or 1-18'}), 400
+    user = request.args.get('user')
+    if user == 'all':
+        user_id = None
+    elif user:
+        user_id = _int_arg('user')
+        if user_id is None:
+            return jsonify({'success': False, 'message': 'Invalid user'}), 400
+    else:
+        user_id = current_user.id
+    return _pick_history_response(season, weeks, user_id)
 
 @bp.route('/api/get_picks')
 @auth_required
 def get_picks():
-    """Get picks for a specific week."""
+    """Every user's picks for a week, paged like /api/picks/history."""
     week = request.args.get('week', type=int)
     if not week:
         logger.warning('Picks request with missing week parameter')
@@ -452,97 +504,36 @@ def get_picks():
             'message': 'Week parameter is required'
         }), 400
 
-    picks = Pick.query.filter_by(week=week).all()
-    picks_list = []
-    for pick in picks:
-        picks_list.append({
-            'id': pick.id,
-            'user_id': pick.user_id,
-            'week': pick.week,
-            'game_id': pick.game_id,
-            'team_id': pick.team_id,
-            'points': pick.points,
-            'result': pick.result
-        })
-
     logger.info(f'Picks retrieved for user: {current_user.username}')
-    return jsonify({
-        'success': True,
-        'picks': picks_list
-    })
+    return _pick_history_response(_int_arg('season') or current_season(), (week, week), None)
 
 @bp.route('/api/games/week/<int:week>')
 @auth_required
+@conditional_get((GAMES_VERSION,), lambda week: ('games', current_season(), week))
 def get_games_for_week(week):
     try:
-        # Get current NFL season
-        current_year = datetime.now().year
-        # If we're in Jan-July, we're looking at the previous season
-        current_season = current_year - 1 if datetime.now().month < 8 else current_year
+        season = current_season()
         
-        logger.info(f"Fetching games for week {week} of {current_season} season")
+        logger.info(f"Fetching games for week {week} of {season} season")
         
-        games = Game.query.filter_by(week=week, season=current_season).all()
+        games = Game.query.filter_by(week=week, season=season).all()
         logger.info(f"Found {len(games)} existing games in database")
         
         if not games:
-            # Try to fetch games from ESPN API
+            # Fetch from ESPN once, however many requests are waiting on this week
             try:
-                url = f"https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
-                params = {
-                    'limit': 100,
-                    'dates': current_season,
-                    'week': str(week),
-                    'seasontype': 2  # Regular season
-                }
-                logger.info(f"Fetching games from ESPN API: {url} with params {params}")
-                
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                logger.info(f"ESPN API Response: {data}")
-                
-                if 'events' in data:
-                    logger.info(f"Found {len(data['events'])} games from ESPN API")
-                    for event in data['events']:
-                        # Skip if game already exists
-                        if Game.query.filter_by(espn_id=event['id']).first():
-                            logger.info(f"Game {event['id']} already exists, skipping")
-                            continue
-                            
-                        competition = event['competitions'][0]
-                        home_team = None
-                        away_team = None
-                        
-                        for team in competition['competitors']:
-                            if team['homeAway'] == 'home':
-                                home_team = team['team']['abbreviation']
-                            else:
-                                away_team = team['team']['abbreviation']
-                        
-                        if home_team and away_team:
-                            start_time = datetime.strptime(competition['date'], "%Y-%m-%dT%H:%M:%SZ")
-                            new_game = Game(
-                                espn_id=event['id'],
-                                week=week,
-                                season=current_season,
-                                home_team=home_team,
-                                away_team=away_team,
-                                start_time=start_time,
-                                status='scheduled'
-                            )
-                            db.session.add(new_game)
-                            logger.info(f"Added new game: {home_team} vs {away_team}")
-                    
-                    db.session.commit()
-                    logger.info("Successfully saved new games to database")
-                    # Fetch games again after adding new ones
-                    games = Game.query.filter_by(week=week, season=current_season).all()
-                else:
-                    logger.warning("No events found in ESPN API response")
+                state = hydrate_week(season, week)
+                if state == 'hydrating':
+                    response = jsonify({
+                        'status': 'hydrating',
+                        'message': f'Games for week {week} are being loaded, try again shortly'
+                    })
+                    response.headers['Retry-After'] = '2'
+                    return response, 202
+                games = Game.query.filter_by(week=week, season=season).all()
             
             except Exception as e:
+                db.session.rollback()
                 logger.error(f"Error fetching games from ESPN API: {str(e)}")
                 logger.exception(e)
         
@@ -562,13 +553,169 @@ def get_games_for_week(week):
         } for game in games]
         
         logger.info(f"Returning {len(game_data)} games")
-        return jsonify(game_data)
+        response = jsonify(game_data)
+        if games and all(game.status == 'completed' for game in games):
+            # Every result is final, so this week's payload will never change
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
     
     except Exception as e:
         logger.error(f"Error getting games for week {week}: {str(e)}")
         logger.exception(e)
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/api/games/locks')
+@auth_required
+@conditional_get((GAMES_VERSION,), lambda: ('locks', _int_arg('season') or current_season(), _int_arg('week')))
+def game_locks():
+    """
+    When picks lock for each game of the season, or of one week: at kickoff,
+    or immediately once a game is no longer scheduled. Lock times only move
+    with the games data version, so clients can revalidate with the ETag
+    instead of polling.
+    """
+    season = _int_arg('season') or current_season()
+    week = _int_arg('week')
+    try:
+        version = g.data_versions[GAMES_VERSION][0]
+        schedule = get_schedule_index().season(season, version)
+        games = schedule.week(week) if week else sorted(
+            schedule.games.values(), key=lambda game: (game.start_time, game.id)
+        )
+        return jsonify({
+            'season': season,
+            'week': week,
+            'games': [{
+                'game_id': game.id,
+                'week': game.week,
+                'home_team': game.home_team,
+                'away_team': game.away_team,
+                'status': game.status,
+                'locks_at': game.start_time.isoformat()
+            } for game in games]
+        })
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'Error retrieving game locks for {season}: {str(e)}')
+        return jsonify({'success': False, 'message': 'Unable to load game locks'}), 500
+
+@bp.route('/api/games/week/<int:week>/consensus')
+@auth_required
+def get_week_consensus(week):
+    """Share of users on each side of every game of a week, shown from kickoff"""
+    season = request.args.get('season', type=int) or current_season()
+    now = datetime.utcnow()
+    try:
+        # Counts are revealed game by game, so the cached body is also keyed on kickoffs passed
+        kicked_off = db.session.query(func.count(Game.id)).filter(
+            Game.season == season,
+            Game.week == week,
+            Game.start_time <= now
+        ).scalar()
+        return cached_json(
+            ('consensus', season, week, kicked_off),
+            lambda: week_consensus(season, week, now),
+            versions=(GAMES_VERSION, PICKS_VERSION)
+        )
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'Error retrieving consensus for week {week} of {season}: {str(e)}')
+        return jsonify({'success': False, 'message': 'Unable to load consensus'}), 500
+
+@bp.route('/api/stream')
+@auth_required
+def event_stream():
+    """
+    Server-Sent Events feed of game results ('game') and leaderboard moves
+    ('leaderboard'). Reconnecting clients send Last-Event-ID to replay what
+    they missed.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    broadcaster = current_app.extensions['event_broadcaster']
+    subscription = broadcaster.subscribe()
+    response = Response(
+        stream_with_context(stream(broadcaster, subscription, last_event_id)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+@bp.route('/api/analytics/head-to-head')
+@auth_required
+def head_to_head():
+    """
+    For every pair of users: games both picked (shared), games picked the
+    same way (agreed) and wins[i][j], the completed games user i got right
+    where user j picked the other side. Only games that have kicked off are
+    counted. Pass format=binary for the compact encoding described in
+    app.columnar.encode_head_to_head.
+    """
+    season = request.args.get('season', type=int) or current_season()
+    week = request.args.get('week', type=int)
+    binary = request.args.get('format', 'json') == 'binary'
+    now = datetime.utcnow()
+
+    def compute():
+        matrix = get_columnar_engine().matrix(season)
+        pairs = matrix.head_to_head(week, now)
+        if binary:
+            return encode_head_to_head(matrix, pairs)
+        return current_app.json.dumps(head_to_head_json(matrix, pairs, week)).encode('utf-8')
+
+    try:
+        # Pairs only count kicked-off games, so the cached body is also keyed on kickoffs passed
+        kicked_off = db.session.query(func.count(Game.id)).filter(
+            Game.season == season,
+            or_(Game.status != 'scheduled', Game.start_time <= now)
+        ).scalar()
+        return cached_body(
+            ('head-to-head', season, week, binary, kicked_off),
+            compute,
+            'application/octet-stream' if binary else 'application/json',
+            versions=(GAMES_VERSION, PICKS_VERSION, USERS_VERSION)
+        )
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'Error computing head-to-head for {season}: {str(e)}')
+        return jsonify({'success': False, 'message': 'Unable to compute head-to-head'}), 500
+
+@bp.route('/api/projections', methods=['GET', 'POST'])
+@auth_required
+def projections():
+    """
+    Chances to win the week and the season, simulated over the remaining games.
+    POST a JSON body of {"probabilities": {game_id: home_win_probability}} to
+    weight games; anything unlisted is a coin flip.
+    """
+    season = request.args.get('season', type=int) or current_season()
+    week = request.args.get('week', type=int)
+    simulations = request.args.get('simulations', DEFAULT_SIMULATIONS, type=int)
+    if not 1 <= simulations <= MAX_SIMULATIONS:
+        return jsonify({'success': False, 'message': f'simulations must be between 1 and {MAX_SIMULATIONS}'}), 400
+
+    probabilities = {}
+    if request.method == 'POST':
+        try:
+            probabilities = {
+                int(game_id): float(probability)
+                for game_id, probability in ((request.get_json(silent=True) or {}).get('probabilities') or {}).items()
+            }
+        except (TypeError, ValueError, AttributeError):
+            return jsonify({'success': False, 'message': 'probabilities must map game ids to numbers'}), 400
+
+    try:
+        # Seeded per request key so a cached result is also a reproducible one
+        key = ('projections', season, week, simulations, tuple(sorted(probabilities.items())))
+        return cached_json(key, lambda: project(
+            get_columnar_engine().matrix(season), week, simulations, probabilities, seed=0
+        ), versions=(GAMES_VERSION, PICKS_VERSION, USERS_VERSION))
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'Error computing projections for {season} week {week}: {str(e)}')
+        return jsonify({'success': False, 'message': 'Unable to compute projections'}), 500
+
 @bp.route('/api/admin/update-games', methods=['POST'])
 @login_required
 def manual_update_games():
@@ -578,8 +725,8 @@ def manual_update_games():
         
     try:
         from .game_updater import update_game_scores
-        update_game_scores()
-        return jsonify({'message': 'Games updated successfully'})
+        changes = update_game_scores()
+        return jsonify({'message': 'Games updated successfully', 'changes': changes})
     except Exception as e:
         logger.error(f"Error in manual game update: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,74 @@
+import os
+import logging
+import threading
+from collections import namedtuple
+from . import db
+from .models import Game
+from .result_cache import data_version, GAMES_VERSION
+
+logger = logging.getLogger(__name__)
+
+ScheduledGame = namedtuple('ScheduledGame', 'id week home_team away_team start_time status')
+
+class SeasonSchedule:
+    """Every game of a season by id, as of one games data version"""
+
+    def __init__(self, season, version):
+        self.season = season
+        self.version = version
+        self.games = {}
+
+    def load(self):
+        rows = db.session.query(
+            Game.id, Game.week, Game.home_team, Game.away_team, Game.start_time, Game.status
+        ).filter(Game.season == self.season)
+        self.games = {row.id: ScheduledGame(*row) for row in rows}
+        return self
+
+    def get(self, game_id):
+        return self.games.get(game_id)
+
+    def is_locked(self, game, now):
+        """Picks lock at kickoff, or earlier if the game has already left 'scheduled'"""
+        return game.status != 'scheduled' or game.start_time <= now
+
+    def week(self, week):
+        return sorted(
+            (game for game in self.games.values() if game.week == week),
+            key=lambda game: (game.start_time, game.id)
+        )
+
+class ScheduleIndex:
+    """
+    Per-process cache of SeasonSchedule objects, reloaded when the games
+    data version moves so every worker sees kickoff changes from the updater
+    and schedule refreshes without a query per pick.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seasons = {}
+
+    def season(self, season, version=None):
+        version = data_version(GAMES_VERSION) if version is None else version
+        with self._lock:
+            schedule = self._seasons.get(season)
+            if schedule is None or schedule.version != version:
+                schedule = SeasonSchedule(season, version).load()
+                self._seasons[season] = schedule
+                logger.info(f"Loaded {season} schedule index: {len(schedule.games)} games")
+            return schedule
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_schedule_index():
+    """Return the process-wide schedule index, or a throwaway one when disabled"""
+    global _index
+    if os.environ.get('SCHEDULE_INDEX_ENABLED', 'true').lower() == 'false':
+        return ScheduleIndex()
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ScheduleIndex()
+    return _index
@@ -0,0 +1,185 @@
+import os
+import uuid
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta
+import pytz
+from sqlalchemy import func, or_, and_
+from . import db
+from .models import Game
+from .leases import try_acquire, release
+
+logger = logging.getLogger(__name__)
+
+LIVE_INTERVAL = timedelta(seconds=30)      # While any game is being played
+PREGAME_LEAD = timedelta(minutes=5)        # Wake up this long before kickoff
+IDLE_INTERVAL = timedelta(hours=6)         # Longest sleep, so schedule changes are noticed
+ERROR_INTERVAL = timedelta(minutes=5)      # Retry delay when planning itself fails
+STALE_GAME_WINDOW = timedelta(hours=8)     # Started games older than this are not treated as live
+
+LEADER_LEASE = 'scheduler'
+LEADER_LEASE_TTL = timedelta(seconds=15)   # A dead leader is replaced once this expires
+HEARTBEAT_INTERVAL = timedelta(seconds=5)
+
+def plan_next_poll(now):
+    """
+    Decide when the game updater should run next.
+    Returns (next_run_time, mode) with `now` and the result in naive UTC.
+    """
+    recent = now - STALE_GAME_WINDOW
+    live_games = Game.query.filter(
+        Game.start_time >= recent,
+        or_(
+            Game.status == 'in_progress',
+            and_(Game.status == 'scheduled', Game.start_time <= now)
+        )
+    ).count()
+    if live_games:
+        return now + LIVE_INTERVAL, 'live'
+
+    next_kickoff = db.session.query(func.min(Game.start_time)).filter(
+        Game.status == 'scheduled',
+        Game.start_time > now
+    ).scalar()
+    if next_kickoff is None:
+        return now + IDLE_INTERVAL, 'idle'
+
+    wake_time = next_kickoff - PREGAME_LEAD
+    if wake_time <= now:
+        return now + LIVE_INTERVAL, 'pregame'
+    return min(wake_time, now + IDLE_INTERVAL), 'waiting'
+
+class GamePoller:
+    """
+    Runs the game updater on a schedule derived from the game slate.
+    Each run plans the next one as a one-off APScheduler job.
+    """
+    JOB_ID = 'update_games'
+
+    def __init__(self, scheduler, app, job):
+        self.scheduler = scheduler
+        self.app = app
+        self.job = job
+        self.mode = None
+        self.next_run_time = None
+        self._lock = threading.Lock()
+
+    def start(self, delay=timedelta(seconds=10)):
+        """Schedule the first run shortly after startup"""
+        self._schedule(datetime.utcnow() + delay, 'startup')
+
+    def stop(self):
+        """Drop the pending run, e.g. after losing leadership"""
+        with self._lock:
+            if self.scheduler.get_job(self.JOB_ID):
+                self.scheduler.remove_job(self.JOB_ID)
+            self.mode = 'stopped'
+            self.next_run_time = None
+
+    def _schedule(self, run_time, mode):
+        with self._lock:
+            self.mode = mode
+            self.next_run_time = run_time
+            self.scheduler.add_job(
+                self.run,
+                'date',
+                run_date=pytz.utc.localize(run_time),
+                id=self.JOB_ID,
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+                # Each run plans the next, so a skipped run would end polling
+                # for good; a late run (host suspend, busy executor) still goes
+                misfire_grace_time=None
+            )
+        logger.info(f"Next game update at {run_time.isoformat()}Z ({mode})")
+
+    def run(self):
+        """Run the updater, then plan the next run"""
+        with self.app.app_context():
+            try:
+                self.job()
+            finally:
+                try:
+                    run_time, mode = plan_next_poll(datetime.utcnow())
+                except Exception as e:
+                    logger.error(f"Error planning next game update: {str(e)}")
+                    run_time, mode = datetime.utcnow() + ERROR_INTERVAL, 'error'
+                finally:
+                    db.session.remove()
+                if self.mode != 'stopped':
+                    self._schedule(run_time, mode)
+
+    def status(self):
+        return {
+            'mode': self.mode,
+            'next_run_time': self.next_run_time.isoformat() + 'Z' if self.next_run_time else None
+        }
+
+class LeaderElection:
+    """
+    Elects one process to run scheduled jobs through a shared lease row.
+    Every process heartbeats; the holder renews the lease and the others
+    take it over once it expires.
+    """
+
+    def __init__(self, scheduler, app, on_elected, on_demoted, name=LEADER_LEASE, ttl=LEADER_LEASE_TTL):
+        self.scheduler = scheduler
+        self.app = app
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._lease_expires = None
+
+    def start(self):
+        self.scheduler.add_job(
+            self.heartbeat,
+            'interval',
+            seconds=int(HEARTBEAT_INTERVAL.total_seconds()),
+            id='leader_heartbeat',
+            next_run_time=datetime.now(pytz.utc),
+            max_instances=1,
+            coalesce=True
+        )
+
+    def heartbeat(self):
+        """Take or renew the lease and react to leadership changes"""
+        now = datetime.utcnow()
+        with self.app.app_context():
+            try:
+                acquired = try_acquire(self.name, self.holder, self.ttl)
+                if acquired:
+                    self._lease_expires = now + self.ttl
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Leader heartbeat failed: {str(e)}")
+                # Keep leadership until our last successful renewal runs out
+                acquired = self.is_leader and self._lease_expires is not None and now < self._lease_expires
+            finally:
+                db.session.remove()
+
+        if acquired and not self.is_leader:
+            self.is_leader = True
+            logger.info(f"{self.holder} is now the scheduler leader")
+            self.on_elected()
+        elif not acquired and self.is_leader:
+            self.is_leader = False
+            logger.warning(f"{self.holder} lost scheduler leadership")
+            self.on_demoted()
+
+    def resign(self):
+        """Release the lease so another process can take over immediately"""
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        with self.app.app_context():
+            try:
+                release(self.name, self.holder)
+            except Exception as e:
+                logger.error(f"Error releasing scheduler lease: {str(e)}")
+            finally:
+                db.session.remove()
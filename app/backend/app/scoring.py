@@ -0,0 +1,406 @@
+import logging
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import case, func, null
+from . import db
+from .models import User, Game, Pick, UserWeekScore, UserSeasonScore, GamePickCount
+from .result_cache import bump_version
+from .utils import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Game fields whose change can move a score
+SCORING_FIELDS = {'status', 'winner', 'final_score_home', 'final_score_away'}
+
+def tiebreak_game(season, week):
+    """The week's deciding MNF game: the last MNF kickoff that has a final score"""
+    return Game.query.filter(
+        Game.season == season,
+        Game.week == week,
+        Game.is_mnf == True,
+        Game.status == 'completed',
+        Game.final_score_home.isnot(None),
+        Game.final_score_away.isnot(None)
+    ).order_by(Game.start_time.desc()).first()
+
+def refresh_week_scores(season, week, user_ids=None):
+    """
+    Recompute user_week_score rows for one week, optionally for some users
+    only, then the season totals of the users involved.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    mnf = tiebreak_game(season, week)
+    if mnf:
+        actual_total = mnf.final_score_home + mnf.final_score_away
+        tiebreak = func.max(case(
+            (Pick.game_id == mnf.id, func.abs(Pick.mnf_total_points - actual_total))
+        ))
+    else:
+        tiebreak = null()
+
+    query = db.session.query(
+        Pick.user_id,
+        func.count(case((Pick.picked_team == Game.winner, 1))),
+        func.count(Pick.id),
+        tiebreak
+    ).join(Game, Pick.game_id == Game.id).filter(
+        Game.season == season,
+        Game.week == week
+    )
+    existing = UserWeekScore.query.filter_by(season=season, week=week)
+    if user_ids is not None:
+        query = query.filter(Pick.user_id.in_(user_ids))
+        existing = existing.filter(UserWeekScore.user_id.in_(user_ids))
+
+    rows = [{
+        'user_id': user_id,
+        'season': season,
+        'week': week,
+        'correct': correct,
+        'total': total,
+        'tiebreak_delta': delta
+    } for user_id, correct, total, delta in query.group_by(Pick.user_id)]
+
+    affected = {user_id for (user_id,) in existing.with_entities(UserWeekScore.user_id)}
+    affected.update(row['user_id'] for row in rows)
+
+    existing.delete(synchronize_session=False)
+    if rows:
+        db.session.execute(UserWeekScore.__table__.insert(), rows)
+    refresh_season_scores(season, affected)
+    bump_version()
+
+def refresh_season_scores(season, user_ids):
+    """Rebuild user_season_score rows for `user_ids` from their weekly rows"""
+    if not user_ids:
+        return
+    user_ids = list(user_ids)
+    totals = db.session.query(
+        UserWeekScore.user_id,
+        func.sum(UserWeekScore.correct),
+        func.sum(UserWeekScore.total),
+        func.count(UserWeekScore.week)
+    ).filter(
+        UserWeekScore.season == season,
+        UserWeekScore.user_id.in_(user_ids),
+        UserWeekScore.total > 0
+    ).group_by(UserWeekScore.user_id).all()
+
+    UserSeasonScore.query.filter(
+        UserSeasonScore.season == season,
+        UserSeasonScore.user_id.in_(user_ids)
+    ).delete(synchronize_session=False)
+    if totals:
+        db.session.execute(UserSeasonScore.__table__.insert(), [{
+            'user_id': user_id,
+            'season': season,
+            'correct': correct,
+            'total': total,
+            'weeks_played': weeks_played
+        } for user_id, correct, total, weeks_played in totals])
+
+def weekly_wins(season):
+    """
+    Weeks won per user: rank 1 on correct picks, then closest MNF guess.
+    Only weeks whose games are all completed are counted. Returns {user_id: wins}.
+    """
+    finished_weeks = db.session.query(Game.week).filter(Game.season == season).group_by(Game.week).having(
+        func.count(case((Game.status != 'completed', 1))) == 0
+    ).subquery()
+
+    ranked = db.session.query(
+        UserWeekScore.user_id,
+        func.rank().over(
+            partition_by=UserWeekScore.week,
+            order_by=(
+                UserWeekScore.correct.desc(),
+                UserWeekScore.tiebreak_delta.is_(None),
+                UserWeekScore.tiebreak_delta
+            )
+        ).label('place')
+    ).join(finished_weeks, finished_weeks.c.week == UserWeekScore.week).filter(
+        UserWeekScore.season == season,
+        UserWeekScore.total > 0
+    ).subquery()
+
+    results = db.session.query(ranked.c.user_id, func.count()).filter(
+        ranked.c.place == 1
+    ).group_by(ranked.c.user_id)
+    return dict(results.all())
+
+def current_streaks(season=None, user_ids=None):
+    """
+    Consecutive correct picks per user counting back from their latest
+    completed game. Returns {user_id: streak}.
+    """
+    misses = db.session.query(
+        Pick.user_id,
+        func.sum(case((Pick.picked_team == Game.winner, 0), else_=1)).over(
+            partition_by=Pick.user_id,
+            order_by=(Game.start_time.desc(), Game.id.desc())
+        ).label('misses')
+    ).join(Game, Pick.game_id == Game.id).filter(Game.status == 'completed')
+    if season is not None:
+        misses = misses.filter(Game.season == season)
+    if user_ids is not None:
+        misses = misses.filter(Pick.user_id.in_(user_ids))
+    misses = misses.subquery()
+
+    # A pick is part of the streak while no miss has been seen yet
+    results = db.session.query(misses.c.user_id, func.count()).filter(
+        misses.c.misses == 0
+    ).group_by(misses.c.user_id)
+    return dict(results.all())
+
+def user_stats(user_ids, season=None):
+    """
+    Per-week and overall pick stats for each of `user_ids` from one grouped
+    query plus the streak query. Returns {user_id: stats}.
+    """
+    user_ids = list(user_ids)
+    weeks = db.session.query(
+        Pick.user_id,
+        Pick.week,
+        func.count(case((Pick.picked_team == Game.winner, 1))),
+        func.count(Pick.id)
+    ).join(Game, Pick.game_id == Game.id).filter(Pick.user_id.in_(user_ids))
+    if season is not None:
+        weeks = weeks.filter(Game.season == season)
+    weeks = weeks.group_by(Pick.user_id, Pick.week).order_by(Pick.user_id, Pick.week)
+
+    stats = {user_id: {
+        'total_correct': 0,
+        'total_picks': 0,
+        'accuracy': 0,
+        'best_week': None,
+        'current_streak': 0,
+        'weekly_stats': []
+    } for user_id in user_ids}
+
+    for user_id, week, correct, total in weeks:
+        entry = stats[user_id]
+        entry['weekly_stats'].append({
+            'week': week,
+            'correct': correct,
+            'total': total,
+            'accuracy': (correct / total * 100) if total > 0 else 0
+        })
+        entry['total_correct'] += correct
+        entry['total_picks'] += total
+        best = entry['best_week']
+        if best is None or correct > best['correct']:
+            entry['best_week'] = {'week': week, 'correct': correct}
+
+    for user_id, streak in current_streaks(season, user_ids).items():
+        stats[user_id]['current_streak'] = streak
+    for entry in stats.values():
+        if entry['total_picks']:
+            entry['accuracy'] = entry['total_correct'] / entry['total_picks'] * 100
+    return stats
+
+def season_standings(season):
+    """Season leaderboard rows, best record first"""
+    results = db.session.query(
+        User.id,
+        User.username,
+        UserSeasonScore.correct,
+        UserSeasonScore.total
+    ).join(UserSeasonScore, UserSeasonScore.user_id == User.id).filter(
+        UserSeasonScore.season == season
+    ).order_by(UserSeasonScore.correct.desc(), User.username).all()
+    wins = weekly_wins(season)
+    streaks = current_streaks(season)
+
+    return [{
+        'id': user_id,
+        'username': username,
+        'correct': correct,
+        'total': total,
+        'weekly_wins': wins.get(user_id, 0),
+        'streak': streaks.get(user_id, 0),
+        'accuracy': round((correct / total * 100) if total > 0 else 0, 2)
+    } for user_id, username, correct, total in results]
+
+def week_standings(season, week):
+    """Weekly leaderboard rows; the closest MNF total breaks ties and users without a guess go last"""
+    results = db.session.query(
+        User.id,
+        User.username,
+        UserWeekScore.correct,
+        UserWeekScore.total,
+        UserWeekScore.tiebreak_delta
+    ).join(UserWeekScore, UserWeekScore.user_id == User.id).filter(
+        UserWeekScore.season == season,
+        UserWeekScore.week == week
+    ).order_by(
+        UserWeekScore.correct.desc(),
+        UserWeekScore.tiebreak_delta.is_(None),
+        UserWeekScore.tiebreak_delta,
+        User.username
+    ).all()
+
+    return [{
+        'id': user_id,
+        'username': username,
+        'correct': correct,
+        'total': total,
+        'tiebreak_delta': tiebreak_delta,
+        'accuracy': round((correct / total * 100) if total > 0 else 0, 2)
+    } for user_id, username, correct, total, tiebreak_delta in results]
+
+def _season_totals(seasons):
+    return {
+        (season, user_id): (correct, total)
+        for season, user_id, correct, total in db.session.query(
+            UserSeasonScore.season, UserSeasonScore.user_id, UserSeasonScore.correct, UserSeasonScore.total
+        ).filter(UserSeasonScore.season.in_(seasons))
+    }
+
+def apply_game_changes(change_list):
+    """
+    Refresh the weeks touched by a game updater change list.
+    Returns the season totals that moved as leaderboard deltas.
+    """
+    game_ids = [
+        change['game_id'] for change in change_list
+        if SCORING_FIELDS.intersection(change['changes'])
+    ]
+    if not game_ids:
+        return []
+    weeks = db.session.query(Game.season, Game.week).filter(Game.id.in_(game_ids)).distinct().all()
+    seasons = {season for season, _ in weeks}
+    before = _season_totals(seasons)
+    for season, week in weeks:
+        refresh_week_scores(season, week)
+    after = _season_totals(seasons)
+
+    deltas = []
+    for (season, user_id), (correct, total) in sorted(after.items()):
+        previous = before.get((season, user_id), (0, 0))
+        if previous != (correct, total):
+            deltas.append({
+                'season': season,
+                'user_id': user_id,
+                'correct': correct,
+                'total': total,
+                'previous_correct': previous[0],
+                'previous_total': previous[1]
+            })
+    return deltas
+
+def apply_pick_changes(removed, added):
+    """
+    Adjust game_pick_count for replaced picks, given (game_id, picked_team)
+    pairs that were removed and added. Runs inside the caller's transaction.
+    """
+    game_ids = {game_id for game_id, _ in removed + added}
+    if not game_ids:
+        return
+    sides = {
+        game_id: (home_team, away_team)
+        for game_id, home_team, away_team in db.session.query(Game.id, Game.home_team, Game.away_team)
+        .filter(Game.id.in_(game_ids))
+    }
+
+    deltas = {}
+    for change, picks in ((-1, removed), (1, added)):
+        for game_id, picked_team in picks:
+            if game_id not in sides:
+                continue
+            home_team, away_team = sides[game_id]
+            delta = deltas.setdefault(game_id, [0, 0])
+            if picked_team == home_team:
+                delta[0] += change
+            elif picked_team == away_team:
+                delta[1] += change
+
+    rows = [
+        {'game_id': game_id, 'home_picks': home, 'away_picks': away}
+        for game_id, (home, away) in deltas.items() if home or away
+    ]
+    if not rows:
+        return
+    table = GamePickCount.__table__
+    statement = dialect_insert(table).values(rows)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.game_id],
+        set_={
+            'home_picks': table.c.home_picks + statement.excluded.home_picks,
+            'away_picks': table.c.away_picks + statement.excluded.away_picks
+        }
+    ))
+
+def rebuild_pick_counts(season=None):
+    """Recount game_pick_count from the pick table"""
+    games = db.session.query(Game.id)
+    if season:
+        games = games.filter(Game.season == season)
+    GamePickCount.query.filter(GamePickCount.game_id.in_(games.scalar_subquery())).delete(synchronize_session=False)
+
+    counts = db.session.query(
+        Pick.game_id,
+        func.count(case((Pick.picked_team == Game.home_team, 1))),
+        func.count(case((Pick.picked_team == Game.away_team, 1)))
+    ).join(Game, Pick.game_id == Game.id)
+    if season:
+        counts = counts.filter(Game.season == season)
+    rows = [
+        {'game_id': game_id, 'home_picks': home, 'away_picks': away}
+        for game_id, home, away in counts.group_by(Pick.game_id)
+    ]
+    if rows:
+        db.session.execute(GamePickCount.__table__.insert(), rows)
+
+def week_consensus(season, week, now):
+    """Pick split for each game of a week; counts stay hidden until kickoff"""
+    games = db.session.query(
+        Game.id, Game.home_team, Game.away_team, Game.start_time,
+        GamePickCount.home_picks, GamePickCount.away_picks
+    ).outerjoin(GamePickCount, GamePickCount.game_id == Game.id).filter(
+        Game.season == season,
+        Game.week == week
+    ).order_by(Game.start_time, Game.id).all()
+
+    consensus = []
+    for game_id, home_team, away_team, start_time, home_picks, away_picks in games:
+        entry = {
+            'game_id': game_id,
+            'home_team': home_team,
+            'away_team': away_team,
+            'revealed': start_time <= now,
+            'home_picks': None,
+            'away_picks': None,
+            'home_pct': None,
+            'away_pct': None
+        }
+        if entry['revealed']:
+            home_picks, away_picks = home_picks or 0, away_picks or 0
+            total = home_picks + away_picks
+            entry.update({
+                'home_picks': home_picks,
+                'away_picks': away_picks,
+                'home_pct': round(home_picks / total * 100, 1) if total else None,
+                'away_pct': round(away_picks / total * 100, 1) if total else None
+            })
+        consensus.append(entry)
+    return consensus
+
+def rebuild_scores(season=None):
+    """Recompute every score row and pick count, optionally for a single season"""
+    query = db.session.query(Game.season, Game.week).distinct()
+    if season:
+        query = query.filter(Game.season == season)
+    weeks = query.all()
+    for game_season, week in weeks:
+        refresh_week_scores(game_season, week)
+    rebuild_pick_counts(season)
+    db.session.commit()
+    return len(weeks)
+
+@click.command('rebuild-scores')
+@click.option('--season', type=int, default=None, help='Only rebuild this season.')
+@with_appcontext
+def rebuild_scores_command(season):
+    """Recompute the materialized leaderboard tables from picks and results."""
+    weeks = rebuild_scores(season)
+    click.echo(f"Rebuilt scores for {weeks} weeks")
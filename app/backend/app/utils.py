@@ -7,6 +7,8 @@ from functools import wraps
 from flask import jsonify, current_app
 from flask_login import current_user
 from werkzeug.exceptions import HTTPException
+from sqlalchemy.dialects import postgresql, sqlite
+from . import db
 
 def setup_logging():
     """Configure application logging"""
@@ -28,6 +30,15 @@ def setup_logging():
     logger = logging.getLogger('nfl_pickems')
     return logger
 
+def dialect_insert(table):
+    """INSERT construct for the bound database, which supports ON CONFLICT upserts"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    raise RuntimeError(f"Upserts are not supported on {dialect}")
+
 def handle_error(e):
     """Global error handler for all exceptions"""
     if isinstance(e, HTTPException):
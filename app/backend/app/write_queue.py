@@ -0,0 +1,190 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from flask import current_app
+from . import db
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 64
+MAX_WAIT = 0.005        # How long the writer holds a batch open for more jobs
+SUBMIT_TIMEOUT = 10.0   # How long a request waits for its commit
+
+class WriteQueueStats:
+    """Batch size and commit latency counters for the group-commit writer"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+        self.failed_jobs = 0
+        self.retried_batches = 0
+        self.max_batch_size = 0
+        self.total_commit_seconds = 0.0
+        self.max_commit_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, size, commit_seconds, waits, failed=0, retried=False):
+        with self._lock:
+            self.batches += 1
+            self.jobs += size
+            self.failed_jobs += failed
+            self.retried_batches += int(retried)
+            self.max_batch_size = max(self.max_batch_size, size)
+            self.total_commit_seconds += commit_seconds
+            self.max_commit_seconds = max(self.max_commit_seconds, commit_seconds)
+            self.total_wait_seconds += sum(waits)
+            self.max_wait_seconds = max(self.max_wait_seconds, max(waits))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'jobs': self.jobs,
+                'failed_jobs': self.failed_jobs,
+                'retried_batches': self.retried_batches,
+                'avg_batch_size': round(self.jobs / self.batches, 2) if self.batches else 0.0,
+                'max_batch_size': self.max_batch_size,
+                'avg_commit_seconds': round(self.total_commit_seconds / self.batches, 4) if self.batches else 0.0,
+                'max_commit_seconds': round(self.max_commit_seconds, 4),
+                'avg_wait_seconds': round(self.total_wait_seconds / self.jobs, 4) if self.jobs else 0.0,
+                'max_wait_seconds': round(self.max_wait_seconds, 4)
+            }
+
+class GroupCommitQueue:
+    """
+    Single writer per process for bursts of small transactions. Requests
+    hand over a function that stages their writes on db.session; the writer
+    runs every job that arrives within `max_wait` of the first in one
+    transaction, so a deadline surge pays one commit and fsync per batch
+    instead of one per request, and the worker processes contend for the
+    SQLite write lock a handful of times instead of hundreds.
+    Each request blocks until the commit holding its job is durable. If a
+    batch fails it is rolled back and its jobs are retried one per
+    transaction, so one bad job only fails its own request.
+    """
+
+    def __init__(self, app, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = WriteQueueStats()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, job, timeout=SUBMIT_TIMEOUT):
+        """
+        Run `job()` in the next batch and return its result once committed.
+        A job still queued after `timeout` is withdrawn and TimeoutError is
+        raised; one the writer has already started is waited for, since it
+        may commit.
+        """
+        future = Future()
+        self._ensure_started()
+        self._queue.put((job, future, time.monotonic()))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise
+            logger.warning(f"Group commit job outlived its {timeout}s timeout, waiting for its commit")
+            return future.result()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                continue
+            with self.app.app_context():
+                try:
+                    self.run_batch(batch)
+                except Exception as e:
+                    logger.error(f"Group commit writer failed: {str(e)}")
+                    for _, future, _ in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+    def _collect(self):
+        """
+        Block for one job, then take whatever else arrives within max_wait.
+        Jobs whose request gave up are dropped; the rest are marked running
+        so they can no longer be cancelled.
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+
+    def run_batch(self, batch):
+        """Commit a batch of (job, future, enqueued_at) in one transaction"""
+        started = time.monotonic()
+        waits = [started - enqueued_at for _, _, enqueued_at in batch]
+        try:
+            results = [job() for job, _, _ in batch]
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Group commit of {len(batch)} jobs failed, retrying individually: {str(e)}")
+            failed = self._run_individually(batch)
+            self.stats.record(len(batch), time.monotonic() - started, waits, failed=failed, retried=True)
+            return
+
+        self.stats.record(len(batch), time.monotonic() - started, waits)
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _run_individually(self, batch):
+        failed = 0
+        for job, future, _ in batch:
+            try:
+                result = job()
+                db.session.commit()
+                future.set_result(result)
+            except Exception as e:
+                db.session.rollback()
+                failed += 1
+                future.set_exception(e)
+        return failed
+
+def group_commit_enabled():
+    return os.environ.get('GROUP_COMMIT_ENABLED', 'false').lower() == 'true'
+
+def create_write_queue(app):
+    """Build the per-process writer from the GROUP_COMMIT_* settings"""
+    return GroupCommitQueue(
+        app,
+        max_batch=int(os.environ.get('GROUP_COMMIT_MAX_BATCH', MAX_BATCH)),
+        max_wait=float(os.environ.get('GROUP_COMMIT_WAIT_MS', MAX_WAIT * 1000)) / 1000
+    )
+
+def run_write(job):
+    """
+    Run `job()` and commit it: through the group-commit writer when it is
+    enabled, otherwise directly in the caller's session.
+    """
+    write_queue = current_app.extensions.get('write_queue')
+    if write_queue is None:
+        result = job()
+        db.session.commit()
+        return result
+    return write_queue.submit(job)
@@ -0,0 +1,29 @@
+"""add change event log
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('change_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=30), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_change_event_created_at'), 'change_event', ['created_at'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_change_event_created_at'), table_name='change_event')
+    op.drop_table('change_event')
@@ -0,0 +1,21 @@
+"""add updated_at to data versions
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('data_version', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_column('data_version', 'updated_at')
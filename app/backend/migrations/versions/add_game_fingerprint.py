@@ -0,0 +1,21 @@
+"""add game upstream fingerprint
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('game', sa.Column('upstream_fingerprint', sa.String(16), nullable=True))
+
+def downgrade():
+    op.drop_column('game', 'upstream_fingerprint')
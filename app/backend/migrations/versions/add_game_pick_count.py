@@ -0,0 +1,37 @@
+"""add per-game pick counts
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('game_pick_count',
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('home_picks', sa.Integer(), nullable=False),
+        sa.Column('away_picks', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+        sa.PrimaryKeyConstraint('game_id')
+    )
+    # Count existing picks; only the newest of duplicate picks counts, as 011 keeps
+    op.execute(
+        'INSERT INTO game_pick_count (game_id, home_picks, away_picks) '
+        'SELECT pick.game_id, '
+        'COUNT(CASE WHEN pick.picked_team = game.home_team THEN 1 END), '
+        'COUNT(CASE WHEN pick.picked_team = game.away_team THEN 1 END) '
+        'FROM pick JOIN game ON game.id = pick.game_id '
+        'WHERE pick.id IN (SELECT MAX(id) FROM pick GROUP BY user_id, game_id) '
+        'GROUP BY pick.game_id'
+    )
+
+def downgrade():
+    op.drop_table('game_pick_count')
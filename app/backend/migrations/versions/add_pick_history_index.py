@@ -0,0 +1,21 @@
+"""add pick history index
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_pick_user_id_week_game_id', 'pick', ['user_id', 'week', 'game_id'])
+
+def downgrade():
+    op.drop_index('ix_pick_user_id_week_game_id', table_name='pick')
@@ -0,0 +1,28 @@
+"""make picks unique per user and game
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Keep the newest pick where a user has several for the same game
+    op.execute(
+        'DELETE FROM pick WHERE id NOT IN '
+        '(SELECT MAX(id) FROM pick GROUP BY user_id, game_id)'
+    )
+    op.drop_index('ix_pick_user_id_game_id', table_name='pick')
+    op.create_index('uq_pick_user_id_game_id', 'pick', ['user_id', 'game_id'], unique=True)
+
+def downgrade():
+    op.drop_index('uq_pick_user_id_game_id', table_name='pick')
+    op.create_index('ix_pick_user_id_game_id', 'pick', ['user_id', 'game_id'])
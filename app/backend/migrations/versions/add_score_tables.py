@@ -0,0 +1,66 @@
+"""add materialized score tables
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('user_week_score',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('week', sa.Integer(), nullable=False),
+        sa.Column('correct', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('tiebreak_delta', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'season', 'week')
+    )
+    op.create_table('user_season_score',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('correct', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('weeks_played', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'season')
+    )
+    # Score existing picks the way refresh_week_scores does: the tiebreak is
+    # the distance from the week's last final MNF total, and only the newest
+    # of duplicate picks counts, as 011 keeps
+    op.execute(
+        'INSERT INTO user_week_score (user_id, season, week, correct, total, tiebreak_delta) '
+        'SELECT pick.user_id, game.season, game.week, '
+        'COUNT(CASE WHEN pick.picked_team = game.winner THEN 1 END), '
+        'COUNT(pick.id), '
+        'MAX(CASE WHEN pick.game_id = mnf.id '
+        'THEN ABS(pick.mnf_total_points - (mnf.final_score_home + mnf.final_score_away)) END) '
+        'FROM pick JOIN game ON game.id = pick.game_id '
+        'LEFT JOIN game mnf ON mnf.id = ('
+        'SELECT tiebreak.id FROM game tiebreak '
+        'WHERE tiebreak.season = game.season AND tiebreak.week = game.week AND tiebreak.is_mnf '
+        "AND tiebreak.status = 'completed' "
+        'AND tiebreak.final_score_home IS NOT NULL AND tiebreak.final_score_away IS NOT NULL '
+        'ORDER BY tiebreak.start_time DESC LIMIT 1) '
+        'WHERE pick.id IN (SELECT MAX(id) FROM pick GROUP BY user_id, game_id) '
+        'GROUP BY pick.user_id, game.season, game.week'
+    )
+    op.execute(
+        'INSERT INTO user_season_score (user_id, season, correct, total, weeks_played) '
+        'SELECT user_id, season, SUM(correct), SUM(total), COUNT(week) '
+        'FROM user_week_score WHERE total > 0 '
+        'GROUP BY user_id, season'
+    )
+
+def downgrade():
+    op.drop_table('user_season_score')
+    op.drop_table('user_week_score')
@@ -0,0 +1,23 @@
+"""add indexes for per-user stats and streaks
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_pick_user_id_game_id', 'pick', ['user_id', 'game_id'])
+    op.create_index('ix_game_status_start_time', 'game', ['status', 'start_time'])
+
+def downgrade():
+    op.drop_index('ix_game_status_start_time', table_name='game')
+    op.drop_index('ix_pick_user_id_game_id', table_name='pick')
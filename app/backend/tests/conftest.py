@@ -2,9 +2,10 @@ import os
 import sys
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from flask_bcrypt import Bcrypt
 from flask_login import login_user, LoginManager
-from flask import session
+from flask import session, g
 
 # Add the app directory to the Python path
 app_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -14,10 +15,14 @@ sys.path.insert(0, app_path)
 os.environ['TESTING'] = 'true'
 os.environ['DATABASE_URL'] = 'sqlite://'  # Force in-memory database
 os.environ['SECRET_KEY'] = 'test_secret_key'
+os.environ['ESPN_CACHE_ENABLED'] = 'false'
 
 # Import the app after setting environment variables
 from app import app as flask_app, db, bcrypt
-from app.models import User, Game, Pick
+from app import result_cache, columnar, schedule_index
+from app.models import (
+    User, Game, Pick, UserWeekScore, UserSeasonScore, GamePickCount, ChangeEvent, IdempotencyKey, DataVersion
+)
 
 @pytest.fixture(scope='session', autouse=True)
 def app_context():
@@ -43,6 +48,12 @@ def app_context():
     ctx = flask_app.app_context()
     ctx.push()
 
+    # Test requests reuse this app context, so forget the user Flask-Login
+    # cached on g by the previous request
+    @flask_app.before_request
+    def reset_login_user():
+        g.pop('_login_user', None)
+
     # Initialize Flask-Login's test environment
     login_manager = LoginManager()
     login_manager.init_app(flask_app)
@@ -70,11 +81,22 @@ def app(app_context):
     db.create_all()
     
     # Clear any existing data
+    db.session.query(ChangeEvent).delete()
+    db.session.query(IdempotencyKey).delete()
+    db.session.query(UserWeekScore).delete()
+    db.session.query(UserSeasonScore).delete()
+    db.session.query(GamePickCount).delete()
     db.session.query(Pick).delete()
     db.session.query(Game).delete()
     db.session.query(User).delete()
+    db.session.query(DataVersion).delete()
     db.session.commit()
 
+    # Versions restart from 0, so drop everything cached against the old ones
+    result_cache._cache = None
+    columnar._engine = None
+    schedule_index._index = None
+
     # Add test data
     _populate_test_data()
 
@@ -142,6 +164,24 @@ def runner(app):
     """A test runner for the app's Click commands."""
     return app.test_cli_runner()
 
+@pytest.fixture
+def finish_game(app):
+    """Mark a test game completed with a final score; the caller commits."""
+    def finish(espn_id, home, away):
+        game = Game.query.filter_by(espn_id=espn_id).first()
+        game.status = 'completed'
+        game.final_score_home = home
+        game.final_score_away = away
+        game.winner = game.home_team if home > away else game.away_team
+        return game
+    return finish
+
+@pytest.fixture
+def season_2023():
+    """Routes treat 2023, the season of the test games, as the current season."""
+    with patch('app.routes.current_season', return_value=2023):
+        yield
+
 def _populate_test_data():
     """Populate test data."""
     # Create test users
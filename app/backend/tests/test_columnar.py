@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+from app import db, User, Game, Pick
+from app.columnar import ColumnarEngine, SeasonMatrix
+from app.result_cache import bump_version, GAMES_VERSION, PICKS_VERSION
+from app.scoring import rebuild_scores, season_standings, week_standings, user_stats
+
+@pytest.fixture
+def league(app, finish_game):
+    """Two finished games with picks from both users."""
+    admin = User.query.filter_by(username='admin').first()
+    user = User.query.filter_by(username='testuser').first()
+    game = finish_game('401547417', 24, 20)
+    mnf = finish_game('401547418', 17, 27)
+    db.session.add_all([
+        Pick(user_id=user.id, game_id=mnf.id, picked_team='DAL', mnf_total_points=50, week=1),
+        Pick(user_id=admin.id, game_id=game.id, picked_team='DET', week=1),
+        Pick(user_id=admin.id, game_id=mnf.id, picked_team='DAL', mnf_total_points=45, week=1)
+    ])
+    db.session.commit()
+    rebuild_scores(2023)
+    return admin, user
+
+def test_matrix_layout(league):
+    """Test that picks load as team codes in a users x games matrix."""
+    matrix = SeasonMatrix(2023).load()
+
+    assert matrix.picks.shape == (2, 2)
+    assert matrix.picks.dtype.name == 'int8'
+    assert (matrix.winners != 0).all()
+    assert matrix.completed.all()
+
+def test_matches_sql_engine(league):
+    """Test that every view agrees with the SQL summary tables."""
+    admin, user = league
+    engine = ColumnarEngine()
+
+    assert engine.season_standings(2023) == season_standings(2023)
+    assert engine.week_standings(2023, 1) == week_standings(2023, 1)
+    assert engine.week_standings(2023, 2) == week_standings(2023, 2) == []
+    assert engine.user_stats([admin.id, user.id], 2023) == user_stats([admin.id, user.id], 2023)
+
+def test_weekly_winner_and_streaks(league):
+    """Test that ties on correct picks go to the closest MNF guess."""
+    admin, user = league
+    standings = {row['username']: row for row in ColumnarEngine().season_standings(2023)}
+
+    # testuser went 2-0, admin 1-1 despite the closer guess and missed the latest game
+    assert standings['testuser']['weekly_wins'] == 1
+    assert standings['testuser']['streak'] == 2
+    assert standings['admin']['weekly_wins'] == 0
+    assert standings['admin']['streak'] == 0
+
+def test_game_results_refresh_incrementally(app, finish_game):
+    """Test that a finished game updates the matrix without reloading picks."""
+    engine = ColumnarEngine()
+    assert engine.season_standings(2023)[0]['correct'] == 0
+
+    finish_game('401547417', 24, 20)
+    bump_version(GAMES_VERSION)
+    db.session.commit()
+    with patch.object(SeasonMatrix, '_load_picks') as load_picks:
+        standings = engine.season_standings(2023)
+        load_picks.assert_not_called()
+
+    assert standings[0]['correct'] == 1
+    assert standings[0]['streak'] == 1
+
+def test_pick_changes_reload_matrix(app):
+    """Test that new picks are visible after the picks version moves."""
+    engine = ColumnarEngine()
+    engine.season_standings(2023)
+    admin = User.query.filter_by(username='admin').first()
+    game = Game.query.filter_by(espn_id='401547418').first()
+    db.session.add(Pick(user_id=admin.id, game_id=game.id, picked_team='NYG', week=1))
+    bump_version(PICKS_VERSION)
+    db.session.commit()
+
+    usernames = [row['username'] for row in engine.season_standings(2023)]
+
+    assert usernames == ['admin', 'testuser']
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+from app import db, Game
+from app.result_cache import bump_version, GAMES_VERSION
+
+def test_games_week_not_modified(authenticated_client, season_2023):
+    """Test that a matching If-None-Match returns 304 without the view running."""
+    first = authenticated_client.get('/api/games/week/1')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert 'no-cache' in first.headers['Cache-Control']
+
+    with patch('app.routes.Game') as game_model:
+        second = authenticated_client.get('/api/games/week/1', headers={'If-None-Match': etag})
+        game_model.query.filter_by.assert_not_called()
+
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+
+def test_games_week_etag_changes_with_results(authenticated_client, season_2023):
+    """Test that a game update invalidates the week's ETag."""
+    etag = authenticated_client.get('/api/games/week/1').headers['ETag']
+
+    bump_version(GAMES_VERSION)
+    db.session.commit()
+    response = authenticated_client.get('/api/games/week/1', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_completed_week_is_immutable(authenticated_client, season_2023):
+    """Test that weeks with only final games are served as immutable."""
+    Game.query.update({'status': 'completed'})
+    db.session.commit()
+
+    response = authenticated_client.get('/api/games/week/1')
+
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'max-age' in response.headers['Cache-Control']
+
+def test_picks_etag_per_user_and_week(authenticated_client):
+    """Test that picks ETags differ per week and change on submission."""
+    week1 = authenticated_client.get('/api/picks?week=1')
+    week2 = authenticated_client.get('/api/picks?week=2')
+    assert week1.headers['ETag'] != week2.headers['ETag']
+
+    game = Game.query.filter_by(espn_id='401547417').first()
+    authenticated_client.post('/api/picks', json={'week': 1, 'season': 2023, 'picks': [{'game_id': game.id, 'picked_team': 'DET'}]})
+    response = authenticated_client.get('/api/picks?week=1', headers={'If-None-Match': week1.headers['ETag']})
+
+    assert response.status_code == 200
+    assert response.get_json()['picks'][0]['picked_team'] == 'DET'
+
+def test_leaderboard_ignores_if_modified_since(authenticated_client):
+    """Test that Last-Modified is sent but only the ETag can answer 304."""
+    bump_version()
+    db.session.commit()
+    first = authenticated_client.get('/api/leaderboard/season?season=2023')
+    assert 'Last-Modified' in first.headers
+
+    # A second score change within the same second keeps the same HTTP date
+    bump_version()
+    db.session.commit()
+    by_date = authenticated_client.get('/api/leaderboard/season?season=2023',
+                                       headers={'If-Modified-Since': first.headers['Last-Modified']})
+    by_etag = authenticated_client.get('/api/leaderboard/season?season=2023',
+                                       headers={'If-None-Match': by_date.headers['ETag']})
+
+    assert by_date.status_code == 200
+    assert by_date.headers['ETag'] != first.headers['ETag']
+    assert by_etag.status_code == 304
+
+def test_errors_carry_no_validators(authenticated_client):
+    """Test that error responses are not given an ETag."""
+    response = authenticated_client.get('/api/stats?user_id=1')
+
+    assert response.status_code == 403
+    assert 'ETag' not in response.headers
@@ -0,0 +1,66 @@
+from app import db, User, Game, Pick
+from app.models import GamePickCount
+from app.scoring import apply_pick_changes, rebuild_pick_counts
+
+def test_rebuild_pick_counts(app):
+    """Test that counts can be rebuilt from the pick table."""
+    game = Game.query.filter_by(espn_id='401547417').first()
+    rebuild_pick_counts(2023)
+    db.session.commit()
+
+    counts = db.session.get(GamePickCount, game.id)
+    assert (counts.home_picks, counts.away_picks) == (1, 0)
+
+def test_apply_pick_changes(app):
+    """Test that replaced picks move counts between sides."""
+    game = Game.query.filter_by(espn_id='401547417').first()
+    rebuild_pick_counts(2023)
+    apply_pick_changes([(game.id, 'KC')], [(game.id, 'DET')])
+    apply_pick_changes([], [(game.id, 'DET')])
+    db.session.commit()
+
+    counts = db.session.get(GamePickCount, game.id)
+    assert (counts.home_picks, counts.away_picks) == (0, 2)
+
+def test_pick_submission_updates_counts(authenticated_client):
+    """Test that submitting picks keeps the counts in step."""
+    game = Game.query.filter_by(espn_id='401547417').first()
+    rebuild_pick_counts(2023)
+    db.session.commit()
+
+    authenticated_client.post('/api/picks', json={
+        'week': 1,
+        'season': 2023,
+        'picks': [{'game_id': game.id, 'picked_team': 'DET'}]
+    })
+
+    counts = db.session.get(GamePickCount, game.id)
+    assert (counts.home_picks, counts.away_picks) == (0, 1)
+
+def test_consensus_hidden_until_kickoff(authenticated_client, season_2023):
+    """Test that only games that have kicked off show their split."""
+    game = Game.query.filter_by(espn_id='401547418').first()
+    admin = User.query.filter_by(username='admin').first()
+    user = User.query.filter_by(username='testuser').first()
+    other = User(username='other', email='other@example.com', password_hash='x')
+    db.session.add(other)
+    db.session.flush()
+    db.session.add_all([
+        Pick(user_id=admin.id, game_id=game.id, picked_team='NYG', week=1),
+        Pick(user_id=user.id, game_id=game.id, picked_team='DAL', week=1),
+        Pick(user_id=other.id, game_id=game.id, picked_team='DAL', week=1)
+    ])
+    rebuild_pick_counts(2023)
+    db.session.commit()
+
+    response = authenticated_client.get('/api/games/week/1/consensus')
+
+    assert response.status_code == 200
+    by_game = {entry['game_id']: entry for entry in response.get_json()}
+    started = by_game[game.id]
+    assert started['revealed'] is True
+    assert (started['home_picks'], started['away_picks']) == (1, 2)
+    assert started['away_pct'] == 66.7
+    upcoming = by_game[Game.query.filter_by(espn_id='401547417').first().id]
+    assert upcoming['revealed'] is False
+    assert upcoming['home_picks'] is None
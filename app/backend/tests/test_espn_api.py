@@ -41,7 +41,7 @@ def mock_game_response():
 
 def test_get_current_week():
     """Test getting current NFL week."""
-    with patch('app.espn_api.requests.get') as mock_get:
+    with patch('app.http_client.requests.Session.get') as mock_get:
         mock_get.return_value.json.return_value = {
             "week": {"number": 5}
         }
@@ -55,7 +55,7 @@ def test_get_current_week():
 
 def test_get_games(espn_api, mock_game_response):
     """Test getting games for a specific week."""
-    with patch('app.espn_api.requests.get') as mock_get:
+    with patch('app.http_client.requests.Session.get') as mock_get:
         mock_get.return_value.json.return_value = mock_game_response
         mock_get.return_value.status_code = 200
         
@@ -72,7 +72,7 @@ def test_get_games(espn_api, mock_game_response):
 
 def test_get_games_error_handling(espn_api):
     """Test error handling when getting games."""
-    with patch('app.espn_api.requests.get') as mock_get:
+    with patch('app.http_client.requests.Session.get') as mock_get, patch('app.http_client.time.sleep'):
         # Simulate API error
         mock_get.return_value.status_code = 500
         
@@ -97,7 +97,7 @@ def test_parse_game_data(espn_api, mock_game_response):
 
 def test_get_team_stats():
     """Test getting team statistics."""
-    with patch('app.espn_api.requests.get') as mock_get:
+    with patch('app.http_client.requests.Session.get') as mock_get:
         mock_get.return_value.json.return_value = {
             "stats": [{
                 "name": "Total Offense",
@@ -119,7 +119,7 @@ def test_get_team_stats():
 
 def test_get_team_stats_error():
     """Test error handling for team statistics."""
-    with patch('app.espn_api.requests.get') as mock_get:
+    with patch('app.http_client.requests.Session.get') as mock_get:
         mock_get.return_value.status_code = 404
         
         api = ESPNAPI()
@@ -130,7 +130,7 @@ def test_get_team_stats_error():
 
 def test_update_game_scores(espn_api, mock_game_response):
     """Test updating game scores."""
-    with patch('app.espn_api.requests.get') as mock_get:
+    with patch('app.http_client.requests.Session.get') as mock_get:
         mock_get.return_value.json.return_value = mock_game_response
         mock_get.return_value.status_code = 200
         
@@ -175,7 +175,7 @@ def test_game_status_parsing(espn_api):
 
 def test_rate_limiting():
     """Test API rate limiting functionality."""
-    with patch('app.espn_api.requests.get') as mock_get:
+    with patch('app.http_client.requests.Session.get') as mock_get:
         mock_get.return_value.json.return_value = {"week": {"number": 1}}
         mock_get.return_value.status_code = 200
         
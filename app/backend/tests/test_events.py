@@ -0,0 +1,140 @@
+import json
+import pytest
+from sqlalchemy import event
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from app import db, User, Game, Pick
+from app.models import ChangeEvent
+from app.events import EventBroadcaster, publish, prune_events, stream, QUEUE_SIZE
+from app.game_updater import update_game_scores
+from app.scoring import rebuild_scores
+from tests.test_game_updater import _scoreboard, _event
+
+@pytest.fixture
+def broadcaster(app):
+    broadcaster = EventBroadcaster(app)
+    with patch.object(EventBroadcaster, '_ensure_started'):
+        yield broadcaster
+
+def test_poll_fans_out_to_subscribers(broadcaster):
+    """Test that one poll delivers new events to every subscriber."""
+    first = broadcaster.subscribe()
+    second = broadcaster.subscribe()
+    publish('game', {'game_id': 1})
+    db.session.commit()
+
+    assert broadcaster.poll_once() == 1
+    assert broadcaster.poll_once() == 0
+    for subscription in (first, second):
+        event_id, frame = subscription.queue.get_nowait()
+        assert frame == f'id: {event_id}\nevent: game\ndata: {{"game_id": 1}}\n\n'
+
+def test_slow_subscriber_is_dropped(broadcaster):
+    """Test that a subscriber with a full queue is cut off instead of blocking others."""
+    slow = broadcaster.subscribe()
+    for i in range(QUEUE_SIZE + 1):
+        publish('game', {'game_id': i})
+    db.session.commit()
+
+    broadcaster.poll_once()
+    assert slow.dropped
+    assert broadcaster.subscriber_count() == 0
+
+def test_stream_replays_from_last_event_id(broadcaster):
+    """Test that a reconnecting client gets missed events once, then live ones."""
+    publish('game', {'game_id': 1})
+    db.session.commit()
+    seen = ChangeEvent.query.one().id
+    subscription = broadcaster.subscribe()
+    publish('game', {'game_id': 2})
+    publish('leaderboard', {'changes': []})
+    db.session.commit()
+    broadcaster.poll_once()
+    publish('game', {'game_id': 3})
+    db.session.commit()
+    broadcaster.poll_once()
+
+    body = stream(broadcaster, subscription, seen)
+    assert next(body).startswith('retry:')
+    frames = [next(body) for _ in range(3)]
+    assert [json.loads(frame.split('data: ')[1]) for frame in frames] == [
+        {'game_id': 2}, {'changes': []}, {'game_id': 3}
+    ]
+    body.close()
+    assert broadcaster.subscriber_count() == 0
+
+def test_prune_events(app):
+    """Test that entries past the retention window are removed."""
+    now = datetime.utcnow()
+    db.session.add_all([
+        ChangeEvent(kind='game', payload='{}', created_at=now - timedelta(hours=2)),
+        ChangeEvent(kind='game', payload='{}', created_at=now)
+    ])
+    db.session.commit()
+
+    assert prune_events(now) == 1
+    assert ChangeEvent.query.count() == 1
+
+def test_update_game_scores_publishes_changes(app):
+    """Test that results and the leaderboard moves they cause reach the change log."""
+    game = Game.query.filter_by(espn_id='401547418').first()
+    user = User.query.filter_by(username='testuser').first()
+    game.start_time = datetime.utcnow() - timedelta(hours=4)
+    db.session.add(Pick(user_id=user.id, game_id=game.id, picked_team='DAL', week=1))
+    rebuild_scores(2023)
+    db.session.commit()
+
+    with patch('app.http_client.requests.Session.get') as mock_get:
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = _scoreboard(_event('401547418', 'NYG', 'DAL', 10, 17))
+        update_game_scores()
+
+    events = ChangeEvent.query.order_by(ChangeEvent.id).all()
+    assert [event.kind for event in events] == ['game', 'leaderboard']
+    payload = json.loads(events[0].payload)
+    assert payload['game_id'] == game.id
+    assert payload['winner'] == 'DAL'
+    assert payload['changes']['status'] == ['scheduled', 'completed']
+    assert json.loads(events[1].payload)['changes'] == [{
+        'season': 2023, 'user_id': user.id, 'correct': 1, 'total': 2,
+        'previous_correct': 0, 'previous_total': 2
+    }]
+
+def test_stream_requires_login(client):
+    """Test that anonymous clients cannot open the stream."""
+    response = client.get('/api/stream')
+    assert response.status_code == 401
+
+def test_stream_route(authenticated_client, app):
+    """Test that the stream answers with an unbuffered event stream."""
+    with patch.object(EventBroadcaster, '_ensure_started'):
+        response = authenticated_client.get('/api/stream', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.headers['X-Accel-Buffering'] == 'no'
+    assert next(response.response).startswith(b'retry:')
+    response.close()
+
+def test_idle_stream_releases_connection(authenticated_client, app):
+    """Test that a stream opened without Last-Event-ID gives its connection back to the pool."""
+    db.session.remove()
+    # The in-memory test database uses StaticPool, which has no checkedout(),
+    # so count checkouts and checkins the way QueuePool.checkedout() would
+    checked_out = []
+    def checkout(*args):
+        checked_out.append(1)
+    def checkin(*args):
+        checked_out.append(-1)
+    event.listen(db.engine, 'checkout', checkout)
+    event.listen(db.engine, 'checkin', checkin)
+    try:
+        with patch.object(EventBroadcaster, '_ensure_started'), patch('app.events.HEARTBEAT_INTERVAL', 0.01):
+            response = authenticated_client.get('/api/stream', buffered=False)
+            next(response.response)
+            assert next(response.response) == b': keepalive\n\n'
+        assert 1 in checked_out
+        assert sum(checked_out) == 0
+        response.close()
+    finally:
+        event.remove(db.engine, 'checkout', checkout)
+        event.remove(db.engine, 'checkin', checkin)
@@ -0,0 +1,56 @@
+import time
+from app.fetch_engine import FetchEngine, HostRateLimiter
+
+def test_map_unordered_returns_all_results():
+    """Test that every job yields a result in completion order."""
+    engine = FetchEngine(max_workers=4, requests_per_second=0)
+
+    def slow_square(n):
+        time.sleep(0.05 * (3 - n))
+        return n * n
+
+    results = list(engine.map_unordered(slow_square, [0, 1, 2]))
+
+    assert sorted((item, result) for item, result, _ in results) == [(0, 0), (1, 1), (2, 4)]
+    # The fastest job finishes first
+    assert results[0][0] == 2
+
+def test_map_unordered_runs_concurrently():
+    """Test that jobs run in parallel up to the worker limit."""
+    engine = FetchEngine(max_workers=8, requests_per_second=0)
+
+    start = time.monotonic()
+    list(engine.map_unordered(lambda _: time.sleep(0.1), range(8)))
+
+    assert time.monotonic() - start < 0.5
+
+def test_map_unordered_captures_errors():
+    """Test that a failing job does not stop the others."""
+    engine = FetchEngine(max_workers=2, requests_per_second=0)
+
+    def fail_on_two(n):
+        if n == 2:
+            raise ValueError("boom")
+        return n
+
+    results = {item: (result, error) for item, result, error in engine.map_unordered(fail_on_two, [1, 2, 3])}
+
+    assert results[1] == (1, None)
+    assert results[3] == (3, None)
+    assert isinstance(results[2][1], ValueError)
+
+def test_rate_limiter_spaces_same_host():
+    """Test that calls to one host are spaced while other hosts are not."""
+    limiter = HostRateLimiter(requests_per_second=20)
+
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait('https://site.api.espn.com/a')
+    same_host = time.monotonic() - start
+
+    start = time.monotonic()
+    limiter.wait('https://other.example.com/a')
+    other_host = time.monotonic() - start
+
+    assert same_host >= 0.09
+    assert other_host < 0.05
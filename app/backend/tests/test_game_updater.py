@@ -0,0 +1,114 @@
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from app import db, Game
+from app.game_updater import update_game_scores, index_events, event_fingerprint, parse_game_status
+
+def _scoreboard(*events):
+    return {"events": list(events)}
+
+def _event(espn_id, home, away, home_score, away_score, completed=True):
+    return {
+        "id": espn_id,
+        "status": {"type": {"completed": completed, "state": "post" if completed else "in"}},
+        "competitions": [{
+            "competitors": [
+                {"homeAway": "home", "team": {"abbreviation": home}, "score": str(home_score)},
+                {"homeAway": "away", "team": {"abbreviation": away}, "score": str(away_score)}
+            ]
+        }]
+    }
+
+def test_index_events():
+    """Test mapping scoreboard events by ESPN id."""
+    data = _scoreboard(_event('1', 'KC', 'DET', 21, 20), _event('2', 'NYG', 'DAL', 10, 17))
+    events = index_events(data)
+    assert set(events) == {'1', '2'}
+    assert index_events(None) == {}
+
+def test_update_game_scores_fetches_once_per_week(app):
+    """Test that started games in the same week share one scoreboard request."""
+    for offset, espn_id in enumerate(['401547500', '401547501', '401547502']):
+        db.session.add(Game(
+            espn_id=espn_id,
+            home_team='BUF',
+            away_team='MIA',
+            start_time=datetime.utcnow() - timedelta(hours=3 + offset),
+            week=2,
+            season=2023
+        ))
+    db.session.commit()
+
+    with patch('app.http_client.requests.Session.get') as mock_get:
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = _scoreboard(
+            _event('401547418', 'NYG', 'DAL', 10, 17),
+            _event('401547500', 'BUF', 'MIA', 24, 3)
+        )
+
+        update_game_scores()
+
+        # Week 1 and week 2 each need one scoreboard request
+        assert mock_get.call_count == 2
+        weeks = sorted(call.kwargs['params']['week'] for call in mock_get.call_args_list)
+        assert weeks == ['1', '2']
+
+    game = Game.query.filter_by(espn_id='401547500').first()
+    assert game.status == 'completed'
+    assert game.final_score_home == 24
+    assert game.winner == 'BUF'
+
+def test_update_game_scores_skips_future_games(app):
+    """Test that games which have not kicked off are not fetched."""
+    Game.query.filter(Game.start_time <= datetime.utcnow()).delete()
+    db.session.commit()
+
+    with patch('app.http_client.requests.Session.get') as mock_get:
+        update_game_scores()
+        mock_get.assert_not_called()
+
+def test_update_game_scores_change_list(app):
+    """Test that real changes come back as a structured change list."""
+    game = Game.query.filter_by(espn_id='401547418').first()
+
+    with patch('app.http_client.requests.Session.get') as mock_get:
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = _scoreboard(_event('401547418', 'NYG', 'DAL', 10, 17))
+
+        changes = update_game_scores()
+
+    assert changes == [{
+        'game_id': game.id,
+        'espn_id': '401547418',
+        'changes': {
+            'status': ['scheduled', 'completed'],
+            'final_score_home': [0, 10],
+            'final_score_away': [0, 17],
+            'winner': [None, 'DAL']
+        }
+    }]
+
+def test_update_game_scores_skips_unchanged_fingerprint(app):
+    """Test that games with an unchanged upstream fingerprint are not reloaded."""
+    live = _event('401547418', 'NYG', 'DAL', 7, 3, completed=False)
+
+    with patch('app.http_client.requests.Session.get') as mock_get:
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = _scoreboard(live)
+
+        first = update_game_scores()
+        second = update_game_scores()
+
+    assert first[0]['changes']['status'] == ['scheduled', 'in_progress']
+    assert second == []
+    game = Game.query.filter_by(espn_id='401547418').first()
+    assert game.upstream_fingerprint == event_fingerprint(live)
+
+def test_parse_game_status_winner_by_home_away():
+    """Test that the winner follows homeAway rather than competitor order."""
+    event = _event('1', 'KC', 'DET', 20, 21)
+    event['competitions'][0]['competitors'].reverse()
+
+    status, home_score, away_score, winner = parse_game_status(event)
+
+    assert (status, home_score, away_score, winner) == ('completed', 20, 21, 'DET')
+    assert parse_game_status(_event('2', 'KC', 'DET', 20, 20))[3] is None
@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db, User, Game, Pick
+from app.columnar import SeasonMatrix, ColumnarEngine, encode_head_to_head, HEAD_TO_HEAD_MAGIC
+
+@pytest.fixture
+def picks(app):
+    """Both users pick both games; they split on the finished KC game."""
+    admin = User.query.filter_by(username='admin').first()
+    user = User.query.filter_by(username='testuser').first()
+    kc = Game.query.filter_by(espn_id='401547417').first()
+    mnf = Game.query.filter_by(espn_id='401547418').first()
+    kc.status, kc.winner = 'completed', 'KC'
+    db.session.add_all([
+        Pick(user_id=user.id, game_id=mnf.id, picked_team='DAL', week=1),
+        Pick(user_id=admin.id, game_id=kc.id, picked_team='DET', week=1),
+        Pick(user_id=admin.id, game_id=mnf.id, picked_team='DAL', week=1)
+    ])
+    db.session.commit()
+    return admin, user
+
+def test_head_to_head_matches_pairwise(picks):
+    """Test that the matrix products agree with a pairwise count."""
+    matrix = SeasonMatrix(2023).load()
+    pairs = matrix.head_to_head()
+    a, b = matrix.user_index[picks[0].id], matrix.user_index[picks[1].id]
+
+    assert pairs['shared'][a, b] == 2
+    assert pairs['agreed'][a, b] == 1
+    # testuser took KC over admin's DET and KC won
+    assert pairs['wins'][b, a] == 1
+    assert pairs['wins'][a, b] == 0
+    assert (pairs['shared'] == pairs['shared'].T).all()
+
+def test_head_to_head_through_week(picks):
+    """Test that later weeks are excluded when a week is given."""
+    matrix = SeasonMatrix(2023).load()
+    assert matrix.head_to_head(through_week=0)['shared'].sum() == 0
+
+def test_open_picks_stay_private(picks):
+    """Test that picks on games that have not kicked off do not move the pair counts."""
+    admin, user = picks
+    before = SeasonMatrix(2023).load().head_to_head()
+    kickoff = datetime.utcnow() + timedelta(days=3)
+    game = Game(espn_id='401547499', home_team='BUF', away_team='MIA', week=1, season=2023, start_time=kickoff)
+    db.session.add(game)
+    db.session.flush()
+    db.session.add_all([
+        Pick(user_id=admin.id, game_id=game.id, picked_team='BUF', week=1),
+        Pick(user_id=user.id, game_id=game.id, picked_team='BUF', week=1)
+    ])
+    db.session.commit()
+
+    matrix = SeasonMatrix(2023).load()
+    after = matrix.head_to_head()
+    assert (after['shared'] == before['shared']).all()
+    assert (after['agreed'] == before['agreed']).all()
+    # Counted once the game kicks off
+    assert (matrix.head_to_head(now=kickoff)['agreed'] == before['agreed'] + 1).all()
+
+def test_binary_encoding(picks):
+    """Test the compact payload layout."""
+    matrix = SeasonMatrix(2023).load()
+    body = encode_head_to_head(matrix, matrix.head_to_head())
+
+    assert body[:4] == HEAD_TO_HEAD_MAGIC
+    n = int(np.frombuffer(body[4:8], '<u4')[0])
+    assert n == 2
+    assert len(body) == 8 + 4 * n + 3 * 2 * n * n
+    shared = np.frombuffer(body[8 + 4 * n:8 + 4 * n + 2 * n * n], '<u2').reshape(n, n)
+    assert shared[0, 1] == 2
+
+def test_head_to_head_endpoint(authenticated_client, picks):
+    """Test the JSON and binary forms of the endpoint."""
+    with patch('app.routes.get_columnar_engine', return_value=ColumnarEngine()):
+        response = authenticated_client.get('/api/analytics/head-to-head?season=2023')
+        binary = authenticated_client.get('/api/analytics/head-to-head?season=2023&format=binary')
+
+    data = response.get_json()
+    assert [user['username'] for user in data['users']] == ['admin', 'testuser']
+    assert data['agreed'] == [[2, 1], [1, 2]]
+    assert binary.mimetype == 'application/octet-stream'
+    assert binary.data[:4] == HEAD_TO_HEAD_MAGIC
@@ -0,0 +1,62 @@
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from app.http_client import HTTPClient
+
+def _response(status_code, retry_after=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {'Retry-After': retry_after} if retry_after else {}
+    return response
+
+@pytest.fixture
+def client():
+    return HTTPClient(connect_timeout=1, read_timeout=2, max_retries=2)
+
+def test_get_uses_timeouts(client):
+    """Test that every request carries connect and read timeouts."""
+    with patch.object(client.session, 'get', return_value=_response(200)) as mock_get:
+        client.get('https://site.api.espn.com/scoreboard', params={'week': 1})
+
+        assert mock_get.call_args.kwargs['timeout'] == (1, 2)
+        assert mock_get.call_args.kwargs['params'] == {'week': 1}
+
+def test_get_retries_server_errors(client):
+    """Test that 5xx and 429 responses are retried with backoff."""
+    responses = [_response(503), _response(429, retry_after='0'), _response(200)]
+    with patch.object(client.session, 'get', side_effect=responses) as mock_get, \
+            patch('app.http_client.time.sleep') as mock_sleep:
+        response = client.get('https://site.api.espn.com/scoreboard')
+
+        assert response.status_code == 200
+        assert mock_get.call_count == 3
+        assert mock_sleep.call_count == 2
+
+def test_get_does_not_retry_client_errors(client):
+    """Test that a 404 is returned without retrying."""
+    with patch.object(client.session, 'get', return_value=_response(404)) as mock_get:
+        response = client.get('https://site.api.espn.com/teams/XXX/statistics')
+
+        assert response.status_code == 404
+        assert mock_get.call_count == 1
+
+def test_get_raises_after_last_retry(client):
+    """Test that connection errors propagate once retries are exhausted."""
+    with patch.object(client.session, 'get', side_effect=requests.ConnectionError('down')) as mock_get, \
+            patch('app.http_client.time.sleep'):
+        with pytest.raises(requests.ConnectionError):
+            client.get('https://site.api.espn.com/scoreboard')
+
+        assert mock_get.call_count == 3
+
+def test_latency_stats(client):
+    """Test that calls, retries and errors are counted per endpoint."""
+    with patch.object(client.session, 'get', side_effect=[_response(500), _response(200)]), \
+            patch('app.http_client.time.sleep'):
+        client.get('https://site.api.espn.com/scoreboard', params={'week': 3})
+
+    stats = client.stats.snapshot()['site.api.espn.com/scoreboard']
+    assert stats['calls'] == 2
+    assert stats['errors'] == 1
+    assert stats['retries'] == 1
+    assert stats['avg_seconds'] >= 0
@@ -0,0 +1,80 @@
+import time
+import threading
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from app import Game
+from app.leases import try_acquire
+from app.hydration import SingleFlight, hydrate_week, stats
+
+def _scoreboard():
+    return {"events": [{
+        "id": "401672001",
+        "date": "2024-09-08T17:00Z",
+        "competitions": [{
+            "date": "2024-09-08T17:00Z",
+            "competitors": [
+                {"homeAway": "home", "team": {"abbreviation": "KC"}},
+                {"homeAway": "away", "team": {"abbreviation": "BUF"}}
+            ]
+        }]
+    }]}
+
+def test_single_flight_coalesces_callers():
+    """Test that concurrent callers with the same key share one execution."""
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'done'
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do('week-3', slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result == 'done' for result, _, _ in results)
+    assert [shared for _, _, shared in results].count(False) == 1
+    assert max(callers for _, callers, _ in results) == 5
+
+def test_single_flight_shares_errors():
+    """Test that waiters see the leader's exception."""
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do('key', lambda: (_ for _ in ()).throw(ValueError('boom')))
+    # The key is released after a failure
+    assert flight.do('key', lambda: 'ok') == ('ok', 1, False)
+
+def test_hydrate_week_fetches_and_stores(app):
+    """Test that an empty week is fetched once and stored."""
+    fetches_before = stats.fetches
+    with patch('app.hydration.get_espn_week_data', return_value=_scoreboard()) as mock_fetch:
+        assert hydrate_week(2024, 1) == 'ready'
+        mock_fetch.assert_called_once_with(2024, 1)
+
+    assert Game.query.filter_by(season=2024, week=1).count() == 1
+    assert stats.fetches == fetches_before + 1
+
+def test_hydrate_week_waits_for_other_process(app):
+    """Test that a week locked by another process is not fetched again."""
+    try_acquire('hydrate:2024:2', 'other-worker', timedelta(seconds=30))
+
+    with patch('app.hydration.get_espn_week_data') as mock_fetch, \
+            patch('app.hydration.WAIT_TIMEOUT', 0.3):
+        assert hydrate_week(2024, 2) == 'hydrating'
+        mock_fetch.assert_not_called()
+
+def test_games_route_reports_hydrating(authenticated_client, app):
+    """Test that the week endpoint answers 202 while another process hydrates."""
+    with patch('app.routes.hydrate_week', return_value='hydrating'), \
+            patch('app.routes.current_season', return_value=2030):
+        response = authenticated_client.get('/api/games/week/4')
+
+    assert response.status_code == 202
+    assert response.json['status'] == 'hydrating'
+    assert response.headers['Retry-After'] == '2'
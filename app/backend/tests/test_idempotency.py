@@ -0,0 +1,61 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db, User, Game, Pick
+from app.models import IdempotencyKey
+from app.idempotency import claim_key, request_digest, prune_idempotency_keys, TTL
+
+@pytest.fixture
+def submission(app):
+    game = Game.query.filter_by(espn_id='401547417').first()
+    return {'week': 1, 'season': 2023, 'picks': [{'game_id': game.id, 'picked_team': 'DET'}]}
+
+def test_replay_returns_stored_response(authenticated_client, submission):
+    """Test that a retried request gets the first response without rewriting picks."""
+    headers = {'Idempotency-Key': 'save-1'}
+    first = authenticated_client.post('/api/picks', json=submission, headers=headers)
+    assert first.get_json()['results'][0]['outcome'] == 'updated'
+
+    with patch('app.routes.save_week_picks') as save:
+        retry = authenticated_client.post('/api/picks', json=submission, headers=headers)
+        save.assert_not_called()
+
+    assert retry.status_code == 200
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+
+def test_key_reused_for_different_request(authenticated_client, submission):
+    """Test that a key cannot be replayed against a different body."""
+    headers = {'Idempotency-Key': 'save-2'}
+    authenticated_client.post('/api/picks', json=submission, headers=headers)
+    submission['picks'][0]['picked_team'] = 'KC'
+
+    response = authenticated_client.post('/api/picks', json=submission, headers=headers)
+
+    assert response.status_code == 422
+    user = User.query.filter_by(username='testuser').first()
+    assert Pick.query.filter_by(user_id=user.id).one().picked_team == 'DET'
+
+def test_keys_are_per_user(app, submission):
+    """Test that the same key from two users is two separate requests."""
+    digest = request_digest(submission)
+    admin = User.query.filter_by(username='admin').first()
+    user = User.query.filter_by(username='testuser').first()
+
+    assert claim_key(admin.id, 'shared', digest)
+    assert claim_key(user.id, 'shared', digest)
+    assert not claim_key(user.id, 'shared', digest)
+
+def test_expired_key_is_reclaimed_and_pruned(app, submission):
+    """Test that expired keys can be reused and are removed by the cleanup job."""
+    user = User.query.filter_by(username='testuser').first()
+    digest = request_digest(submission)
+    now = datetime.utcnow()
+    db.session.add(IdempotencyKey(user_id=user.id, key='old', request_digest=digest,
+                                  status_code=200, response_body='{}', expires_at=now - timedelta(minutes=1)))
+    db.session.commit()
+
+    assert prune_idempotency_keys(now) == 1
+    assert claim_key(user.id, 'old', digest, now - TTL * 2)
+    db.session.commit()
+    assert claim_key(user.id, 'old', digest, now)
@@ -0,0 +1,86 @@
+import pytest
+from datetime import datetime
+from app import db, Game
+from app.ingest import parse_espn_datetime, parse_scoreboard, upsert_games
+
+def _event(espn_id, home, away, date):
+    return {
+        "id": espn_id,
+        "date": date,
+        "competitions": [{
+            "date": date,
+            "competitors": [
+                {"homeAway": "home", "team": {"abbreviation": home}},
+                {"homeAway": "away", "team": {"abbreviation": away}}
+            ]
+        }]
+    }
+
+@pytest.fixture
+def scoreboard():
+    return {"events": [
+        _event('401671001', 'KC', 'BAL', '2024-09-06T00:20Z'),      # Thursday night
+        _event('401671002', 'PHI', 'GB', '2024-09-07T00:15Z'),      # Friday night
+        _event('401671003', 'SF', 'NYJ', '2024-09-10T00:15Z')       # Monday night
+    ]}
+
+def test_parse_espn_datetime():
+    """Test both timestamp formats ESPN uses."""
+    assert parse_espn_datetime('2024-09-06T00:20Z') == datetime(2024, 9, 6, 0, 20)
+    assert parse_espn_datetime('2024-09-06T00:20:00Z') == datetime(2024, 9, 6, 0, 20)
+    with pytest.raises(ValueError):
+        parse_espn_datetime('September 6')
+
+def test_parse_scoreboard(scoreboard):
+    """Test parsing a scoreboard into game rows."""
+    rows = parse_scoreboard(scoreboard, 2024, 1)
+
+    assert [row['espn_id'] for row in rows] == ['401671001', '401671002', '401671003']
+    assert rows[0]['home_team'] == 'KC'
+    assert rows[0]['away_team'] == 'BAL'
+    assert rows[0]['season'] == 2024
+    # Only the Monday kickoff (Eastern time) is flagged as MNF
+    assert [row['is_mnf'] for row in rows] == [False, False, True]
+
+def test_upsert_games_counts(app, scoreboard):
+    """Test inserted, updated and unchanged counts across repeated loads."""
+    rows = parse_scoreboard(scoreboard, 2024, 1)
+
+    assert upsert_games(rows) == {'inserted': 3, 'updated': 0, 'unchanged': 0}
+    assert upsert_games(rows) == {'inserted': 0, 'updated': 0, 'unchanged': 3}
+
+    rows[1]['start_time'] = datetime(2024, 9, 8, 17, 0)
+    assert upsert_games(rows) == {'inserted': 0, 'updated': 1, 'unchanged': 2}
+
+    assert Game.query.filter_by(season=2024).count() == 3
+    game = Game.query.filter_by(espn_id='401671002').first()
+    assert game.start_time == datetime(2024, 9, 8, 17, 0)
+    assert game.status == 'scheduled'
+
+def test_upsert_preserves_results(app):
+    """Test that schedule upserts never clobber scores set by the updater."""
+    game = Game.query.filter_by(espn_id='401547418').first()
+    game.status = 'completed'
+    game.final_score_home = 24
+    game.winner = 'NYG'
+    db.session.commit()
+
+    upsert_games([{
+        'espn_id': '401547418',
+        'week': 1,
+        'season': 2023,
+        'home_team': 'NYG',
+        'away_team': 'DAL',
+        'start_time': game.start_time,
+        'is_mnf': False
+    }])
+
+    db.session.expire_all()
+    game = Game.query.filter_by(espn_id='401547418').first()
+    assert game.is_mnf is False
+    assert game.status == 'completed'
+    assert game.winner == 'NYG'
+
+def test_upsert_games_empty(app):
+    """Test that an empty scoreboard is a no-op."""
+    assert upsert_games([]) == {'inserted': 0, 'updated': 0, 'unchanged': 0}
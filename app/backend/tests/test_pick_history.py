@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import db, User, Game, Pick
+from app.picks import parse_weeks, parse_cursor
+
+@pytest.fixture
+def season(app):
+    """Three more weeks of picks for testuser and an admin pick on the open game"""
+    user = User.query.filter_by(username='testuser').first()
+    admin = User.query.filter_by(username='admin').first()
+    kc_game = Game.query.filter_by(espn_id='401547417').first()
+    mnf_game = Game.query.filter_by(espn_id='401547418').first()
+    for week in (2, 3, 4):
+        game = Game(espn_id=f'40154750{week}', home_team='BUF', away_team='MIA', week=week, season=2023,
+                    start_time=datetime.utcnow() - timedelta(days=7 * week), winner='BUF', status='completed')
+        db.session.add(game)
+        db.session.flush()
+        db.session.add(Pick(user_id=user.id, game_id=game.id, picked_team='MIA', week=week))
+    db.session.add_all([
+        Pick(user_id=admin.id, game_id=kc_game.id, picked_team='DET', week=1),
+        Pick(user_id=admin.id, game_id=mnf_game.id, picked_team='NYG', week=1)
+    ])
+    db.session.commit()
+    return user, admin
+
+def test_parse_weeks_and_cursor():
+    """Test the weeks and cursor query formats."""
+    assert parse_weeks('1-18') == (1, 18)
+    assert parse_weeks('5') == (5, 5)
+    assert parse_weeks('9-2') is None
+    assert parse_weeks('x') is None
+    assert parse_cursor('3.12.2') == (3, 12, 2)
+    assert parse_cursor('3.12') is None
+
+def test_full_season_in_one_query(authenticated_client, season):
+    """Test that a user's season comes back in one page from one pick query."""
+    statements = []
+    def count(*args):
+        statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        response = authenticated_client.get('/api/picks/history?season=2023&weeks=1-18')
+        data = response.get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    assert [pick['week'] for pick in data['picks']] == [1, 2, 3, 4]
+    assert data['next_cursor'] is None
+    assert data['picks'][1]['is_correct'] is False
+    assert len([s for s in statements if 'FROM pick' in s]) == 1
+
+def test_keyset_pages(authenticated_client, season):
+    """Test that following next_cursor walks every pick exactly once."""
+    weeks = []
+    url = '/api/picks/history?season=2023&limit=3'
+    while url:
+        data = authenticated_client.get(url).get_json()
+        weeks += [pick['week'] for pick in data['picks']]
+        url = data['next_cursor'] and f'/api/picks/history?season=2023&limit=3&cursor={data["next_cursor"]}'
+    assert weeks == [1, 2, 3, 4]
+
+def test_other_users_picks_hidden_until_kickoff(authenticated_client, season):
+    """Test that another user's picks only show for games that have started."""
+    user, admin = season
+    data = authenticated_client.get(f'/api/picks/history?season=2023&weeks=1&user={admin.id}').get_json()
+    assert [pick['picked_team'] for pick in data['picks']] == ['NYG']
+
+def test_get_picks_lists_every_user(authenticated_client, season):
+    """Test that the week endpoint returns real pick fields for all users."""
+    data = authenticated_client.get('/api/get_picks?week=1&season=2023').get_json()
+    assert data['success'] is True
+    assert {(pick['username'], pick['picked_team']) for pick in data['picks']} == {('testuser', 'KC'), ('admin', 'NYG')}
+
+def test_invalid_range(authenticated_client):
+    """Test that malformed ranges and cursors are refused."""
+    assert authenticated_client.get('/api/picks/history?weeks=5-1').status_code == 400
+    assert authenticated_client.get('/api/picks/history?cursor=abc').status_code == 400
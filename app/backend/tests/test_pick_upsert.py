@@ -0,0 +1,129 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from app import db, User, Game, Pick
+from app.picks import save_week_picks
+from app.schedule_index import ScheduleIndex
+from app.result_cache import data_version, PICKS_VERSION
+
+@pytest.fixture
+def games(app):
+    """The conftest games plus a second open game in week 1"""
+    open_game = Game(espn_id='401547419', home_team='BUF', away_team='MIA',
+                     start_time=datetime.utcnow() + timedelta(days=2), week=1, season=2023)
+    db.session.add(open_game)
+    db.session.commit()
+    return (
+        Game.query.filter_by(espn_id='401547417').first(),
+        Game.query.filter_by(espn_id='401547418').first(),
+        open_game
+    )
+
+def _save(user, submitted):
+    schedule = ScheduleIndex().season(2023)
+    return save_week_picks(user.id, 1, submitted, schedule, datetime.utcnow())
+
+def test_save_week_picks_outcomes(app, games):
+    """Test that each submitted pick reports what happened to it."""
+    kc_game, mnf_game, open_game = games
+    user = User.query.filter_by(username='testuser').first()
+
+    saved = _save(user, [
+        {'game_id': kc_game.id, 'picked_team': 'KC'},
+        {'game_id': open_game.id, 'picked_team': 'MIA', 'mnf_total_points': 41},
+        {'game_id': open_game.id, 'picked_team': 'BUF'},
+        {'game_id': 999999, 'picked_team': 'KC'},
+        {'game_id': kc_game.id, 'picked_team': 'NYJ'},
+        {'game_id': mnf_game.id, 'picked_team': 'DAL'}
+    ])
+
+    assert [(result['game_id'], result['outcome']) for result in saved['results']] == [
+        (kc_game.id, 'unchanged'),
+        (open_game.id, 'inserted'),
+        (open_game.id, 'rejected'),
+        (999999, 'rejected'),
+        (kc_game.id, 'rejected'),
+        (mnf_game.id, 'rejected')
+    ]
+    assert saved['results'][-1]['reason'] == 'Game is locked'
+    assert saved['removed'] == []
+    assert saved['added'] == [(open_game.id, 'MIA')]
+
+def test_save_week_picks_updates_in_place(app, games):
+    """Test that a changed pick keeps its row and omitted picks are removed."""
+    kc_game, _, open_game = games
+    user = User.query.filter_by(username='testuser').first()
+    pick_id = Pick.query.filter_by(user_id=user.id, game_id=kc_game.id).one().id
+
+    saved = _save(user, [{'game_id': kc_game.id, 'picked_team': 'DET'}])
+    db.session.commit()
+    assert saved['results'] == [{'game_id': kc_game.id, 'outcome': 'updated'}]
+    assert saved['removed'] == [(kc_game.id, 'KC')]
+    assert Pick.query.filter_by(user_id=user.id).one().id == pick_id
+
+    saved = _save(user, [{'game_id': open_game.id, 'picked_team': 'BUF'}])
+    db.session.commit()
+    assert {result['outcome'] for result in saved['results']} == {'inserted', 'removed'}
+    assert [pick.game_id for pick in Pick.query.filter_by(user_id=user.id)] == [open_game.id]
+
+def test_locked_pick_is_kept(app, games):
+    """Test that leaving a started game out of a submission does not withdraw its pick."""
+    kc_game, mnf_game, _ = games
+    user = User.query.filter_by(username='testuser').first()
+    db.session.add(Pick(user_id=user.id, game_id=mnf_game.id, picked_team='DAL', week=1))
+    db.session.commit()
+
+    saved = _save(user, [{'game_id': kc_game.id, 'picked_team': 'KC'}])
+    db.session.commit()
+
+    assert saved['removed'] == []
+    assert Pick.query.filter_by(user_id=user.id, game_id=mnf_game.id).one().picked_team == 'DAL'
+
+def test_rejected_pick_keeps_saved_pick(app, games):
+    """Test that a bad resubmission does not withdraw the saved pick."""
+    kc_game, _, _ = games
+    user = User.query.filter_by(username='testuser').first()
+
+    saved = _save(user, [{'game_id': kc_game.id, 'picked_team': 'KC', 'mnf_total_points': -3}])
+    db.session.commit()
+
+    assert saved['results'][0]['outcome'] == 'rejected'
+    assert Pick.query.filter_by(user_id=user.id, game_id=kc_game.id).one().picked_team == 'KC'
+
+def test_one_pick_per_user_and_game(app, games):
+    """Test that the database refuses a second pick for the same game."""
+    kc_game, _, _ = games
+    user = User.query.filter_by(username='testuser').first()
+    db.session.add(Pick(user_id=user.id, game_id=kc_game.id, picked_team='DET', week=1))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+def test_unchanged_submission_skips_write(authenticated_client, games):
+    """Test that resubmitting the same picks leaves the picks version alone."""
+    kc_game, _, _ = games
+    before = data_version(PICKS_VERSION)
+
+    response = authenticated_client.post('/api/picks', json={
+        'week': 1,
+        'season': 2023,
+        'picks': [{'game_id': kc_game.id, 'picked_team': 'KC'}]
+    })
+
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'game_id': kc_game.id, 'outcome': 'unchanged'}]
+    assert data_version(PICKS_VERSION) == before
+
+def test_invalid_season_is_rejected(authenticated_client, games):
+    """Test that a non-integer season is a 400, not a failed lookup."""
+    kc_game, _, _ = games
+
+    response = authenticated_client.post('/api/picks', json={
+        'week': 1,
+        'season': '2023',
+        'picks': [{'game_id': kc_game.id, 'picked_team': 'DET'}]
+    })
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid season'
+    assert Pick.query.filter_by(game_id=kc_game.id).one().picked_team == 'KC'
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+from app import Game
+from app.preload import preload_season, preload_schedule_command
+from app.ingest import season_weeks
+
+def _scoreboard(season, week):
+    return {"events": [{
+        "id": f"{season}{week:02d}{n}",
+        "date": "2024-09-08T17:00Z",
+        "competitions": [{
+            "date": "2024-09-08T17:00Z",
+            "competitors": [
+                {"homeAway": "home", "team": {"abbreviation": "KC"}},
+                {"homeAway": "away", "team": {"abbreviation": "BUF"}}
+            ]
+        }]
+    } for n in range(2)]}
+
+def _fake_week_data(season, week):
+    return _scoreboard(season, week)
+
+def test_season_weeks():
+    """Test regular season and postseason week numbering."""
+    assert season_weeks(include_postseason=False) == list(range(1, 19))
+    assert season_weeks()[-4:] == [19, 20, 21, 23]
+
+def test_preload_season(app):
+    """Test that every week is fetched and bulk loaded."""
+    progress = []
+    with patch('app.preload.get_espn_week_data', side_effect=_fake_week_data) as mock_fetch:
+        totals = preload_season(2024, progress=lambda week, counts, error: progress.append(week))
+
+    assert mock_fetch.call_count == 22
+    assert sorted(progress) == season_weeks()
+    assert totals['inserted'] == 44
+    assert totals['failed'] == []
+    assert Game.query.filter_by(season=2024).count() == 44
+
+def test_preload_season_resumes(app):
+    """Test that loaded weeks are skipped and failed weeks are reported."""
+    def flaky(season, week):
+        return None if week == 5 else _scoreboard(season, week)
+
+    with patch('app.preload.get_espn_week_data', side_effect=flaky):
+        totals = preload_season(2024, include_postseason=False)
+    assert totals['failed'] == [5]
+
+    with patch('app.preload.get_espn_week_data', side_effect=_fake_week_data) as mock_fetch:
+        totals = preload_season(2024, include_postseason=False)
+
+    mock_fetch.assert_called_once_with(2024, 5)
+    assert totals['inserted'] == 2
+
+def test_preload_season_refresh_is_idempotent(app):
+    """Test that a refresh re-fetches everything without duplicating rows."""
+    with patch('app.preload.get_espn_week_data', side_effect=_fake_week_data):
+        preload_season(2024, include_postseason=False)
+        totals = preload_season(2024, include_postseason=False, refresh=True)
+
+    assert totals['inserted'] == 0
+    assert totals['unchanged'] == 36
+    assert Game.query.filter_by(season=2024).count() == 36
+
+def test_preload_schedule_command(app):
+    """Test the CLI command output."""
+    runner = app.test_cli_runner()
+    with patch('app.preload.get_espn_week_data', side_effect=_fake_week_data):
+        result = runner.invoke(preload_schedule_command, ['--season', '2024', '--no-postseason'])
+
+    assert result.exit_code == 0
+    assert 'week 18: 2 inserted' in result.output
+    assert 'Done: 36 inserted' in result.output
@@ -0,0 +1,127 @@
+import os
+import time
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db, User, Game, Pick
+from app.columnar import SeasonMatrix, ColumnarEngine
+from app.projections import project, simulate, default_week
+
+def test_settled_week_is_certain(app, finish_game):
+    """Test that finished weeks project their actual winner."""
+    finish_game('401547417', 24, 20)
+    finish_game('401547418', 17, 27)
+    db.session.commit()
+
+    result = project(SeasonMatrix(2023).load(), week=1, simulations=1000, seed=1)
+
+    assert result['remaining_games'] == {'week': 0, 'season': 0}
+    assert result['users'][0]['username'] == 'testuser'
+    assert result['users'][0]['week_win_probability'] == 1.0
+    assert result['users'][0]['season_win_probability'] == 1.0
+
+def test_coin_flip_and_weighted_games(app):
+    """Test that an open game splits the win according to its probability."""
+    admin = User.query.filter_by(username='admin').first()
+    game = Game.query.filter_by(espn_id='401547417').first()
+    db.session.add(Pick(user_id=admin.id, game_id=game.id, picked_team='DET', week=1))
+    db.session.commit()
+    matrix = SeasonMatrix(2023).load()
+    testuser = matrix.user_index[User.query.filter_by(username='testuser').first().id]
+
+    even = simulate(matrix, 1, simulations=20000, seed=1)
+    weighted = simulate(matrix, 1, simulations=20000, home_win_probability={game.id: 0.9}, seed=1)
+
+    assert abs(even['week'][testuser] - 0.5) < 0.02
+    assert abs(weighted['week'][testuser] - 0.9) < 0.02
+    assert np.isclose(even['week'].sum(), 1.0)
+
+def test_mnf_guess_breaks_ties(app, finish_game):
+    """Test that a closer MNF guess wins when picks are identical."""
+    admin = User.query.filter_by(username='admin').first()
+    user = User.query.filter_by(username='testuser').first()
+    Pick.query.delete()
+    mnf = finish_game('401547418', 17, 27)
+    db.session.add_all([
+        Pick(user_id=user.id, game_id=mnf.id, picked_team='DAL', mnf_total_points=60, week=1),
+        Pick(user_id=admin.id, game_id=mnf.id, picked_team='DAL', mnf_total_points=43, week=1)
+    ])
+    db.session.commit()
+
+    result = project(SeasonMatrix(2023).load(), week=1, simulations=1000, seed=1)
+
+    assert [(u['username'], u['week_win_probability']) for u in result['users']] == [('admin', 1.0), ('testuser', 0.0)]
+
+def test_default_week_is_first_open_week(app):
+    """Test that projections default to the first week with unplayed games."""
+    assert default_week(SeasonMatrix(2023).load()) == 1
+
+def _full_season(season=2024, users=200, weeks=18, games_per_week=16, played_weeks=0):
+    """A league-sized season: every user picks every game, the first weeks are final"""
+    rng = np.random.default_rng(0)
+    kickoff = datetime.utcnow() - timedelta(weeks=played_weeks)
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'player{n}', 'email': f'player{n}@example.com'} for n in range(users)
+    ])
+    games = []
+    for week in range(1, weeks + 1):
+        for n in range(games_per_week):
+            home, away = f'H{n:02d}', f'A{n:02d}'
+            played = week <= played_weeks
+            games.append({
+                'espn_id': f'{season}{week:02d}{n:02d}', 'season': season, 'week': week,
+                'home_team': home, 'away_team': away, 'is_mnf': n == games_per_week - 1,
+                'start_time': kickoff + timedelta(weeks=week - 1, hours=n),
+                'status': 'completed' if played else 'scheduled',
+                'final_score_home': 24 if played else None, 'final_score_away': 20 if played else None,
+                'winner': (home if rng.random() < 0.5 else away) if played else None
+            })
+    db.session.execute(Game.__table__.insert(), games)
+    user_ids = [user.id for user in User.query.filter(User.username.like('player%'))]
+    db.session.execute(Pick.__table__.insert(), [{
+        'user_id': user_id, 'game_id': game.id, 'week': game.week,
+        'picked_team': game.home_team if rng.random() < 0.5 else game.away_team,
+        'mnf_total_points': int(rng.integers(30, 60)) if game.is_mnf else None
+    } for game in Game.query.filter_by(season=season) for user_id in user_ids])
+    db.session.commit()
+    return SeasonMatrix(season).load()
+
+@pytest.mark.parametrize('played_weeks', [0, 9])
+def test_league_sized_season(app, played_weeks):
+    """Test that a 200-user season simulates every open game and hands out every win."""
+    matrix = _full_season(played_weeks=played_weeks)
+
+    result = simulate(matrix, played_weeks + 1, simulations=20000, seed=1)
+
+    assert result['remaining_games'] == {'week': 16, 'season': 16 * (18 - played_weeks)}
+    assert np.isclose(result['week'].sum(), 1.0)
+    assert np.isclose(result['season'].sum(), 1.0)
+
+@pytest.mark.skipif(os.environ.get('RUN_PERF_TESTS', 'false').lower() != 'true',
+                    reason='Timing check; set RUN_PERF_TESTS=true to run it')
+@pytest.mark.parametrize('played_weeks', [0, 9])
+def test_hundred_thousand_simulations_are_fast(app, played_weeks):
+    """Test that the default simulation count for a 200-user league runs well under a second."""
+    matrix = _full_season(played_weeks=played_weeks)
+    week = played_weeks + 1
+    simulate(matrix, week, simulations=1000, seed=1)
+
+    started = time.perf_counter()
+    simulate(matrix, week, seed=1)
+
+    assert time.perf_counter() - started < 1.0
+
+def test_projections_endpoint(authenticated_client):
+    """Test that the endpoint validates input and returns probabilities."""
+    with patch('app.routes.get_columnar_engine', return_value=ColumnarEngine()):
+        response = authenticated_client.get('/api/projections?season=2023&week=1&simulations=5000')
+        weighted = authenticated_client.post('/api/projections?season=2023&week=1&simulations=5000',
+                                             json={'probabilities': {'1': 'x'}})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['week'] == 1
+    assert data['users'][0]['username'] == 'testuser'
+    assert weighted.status_code == 400
+    assert authenticated_client.get('/api/projections?simulations=0').status_code == 400
@@ -0,0 +1,96 @@
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from app.http_client import HTTPClient
+from app.response_cache import ResponseCache, cache_key, scoreboard_ttl, TTL_FINAL, TTL_LIVE
+
+URL = 'https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard'
+
+def _response(status_code, payload=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = json.dumps(payload).encode() if payload is not None else b''
+    response.json.return_value = payload
+    return response
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / 'cache.db'))
+
+def test_cache_key_is_order_independent():
+    """Test that parameter order does not change the cache key."""
+    assert cache_key(URL, {'week': 1, 'dates': 2023}) == cache_key(URL, {'dates': 2023, 'week': 1})
+    assert cache_key(URL) == URL
+
+def test_scoreboard_ttl():
+    """Test that only fully completed weeks get the long TTL."""
+    final = {'status': {'type': {'completed': True}}}
+    live = {'status': {'type': {'completed': False}}}
+    assert scoreboard_ttl({'events': [final, final]}) == TTL_FINAL
+    assert scoreboard_ttl({'events': [final, live]}) == TTL_LIVE
+    assert scoreboard_ttl({'events': []}) == TTL_LIVE
+
+def test_put_and_get(cache):
+    """Test that bodies and validators round-trip through the cache."""
+    cache.put('k', b'{"a": 1}', etag='"v1"', last_modified='Sun, 10 Sep 2023', ttl=60)
+
+    entry = cache.get('k')
+    assert entry.body == b'{"a": 1}'
+    assert entry.etag == '"v1"'
+    assert entry.fresh is True
+    assert cache.get('missing') is None
+
+def test_expired_entry_is_stale(cache):
+    """Test that entries past their TTL are reported as stale."""
+    cache.put('k', b'{}', ttl=-1)
+    assert cache.get('k').fresh is False
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently used entries are evicted over the size cap."""
+    cache = ResponseCache(str(tmp_path / 'cache.db'), max_bytes=600)
+    blob = bytes(range(256)) * 2  # incompressible enough to take real space
+
+    cache.put('old', blob, ttl=60)
+    cache.put('recent', blob, ttl=60)
+    cache.get('recent')
+    cache.put('new', blob, ttl=60)
+
+    assert cache.get('old') is None
+    assert cache.get('new') is not None
+    assert cache.total_size() <= 600
+
+def test_fresh_entry_skips_network(cache):
+    """Test that a fresh cached response is served without a request."""
+    client = HTTPClient(cache=cache)
+    payload = {'events': []}
+    with patch.object(client.session, 'get', return_value=_response(200, payload)) as mock_get:
+        assert client.get_json(URL, params={'week': 1}, ttl=60) == payload
+        assert client.get_json(URL, params={'week': 1}, ttl=60) == payload
+
+        assert mock_get.call_count == 1
+
+def test_stale_entry_is_revalidated(cache):
+    """Test that stale entries send validators and reuse the body on 304."""
+    client = HTTPClient(cache=cache)
+    payload = {'events': [{'id': '1'}]}
+    first = _response(200, payload, headers={'ETag': '"abc"', 'Last-Modified': 'Sun, 10 Sep 2023'})
+
+    with patch.object(client.session, 'get', side_effect=[first, _response(304)]) as mock_get:
+        client.get_json(URL, ttl=-1)
+        assert client.get_json(URL, ttl=60) == payload
+
+        headers = mock_get.call_args.kwargs['headers']
+        assert headers['If-None-Match'] == '"abc"'
+        assert headers['If-Modified-Since'] == 'Sun, 10 Sep 2023'
+
+    assert cache.get(URL).fresh is True
+
+def test_stale_entry_served_on_upstream_error(cache):
+    """Test that a stale entry is used when upstream keeps failing."""
+    client = HTTPClient(cache=cache, max_retries=0)
+    payload = {'events': []}
+
+    with patch.object(client.session, 'get', side_effect=[_response(200, payload), _response(503)]):
+        client.get_json(URL, ttl=-1)
+        assert client.get_json(URL, ttl=60) == payload
@@ -0,0 +1,64 @@
+from unittest.mock import patch
+from app import db, Game
+from app.models import DataVersion
+from app.result_cache import ResultCache, data_version, bump_version, GAMES_VERSION
+from app.scoring import rebuild_scores
+
+def test_result_cache_lru_eviction():
+    """Test that the least recently used entries go first once full."""
+    cache = ResultCache(max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    cache.get('a')
+    cache.put('c', b'1234')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234'
+    assert cache.get('c') == b'1234'
+    stats = cache.snapshot()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] == 8
+    assert (stats['hits'], stats['misses']) == (3, 1)
+
+def test_result_cache_skips_oversized_entries():
+    """Test that an entry larger than the whole cache is not stored."""
+    cache = ResultCache(max_bytes=4)
+    cache.put('a', b'12345')
+
+    assert cache.get('a') is None
+    assert cache.snapshot()['entries'] == 0
+
+def test_bump_version(app):
+    """Test that versions start at zero and only move forward."""
+    DataVersion.query.delete()
+    db.session.commit()
+    assert data_version() == 0
+
+    bump_version()
+    bump_version()
+    db.session.commit()
+    assert data_version() == 2
+
+    bump_version(minimum=10)
+    db.session.commit()
+    assert data_version() == 10
+
+def test_leaderboard_cached_until_version_bump(authenticated_client):
+    """Test that cached leaderboards are reused until scores change."""
+    cache = ResultCache()
+    with patch('app.result_cache.get_result_cache', return_value=cache):
+        first = authenticated_client.get('/api/leaderboard/season?season=2023').get_json()
+        second = authenticated_client.get('/api/leaderboard/season?season=2023').get_json()
+        assert first == second
+        assert cache.snapshot()['hits'] == 1
+
+        game = Game.query.filter_by(espn_id='401547417').first()
+        game.status = 'completed'
+        game.winner = 'KC'
+        bump_version(GAMES_VERSION)  # As the game updater does with a result
+        db.session.commit()
+        rebuild_scores(2023)
+
+        third = authenticated_client.get('/api/leaderboard/season?season=2023').get_json()
+        assert third[0]['correct'] == 1
+        assert cache.snapshot()['misses'] == 2
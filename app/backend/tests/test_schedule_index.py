@@ -0,0 +1,41 @@
+from datetime import datetime
+from app import db, Game
+from app.schedule_index import ScheduleIndex
+from app.result_cache import bump_version, GAMES_VERSION
+
+def test_schedule_reloads_on_games_version(app):
+    """Test that the index serves from memory until the games version moves."""
+    index = ScheduleIndex()
+    game = Game.query.filter_by(espn_id='401547417').first()
+    schedule = index.season(2023)
+    assert schedule.get(game.id).home_team == 'KC'
+    assert index.season(2023) is schedule
+
+    game.status = 'postponed'
+    bump_version(GAMES_VERSION)
+    db.session.commit()
+
+    reloaded = index.season(2023)
+    assert reloaded is not schedule
+    assert reloaded.is_locked(reloaded.get(game.id), datetime.utcnow())
+
+def test_schedule_locks_at_kickoff(app):
+    """Test that games lock once their kickoff has passed."""
+    schedule = ScheduleIndex().season(2023)
+    now = datetime.utcnow()
+    locked = {game.id: schedule.is_locked(game, now) for game in schedule.week(1)}
+    kc_game = Game.query.filter_by(espn_id='401547417').first()
+    mnf_game = Game.query.filter_by(espn_id='401547418').first()
+    assert locked == {kc_game.id: False, mnf_game.id: True}
+
+def test_game_locks_route(authenticated_client):
+    """Test that lock times are served with a revalidatable ETag."""
+    response = authenticated_client.get('/api/games/locks?season=2023&week=1')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [game['home_team'] for game in data['games']] == ['NYG', 'KC']
+    assert data['games'][0]['locks_at']
+
+    cached = authenticated_client.get('/api/games/locks?season=2023&week=1',
+                                      headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
@@ -0,0 +1,124 @@
+import time
+from unittest.mock import MagicMock, patch
+from datetime import datetime, timedelta
+from apscheduler.schedulers.background import BackgroundScheduler
+from app import db, Game
+from app.models import Lease
+from app.scheduler import plan_next_poll, GamePoller, LeaderElection, LIVE_INTERVAL, PREGAME_LEAD, IDLE_INTERVAL
+
+def test_plan_live_when_game_started(app):
+    """Test that a started, unfinished game triggers fast polling."""
+    now = datetime.utcnow()
+    run_time, mode = plan_next_poll(now)
+
+    assert mode == 'live'
+    assert run_time == now + LIVE_INTERVAL
+
+def test_plan_waits_for_next_kickoff(app):
+    """Test that the poller sleeps until shortly before the next kickoff."""
+    now = datetime.utcnow()
+    Game.query.filter_by(espn_id='401547418').update({'status': 'completed'})
+    game = Game.query.filter_by(espn_id='401547417').first()
+    game.start_time = now + timedelta(hours=2)
+    db.session.commit()
+
+    run_time, mode = plan_next_poll(now)
+
+    assert mode == 'waiting'
+    assert run_time == game.start_time - PREGAME_LEAD
+
+def test_plan_caps_long_sleeps(app):
+    """Test that far-off kickoffs still wake the poller periodically."""
+    now = datetime.utcnow()
+    Game.query.filter_by(espn_id='401547418').update({'status': 'completed'})
+    Game.query.filter_by(espn_id='401547417').update({'start_time': now + timedelta(days=5)})
+    db.session.commit()
+
+    run_time, mode = plan_next_poll(now)
+
+    assert mode == 'waiting'
+    assert run_time == now + IDLE_INTERVAL
+
+def test_plan_idle_without_games(app):
+    """Test that an empty schedule polls at the idle interval."""
+    now = datetime.utcnow()
+    Game.query.update({'status': 'completed'})
+    db.session.commit()
+
+    run_time, mode = plan_next_poll(now)
+
+    assert mode == 'idle'
+    assert run_time == now + IDLE_INTERVAL
+
+def test_poller_reschedules_after_run(app):
+    """Test that each run schedules the next one and exposes it."""
+    scheduler = MagicMock()
+    job = MagicMock()
+    poller = GamePoller(scheduler, app, job)
+
+    poller.run()
+
+    job.assert_called_once()
+    assert scheduler.add_job.call_args.kwargs['id'] == 'update_games'
+    status = poller.status()
+    assert status['mode'] == 'live'
+    assert status['next_run_time'].endswith('Z')
+
+def test_missed_poll_still_runs(app):
+    """Test that a poll whose fire time passed long ago still runs and plans the next one."""
+    scheduler = BackgroundScheduler()
+    scheduler.start(paused=True)
+    job = MagicMock()
+    poller = GamePoller(scheduler, app, job)
+    try:
+        with patch('app.scheduler.plan_next_poll', return_value=(datetime.utcnow() + IDLE_INTERVAL, 'idle')):
+            poller._schedule(datetime.utcnow() - timedelta(minutes=10), 'live')
+            scheduler.resume()
+            deadline = time.monotonic() + 5
+            while poller.mode != 'idle' and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert scheduler.get_job('update_games') is not None
+    finally:
+        scheduler.shutdown(wait=False)
+
+    job.assert_called_once()
+    assert poller.mode == 'idle'
+
+def test_leader_election_single_leader(app):
+    """Test that only one process holds the scheduler lease at a time."""
+    first = LeaderElection(MagicMock(), app, on_elected=MagicMock(), on_demoted=MagicMock())
+    second = LeaderElection(MagicMock(), app, on_elected=MagicMock(), on_demoted=MagicMock())
+
+    first.heartbeat()
+    second.heartbeat()
+
+    assert first.is_leader is True
+    assert second.is_leader is False
+    first.on_elected.assert_called_once()
+    second.on_elected.assert_not_called()
+
+def test_leader_failover_after_expiry(app):
+    """Test that another process takes over once the leader's lease expires."""
+    first = LeaderElection(MagicMock(), app, on_elected=MagicMock(), on_demoted=MagicMock())
+    second = LeaderElection(MagicMock(), app, on_elected=MagicMock(), on_demoted=MagicMock())
+    first.heartbeat()
+
+    Lease.query.filter_by(name=first.name).update({'expires_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+    second.heartbeat()
+    first.heartbeat()
+
+    assert second.is_leader is True
+    assert first.is_leader is False
+    first.on_demoted.assert_called_once()
+
+def test_leader_resign_releases_lease(app):
+    """Test that a resigning leader frees the lease immediately."""
+    first = LeaderElection(MagicMock(), app, on_elected=MagicMock(), on_demoted=MagicMock())
+    second = LeaderElection(MagicMock(), app, on_elected=MagicMock(), on_demoted=MagicMock())
+    first.heartbeat()
+
+    first.resign()
+    second.heartbeat()
+
+    assert second.is_leader is True
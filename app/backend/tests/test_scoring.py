@@ -0,0 +1,173 @@
+import os
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+from app import db, User, Game, Pick
+from app.models import UserWeekScore, UserSeasonScore
+from app.scoring import refresh_week_scores, apply_game_changes, rebuild_scores, weekly_wins, current_streaks, user_stats
+
+@pytest.fixture
+def sql_engine():
+    """Serve leaderboards and stats from the summary tables instead of the columnar engine."""
+    with patch.dict(os.environ, {'SCORING_ENGINE': 'sql'}):
+        yield
+
+def test_refresh_week_scores(app, finish_game):
+    """Test that week and season rows reflect finished games."""
+    user = User.query.filter_by(username='testuser').first()
+    finish_game('401547417', 24, 20)
+    db.session.commit()
+
+    refresh_week_scores(2023, 1)
+    db.session.commit()
+
+    week = UserWeekScore.query.filter_by(user_id=user.id, season=2023, week=1).first()
+    assert (week.correct, week.total) == (1, 1)
+    assert week.tiebreak_delta is None
+    season = UserSeasonScore.query.filter_by(user_id=user.id, season=2023).first()
+    assert (season.correct, season.total, season.weeks_played) == (1, 1, 1)
+
+def test_tiebreak_delta_from_mnf_game(app, finish_game):
+    """Test that the tiebreak delta measures the MNF total guess."""
+    user = User.query.filter_by(username='testuser').first()
+    mnf = finish_game('401547418', 17, 27)
+    db.session.add(Pick(user_id=user.id, game_id=mnf.id, picked_team='DAL', mnf_total_points=40, week=1))
+    db.session.commit()
+
+    refresh_week_scores(2023, 1)
+    db.session.commit()
+
+    week = UserWeekScore.query.filter_by(user_id=user.id, season=2023, week=1).first()
+    assert week.correct == 1
+    assert week.total == 2
+    assert week.tiebreak_delta == 4
+
+def test_refresh_removes_stale_rows(app):
+    """Test that users without picks lose their score rows."""
+    user = User.query.filter_by(username='testuser').first()
+    rebuild_scores(2023)
+    Pick.query.filter_by(user_id=user.id).delete()
+    db.session.commit()
+
+    refresh_week_scores(2023, 1, user_ids=[user.id])
+    db.session.commit()
+
+    assert UserWeekScore.query.filter_by(user_id=user.id).count() == 0
+    assert UserSeasonScore.query.filter_by(user_id=user.id).count() == 0
+
+def test_apply_game_changes_ignores_other_fields(app):
+    """Test that only result changes trigger a recompute."""
+    game = Game.query.filter_by(espn_id='401547417').first()
+    with patch('app.scoring.refresh_week_scores') as refresh:
+        apply_game_changes([{'game_id': game.id, 'espn_id': game.espn_id, 'changes': {'upstream_fingerprint': ['a', 'b']}}])
+        refresh.assert_not_called()
+
+        apply_game_changes([{'game_id': game.id, 'espn_id': game.espn_id, 'changes': {'winner': [None, 'KC']}}])
+        refresh.assert_called_once_with(2023, 1)
+
+def test_pick_submission_updates_scores(authenticated_client, finish_game):
+    """Test that submitting picks refreshes the user's score rows."""
+    finished = finish_game('401547418', 10, 31)
+    game = Game.query.filter_by(espn_id='401547417').first()
+    user = User.query.filter_by(username='testuser').first()
+    db.session.add(Pick(user_id=user.id, game_id=finished.id, picked_team='DAL', week=1))
+    db.session.commit()
+
+    # The finished game is locked and keeps its pick; the open one changes side
+    response = authenticated_client.post('/api/picks', json={
+        'week': 1,
+        'season': 2023,
+        'picks': [{'game_id': game.id, 'picked_team': 'DET'}]
+    })
+
+    assert response.status_code == 200
+    week = UserWeekScore.query.filter_by(user_id=user.id, season=2023, week=1).first()
+    assert (week.correct, week.total) == (1, 2)
+
+def test_leaderboards_read_score_tables(authenticated_client, finish_game, sql_engine):
+    """Test that both leaderboards are served from the summary tables."""
+    finish_game('401547417', 24, 20)
+    db.session.commit()
+    rebuild_scores(2023)
+
+    season = authenticated_client.get('/api/leaderboard/season?season=2023').get_json()
+    weekly = authenticated_client.get('/api/leaderboard/weekly?week=1&season=2023').get_json()
+
+    assert [(row['username'], row['correct'], row['total']) for row in season] == [('testuser', 1, 1)]
+    assert season[0]['accuracy'] == 100.0
+    assert weekly[0]['username'] == 'testuser'
+    assert weekly[0]['tiebreak_delta'] is None
+
+def test_weekly_wins_and_streaks(app, finish_game):
+    """Test that week winners and current streaks come from finished games."""
+    admin = User.query.filter_by(username='admin').first()
+    user = User.query.filter_by(username='testuser').first()
+    game = finish_game('401547417', 24, 20)
+    mnf = finish_game('401547418', 17, 27)
+    db.session.add_all([
+        Pick(user_id=user.id, game_id=mnf.id, picked_team='DAL', mnf_total_points=50, week=1),
+        Pick(user_id=admin.id, game_id=game.id, picked_team='KC', week=1),
+        Pick(user_id=admin.id, game_id=mnf.id, picked_team='DAL', mnf_total_points=45, week=1)
+    ])
+    db.session.commit()
+    rebuild_scores(2023)
+
+    # Both went 2-0; admin's MNF guess of 45 beats 50 against an actual 44
+    assert weekly_wins(2023) == {admin.id: 1}
+    assert current_streaks(2023) == {admin.id: 2, user.id: 2}
+
+def test_streak_stops_at_latest_miss(app, finish_game):
+    """Test that a miss on the most recent game resets the streak."""
+    finish_game('401547417', 10, 31)
+    db.session.commit()
+
+    assert current_streaks(2023) == {}
+
+def test_season_leaderboard_query_count(authenticated_client, finish_game, sql_engine):
+    """Test that the season leaderboard costs a fixed number of queries."""
+    finish_game('401547417', 24, 20)
+    for i in range(5):
+        user = User(username=f'player{i}', email=f'player{i}@test.com', first_login=False)
+        user.password = 'password'
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Pick(user_id=user.id, game_id=Game.query.filter_by(espn_id='401547417').first().id,
+                            picked_team='KC', week=1))
+    db.session.commit()
+    rebuild_scores(2023)
+
+    statements = []
+    def count(*args):
+        statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        response = authenticated_client.get('/api/leaderboard/season?season=2023')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    assert len(response.get_json()) == 6
+    assert len([s for s in statements if s.lstrip().upper().startswith('SELECT')]) <= 5
+
+def test_user_stats_counts_winners(app, finish_game):
+    """Test that stats compare picks against each game's actual winner."""
+    user = User.query.filter_by(username='testuser').first()
+    mnf = finish_game('401547418', 17, 27)
+    finish_game('401547417', 24, 20)
+    db.session.add(Pick(user_id=user.id, game_id=mnf.id, picked_team='NYG', mnf_total_points=40, week=1))
+    db.session.commit()
+
+    stats = user_stats([user.id])[user.id]
+
+    assert stats['total_correct'] == 1
+    assert stats['accuracy'] == 50
+    assert stats['best_week'] == {'week': 1, 'correct': 1}
+    assert stats['weekly_stats'] == [{'week': 1, 'correct': 1, 'total': 2, 'accuracy': 50}]
+
+def test_stats_endpoint_batch_requires_admin(authenticated_client):
+    """Test that batch stats are limited to admins."""
+    response = authenticated_client.get('/api/stats?user_ids=1,2')
+    assert response.status_code == 403
+
+    response = authenticated_client.get('/api/stats')
+    assert response.status_code == 200
+    assert response.get_json()['current_streak'] == 0
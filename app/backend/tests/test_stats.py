@@ -111,14 +111,9 @@ def test_leaderboard_accuracy(client, app):
         user = User.query.filter_by(username='testuser').first()
         game = Game.query.filter_by(espn_id='401547417').first()  # KC vs DET game
         
-        # Add a correct pick
-        pick = Pick(
-            user_id=user.id,
-            game_id=game.id,
-            picked_team='DET',  # DET won this game
-            week=1
-        )
-        db.session.add(pick)
+        # Make the user's pick on this game correct
+        pick = Pick.query.filter_by(user_id=user.id, game_id=game.id).first()
+        pick.picked_team = 'DET'  # DET won this game
         db.session.commit()
     
     # Get leaderboard
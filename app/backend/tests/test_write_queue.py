@@ -0,0 +1,101 @@
+import time
+import pytest
+from unittest.mock import patch
+from concurrent.futures import Future
+from app import db, User, Game, Pick
+from app.write_queue import GroupCommitQueue
+
+def _job(result, user_id=None, game_id=None, team=None):
+    def job():
+        if user_id:
+            db.session.add(Pick(user_id=user_id, game_id=game_id, picked_team=team, week=1))
+            db.session.flush()
+        return result
+    return job
+
+def _batch(*jobs):
+    return [(job, Future(), time.monotonic()) for job in jobs]
+
+def test_batch_commits_once(app):
+    """Test that every job in a batch lands in one commit and gets its own result."""
+    admin = User.query.filter_by(username='admin').first()
+    games = Game.query.order_by(Game.id).all()
+    queue = GroupCommitQueue(app)
+    batch = _batch(
+        _job('first', admin.id, games[0].id, 'KC'),
+        _job('second', admin.id, games[1].id, 'DAL')
+    )
+
+    queue.run_batch(batch)
+
+    assert [future.result(0) for _, future, _ in batch] == ['first', 'second']
+    assert Pick.query.filter_by(user_id=admin.id).count() == 2
+    stats = queue.stats.snapshot()
+    assert (stats['batches'], stats['jobs'], stats['max_batch_size']) == (1, 2, 2)
+
+def test_failed_job_only_fails_its_request(app):
+    """Test that a failing job is retried alone and the rest still commit."""
+    admin = User.query.filter_by(username='admin').first()
+    user = User.query.filter_by(username='testuser').first()
+    games = Game.query.order_by(Game.id).all()
+    queue = GroupCommitQueue(app)
+    batch = _batch(
+        _job('ok', admin.id, games[0].id, 'KC'),
+        _job('duplicate', user.id, games[0].id, 'DET')  # testuser already picked this game
+    )
+
+    queue.run_batch(batch)
+
+    assert batch[0][1].result(0) == 'ok'
+    with pytest.raises(Exception):
+        batch[1][1].result(0)
+    assert Pick.query.filter_by(user_id=admin.id).count() == 1
+    stats = queue.stats.snapshot()
+    assert (stats['failed_jobs'], stats['retried_batches']) == (1, 1)
+
+def test_collect_groups_queued_jobs(app):
+    """Test that jobs already waiting are taken together up to max_batch."""
+    queue = GroupCommitQueue(app, max_batch=3, max_wait=0.01)
+    for i in range(5):
+        queue._queue.put((_job(i), Future(), time.monotonic()))
+
+    assert len(queue._collect()) == 3
+    assert len(queue._collect()) == 2
+
+def test_timed_out_job_is_withdrawn(app):
+    """Test that a job still queued at the timeout is cancelled and never runs."""
+    ran = []
+    queue = GroupCommitQueue(app)
+    with patch.object(GroupCommitQueue, '_ensure_started'):
+        with pytest.raises(TimeoutError):
+            queue.submit(lambda: ran.append(True), timeout=0.01)
+
+    assert queue._collect() == []
+    assert ran == []
+
+def test_started_job_is_waited_for(app):
+    """Test that a job already running at the timeout returns its result instead of failing."""
+    queue = GroupCommitQueue(app, max_wait=0)
+
+    def slow_job():
+        time.sleep(0.2)
+        return 'committed'
+
+    assert queue.submit(slow_job, timeout=0.05) == 'committed'
+    assert queue.stats.snapshot()['jobs'] == 1
+
+def test_metrics_report_write_queue(client, app):
+    """Test that the admin metrics include the writer when it is enabled."""
+    admin = User.query.filter_by(username='admin').first()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin.id)
+        sess['_fresh'] = True
+
+    app.extensions['write_queue'] = GroupCommitQueue(app)
+    try:
+        response = client.get('/api/admin/metrics')
+    finally:
+        del app.extensions['write_queue']
+
+    assert response.status_code == 200
+    assert response.get_json()['write_queue']['batches'] == 0